@@ -1,20 +1,53 @@
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator, Iterator
 from datetime import datetime
 
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Path
-from fastapi.responses import Response
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import PlainTextResponse, StreamingResponse
 
+from app.core.config import (
+    SCRAPER_JOB_POLL_INTERVAL,
+    SCRAPER_PROGRESS_KEEPALIVE_SECONDS,
+    SCRAPER_PROGRESS_MIN_INTERVAL,
+    SCRAPER_RESULT_PAGES_MAX_LIMIT,
+)
 from app.schemas.scraper_schemas import (
+    BatchExportMode,
+    BatchScraperRequest,
     ContentResponse,
     ExportFormat,
+    PageContent,
+    PagesResponse,
     ScraperRequest,
     ScraperResponse,
     TaskStatus,
 )
+from app.services.extraction_profiles import get_extraction_profiles
+from app.services.http_client import get_pool_stats
+from app.services.metrics import render_metrics
+from app.services.progress_events import subscribe_progress
+from app.services.rate_limiter import get_rate_limiter
 from app.services.scraper_service import (
-    get_markdown_content,
+    cancel_scraping_task,
     get_task_filename,
+    get_task_pages,
     get_task_status,
-    get_zip_content,
+    get_zip_export,
+    is_local_task,
+    iter_markdown_content,
+    iter_markdown_pages,
+    resume_scraping_task,
+    start_batch_task,
     start_scraping_task,
 )
 
@@ -28,6 +61,36 @@ async def health():
     return {"status": "ok"}
 
 
+@api_router.get("/http-pool")
+async def http_pool_stats():
+    """Statistiques d'utilisation du pool de connexions HTTP partagé."""
+    return get_pool_stats()
+
+
+@api_router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Mesures de ce processus au format texte Prometheus.
+
+    Avec plusieurs workers uvicorn, chaque processus expose ses propres mesures.
+    """
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@api_router.get("/rate-limits")
+async def rate_limits():
+    """Débit courant autorisé pour chaque hôte parcouru."""
+    return get_rate_limiter().snapshot()
+
+
+@api_router.get("/extraction-profiles")
+async def extraction_profiles():
+    """Profils d'extraction enregistrés, par motif d'hôte (``*`` = profil par défaut)."""
+    return get_extraction_profiles()
+
+
 @api_router.post("/scrape", response_model=ScraperResponse)
 async def scrape_documentation(
     request: ScraperRequest, background_tasks: BackgroundTasks
@@ -40,7 +103,21 @@ async def scrape_documentation(
     """
     # Démarrer le scraping en arrière-plan avec les options de format et nom de fichier
     task_id = start_scraping_task(
-        str(request.url), format=request.format, filename=request.filename
+        str(request.url),
+        format=request.format,
+        filename=request.filename,
+        max_concurrency=request.max_concurrency,
+        max_per_host=request.max_per_host,
+        use_cache=request.use_cache,
+        reuse_max_age_minutes=request.reuse_max_age_minutes,
+        frontier_mode=request.frontier_mode,
+        discovery=request.discovery,
+        max_pages=request.max_pages,
+        max_depth=request.max_depth,
+        max_bytes=request.max_bytes,
+        deadline_seconds=request.deadline_seconds,
+        extraction=request.extraction.model_dump() if request.extraction else None,
+        compression_level=request.compression_level,
     )
 
     return ScraperResponse(
@@ -50,18 +127,90 @@ async def scrape_documentation(
     )
 
 
-@api_router.get("/progress/{task_id}", response_model=TaskStatus)
-async def get_scraping_progress(
+@api_router.post("/batch", response_model=ScraperResponse)
+async def scrape_batch(request: BatchScraperRequest) -> ScraperResponse:
+    """
+    Démarre une tâche qui parcourt un lot de sites de documentation.
+
+    Chaque racine a son propre périmètre ; les sites sont parcourus simultanément
+    avec un pool de connexions commun et une répartition équitable entre les
+    hôtes. La progression de chaque racine est détaillée dans ``seeds``.
+    """
+    task_id = start_batch_task(
+        [seed.model_dump() for seed in request.seeds],
+        format=request.format,
+        export_mode=request.export_mode,
+        filename=request.filename,
+        max_concurrency=request.max_concurrency,
+        max_per_host=request.max_per_host,
+        use_cache=request.use_cache,
+        frontier_mode=request.frontier_mode,
+        deadline_seconds=request.deadline_seconds,
+        compression_level=request.compression_level,
+    )
+
+    return ScraperResponse(
+        task_id=task_id,
+        status="started",
+        message=f"Le scraping de {len(request.seeds)} sites a été démarré avec succès.",
+    )
+
+
+@api_router.delete("/scrape/{task_id}", response_model=TaskStatus)
+async def cancel_scraping(
+    response: Response,
     task_id: str = Path(..., description="L'identifiant de la tâche de scraping"),
 ) -> TaskStatus:
     """
-    Récupère la progression d'une tâche de scraping spécifique.
+    Annule une tâche de scraping en attente ou en cours.
+
+    Les pages déjà collectées restent disponibles via ``/result`` et ``/download``.
+    Si la tâche s'exécute dans un autre processus qui n'a pas encore confirmé
+    l'annulation, la réponse est ``202 Accepted``.
     """
-    task_status = get_task_status(task_id)
+    task_status = await cancel_scraping_task(task_id)
+    if task_status is None:
+        raise HTTPException(status_code=404, detail="Tâche non trouvée")
+    if task_status["status"] in ("pending", "running"):
+        response.status_code = 202
+    elif task_status["status"] != "cancelled":
+        raise HTTPException(status_code=409, detail="La tâche est déjà terminée")
+
+    return build_task_status(task_id, task_status)
+
 
+@api_router.post("/scrape/{task_id}/resume", response_model=ScraperResponse)
+async def resume_scraping(
+    task_id: str = Path(..., description="L'identifiant de la tâche interrompue"),
+) -> ScraperResponse:
+    """
+    Reprend une tâche annulée, en erreur ou arrêtée par son budget de durée.
+
+    Une nouvelle tâche repart du point de reprise de la tâche interrompue : les
+    pages déjà collectées ne sont pas téléchargées de nouveau. Une tâche ne peut
+    être reprise qu'une fois.
+    """
+    task_status = get_task_status(task_id)
     if task_status["status"] == "not_found":
         raise HTTPException(status_code=404, detail="Tâche non trouvée")
+    if task_status["status"] in ("pending", "running"):
+        raise HTTPException(status_code=409, detail="La tâche est en cours")
+
+    resumed_task_id = resume_scraping_task(task_id)
+    if resumed_task_id is None:
+        raise HTTPException(
+            status_code=409, detail="Aucun point de reprise pour cette tâche"
+        )
 
+    return ScraperResponse(
+        task_id=resumed_task_id,
+        status="started",
+        message="La reprise de la tâche de scraping a été démarrée avec succès.",
+    )
+
+
+def build_task_status(task_id: str, task_status: dict) -> TaskStatus:
+    """Construit le schéma de statut d'une tâche à partir de son état."""
     return TaskStatus(
         task_id=task_id,
         status=task_status["status"],
@@ -71,57 +220,243 @@ async def get_scraping_progress(
         progress=task_status.get("progress", 0),
         processed_pages=task_status.get("processed_pages", 0),
         total_pages=task_status.get("total_pages", 0),
+        queued_pages=task_status.get("queued_pages", 0),
+        in_flight_pages=task_status.get("in_flight_pages", 0),
+        failed_pages=task_status.get("failed_pages", 0),
+        duplicate_pages=task_status.get("duplicate_pages", 0),
+        throttled_requests=task_status.get("throttled_requests", 0),
+        downloaded_bytes=task_status.get("downloaded_bytes", 0),
+        failures=task_status.get("failures", []),
+        stop_reason=task_status.get("stop_reason"),
+        current_url=task_status.get("current_url"),
+        cache_hits=task_status.get("cache_hits", 0),
+        cache_misses=task_status.get("cache_misses", 0),
+        reused_from=task_status.get("reused_from"),
+        resumed_from=task_status.get("resumed_from"),
         format=task_status.get("format", ExportFormat.SINGLE_FILE),
         filename=task_status.get("filename"),
+        export_mode=task_status.get("export_mode"),
+        seeds=task_status.get("seeds", []),
+        timings=task_status.get("timings", {}),
+    )
+
+
+@api_router.get("/progress/{task_id}", response_model=TaskStatus)
+async def get_scraping_progress(
+    task_id: str = Path(..., description="L'identifiant de la tâche de scraping"),
+) -> TaskStatus:
+    """
+    Récupère la progression d'une tâche de scraping spécifique.
+    """
+    task_status = get_task_status(task_id)
+
+    if task_status["status"] == "not_found":
+        raise HTTPException(status_code=404, detail="Tâche non trouvée")
+
+    return build_task_status(task_id, task_status)
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Construit un message server-sent events."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def stream_task_progress(request: Request, task_id: str) -> AsyncIterator[str]:
+    """
+    Produit les changements de progression d'une tâche sous forme d'événements SSE.
+
+    Seuls les champs modifiés depuis le dernier envoi sont transmis (événement
+    ``progress``), au plus une fois par ``SCRAPER_PROGRESS_MIN_INTERVAL`` secondes.
+    Un événement ``complete`` portant les liens de téléchargement clôt le flux.
+    """
+    last_sent: dict = {}
+    last_write = time.monotonic()
+    with subscribe_progress(task_id) as changed:
+        while True:
+            changed.clear()
+            task_status = get_task_status(task_id)
+            if task_status["status"] == "not_found":
+                yield format_sse("error", {"detail": "Tâche non trouvée"})
+                return
+
+            snapshot = build_task_status(task_id, task_status).model_dump(mode="json")
+            delta = {
+                key: value for key, value in snapshot.items() if last_sent.get(key) != value
+            }
+            if delta:
+                last_write = time.monotonic()
+                yield format_sse("progress", delta)
+                last_sent = snapshot
+
+            if task_status["status"] not in ("pending", "running"):
+                yield format_sse(
+                    "complete",
+                    {
+                        "task_id": task_id,
+                        "status": task_status["status"],
+                        "result_url": str(
+                            request.url_for("get_scraping_result", task_id=task_id)
+                        ),
+                        "download_url": str(
+                            request.url_for("download_markdown_file", task_id=task_id)
+                        ),
+                    },
+                )
+                return
+
+            # Une tâche exécutée par un autre processus ne publie pas d'événement ici :
+            # son statut est relu dans le stockage partagé à intervalle régulier
+            timeout = (
+                SCRAPER_PROGRESS_KEEPALIVE_SECONDS
+                if is_local_task(task_id)
+                else SCRAPER_JOB_POLL_INTERVAL
+            )
+            try:
+                await asyncio.wait_for(changed.wait(), timeout)
+            except TimeoutError:
+                if time.monotonic() - last_write >= SCRAPER_PROGRESS_KEEPALIVE_SECONDS:
+                    # Commentaire SSE pour garder la connexion ouverte à travers les proxys
+                    last_write = time.monotonic()
+                    yield ": keepalive\n\n"
+                continue
+
+            # Les changements survenus pendant cette attente sont fusionnés
+            await asyncio.sleep(SCRAPER_PROGRESS_MIN_INTERVAL)
+
+
+@api_router.get("/progress/{task_id}/stream")
+async def stream_scraping_progress(
+    request: Request,
+    task_id: str = Path(..., description="L'identifiant de la tâche de scraping"),
+) -> StreamingResponse:
+    """
+    Diffuse la progression d'une tâche de scraping en server-sent events.
+
+    Remplace l'interrogation périodique de ``/progress/{task_id}``.
+    """
+    if get_task_status(task_id)["status"] == "not_found":
+        raise HTTPException(status_code=404, detail="Tâche non trouvée")
+
+    return StreamingResponse(
+        stream_task_progress(request, task_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
-@api_router.get("/result/{task_id}", response_model=ContentResponse)
+def stream_content_response(
+    response: ContentResponse, pages: Iterator[str]
+) -> Iterator[bytes]:
+    """
+    Produit le JSON de ``response`` en y insérant le Markdown des pages une à une.
+
+    Le document complet n'est jamais construit en mémoire : les autres champs sont
+    sérialisés par le modèle, puis ``content`` est ajouté page par page, séparées
+    par une ligne vide.
+    """
+    # Objet JSON des autres champs, rouvert pour y ajouter ``content``
+    head = response.model_dump_json(exclude={"content"})[:-1]
+    separator = "," if head != "{" else ""
+    yield f'{head}{separator}"content":"'.encode()
+    for index, markdown in enumerate(pages):
+        if index:
+            yield b"\\n\\n"
+        # Chaîne JSON sans ses guillemets : le Markdown de la page, échappé
+        yield json.dumps(markdown, ensure_ascii=False)[1:-1].encode("utf-8")
+    yield b'"}'
+
+
+@api_router.get("/result/{task_id}", responses={200: {"model": ContentResponse}})
 async def get_scraping_result(
     task_id: str = Path(..., description="L'identifiant de la tâche de scraping"),
-) -> ContentResponse:
+) -> StreamingResponse:
     """
     Récupère le résultat d'une tâche de scraping spécifique une fois qu'elle est terminée.
+
+    Toutes les pages sont renvoyées en un seul document, lu page par page dans le
+    journal de la tâche ; pour un grand site, ou pendant le crawl, préférez
+    ``/result/{task_id}/pages``.
     """
     task_status = get_task_status(task_id)
 
     if task_status["status"] == "not_found":
         raise HTTPException(status_code=404, detail="Tâche non trouvée")
 
-    if task_status["status"] != "completed":
+    if task_status["status"] not in ("completed", "cancelled"):
         raise HTTPException(status_code=400, detail="La tâche n'est pas encore terminée")
 
-    content = get_markdown_content(task_id)
-
-    if not content:
+    _, total = get_task_pages(task_id, 0, 0)
+    if not total:
         raise HTTPException(status_code=404, detail="Contenu non trouvé")
 
-    return ContentResponse(
+    response = ContentResponse(
         task_id=task_id,
         url=task_status.get("url", ""),
-        content=content,
+        content="",
         status="success",
         timestamp=datetime.now().isoformat(),
         format=task_status.get("format", ExportFormat.SINGLE_FILE),
         filename=task_status.get("filename"),
     )
+    # Générateur synchrone : le journal est lu hors de la boucle d'événements
+    return StreamingResponse(
+        stream_content_response(response, iter_markdown_pages(task_id)),
+        media_type="application/json",
+    )
+
+
+@api_router.get("/result/{task_id}/pages", response_model=PagesResponse)
+async def get_scraping_pages(
+    task_id: str = Path(..., description="L'identifiant de la tâche de scraping"),
+    offset: int = Query(0, ge=0, description="Position de la première page renvoyée"),
+    limit: int = Query(
+        50, ge=1, le=SCRAPER_RESULT_PAGES_MAX_LIMIT, description="Nombre de pages renvoyées"
+    ),
+) -> PagesResponse:
+    """
+    Récupère une tranche des pages d'une tâche de scraping, avec leur URL.
+
+    Les pages sont disponibles dès leur conversion, dans l'ordre où elles ont été
+    collectées : une tâche en cours peut être lue au fur et à mesure en reprenant
+    à ``next_offset``. ``complete`` indique que la tâche est terminée et que
+    ``total`` ne changera plus.
+    """
+    task_status = get_task_status(task_id)
+
+    if task_status["status"] == "not_found":
+        raise HTTPException(status_code=404, detail="Tâche non trouvée")
+
+    pages, total = get_task_pages(task_id, offset, limit)
+    complete = task_status["status"] not in ("pending", "running")
+    next_offset = offset + len(pages)
+
+    return PagesResponse(
+        task_id=task_id,
+        status=task_status["status"],
+        offset=offset,
+        total=total,
+        complete=complete,
+        next_offset=next_offset if next_offset < total or not complete else None,
+        pages=[PageContent(**page) for page in pages],
+    )
 
 
 @api_router.get("/download/{task_id}")
 async def download_markdown_file(
     task_id: str = Path(..., description="L'identifiant de la tâche de scraping"),
-) -> Response:
+) -> StreamingResponse:
     """
     Télécharge le fichier généré par une tâche de scraping spécifique.
     Selon le format choisi, renvoie un fichier Markdown unique ou un fichier ZIP
-    contenant un fichier Markdown par page.
+    contenant un fichier Markdown par page. Un lot exporté racine par racine
+    (``per_seed``) est livré en ZIP, avec un dossier ou un fichier par racine.
     """
     task_status = get_task_status(task_id)
 
     if task_status["status"] == "not_found":
         raise HTTPException(status_code=404, detail="Tâche non trouvée")
 
-    if task_status["status"] != "completed":
+    if task_status["status"] not in ("completed", "cancelled"):
         raise HTTPException(status_code=400, detail="La tâche n'est pas encore terminée")
 
     # Récupérer le nom du fichier défini pour la tâche
@@ -130,19 +465,30 @@ async def download_markdown_file(
     # Déterminer le format demandé
     export_format = task_status.get("format", ExportFormat.SINGLE_FILE)
 
-    if export_format == ExportFormat.SINGLE_FILE:
-        content = get_markdown_content(task_id)
-        if not content:
+    # Un lot exporté racine par racine est toujours livré sous forme d'archive
+    per_seed = task_status.get("export_mode") == BatchExportMode.PER_SEED
+    if export_format == ExportFormat.SINGLE_FILE and not per_seed:
+        markdown_stream = iter_markdown_content(task_id)
+        if markdown_stream is None:
             raise HTTPException(status_code=404, detail="Contenu non trouvé")
 
-        response = Response(content=content, media_type="text/markdown")
-        response.headers["Content-Disposition"] = f"attachment; filename={filename}.md"
+        content, size = markdown_stream
+        media_type = "text/markdown"
+        extension = "md"
     else:  # ZIP_FILES
-        content = get_zip_content(task_id)
-        if not content:
+        zip_export = get_zip_export(task_id)
+        if zip_export is None:
             raise HTTPException(status_code=404, detail="Contenu ZIP non trouvé")
 
-        response = Response(content=content, media_type="application/zip")
-        response.headers["Content-Disposition"] = f"attachment; filename={filename}.zip"
+        content, size = zip_export.iter_chunks(), zip_export.size
+        media_type = "application/zip"
+        extension = "zip"
 
-    return response
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}.{extension}",
+            "Content-Length": str(size),
+        },
+    )
@@ -0,0 +1,360 @@
+"""
+Export de sites de documentation en Markdown depuis la ligne de commande.
+
+Les sites sont parcourus par le moteur asynchrone du service, sans serveur ni
+stockage des tâches : chaque page est écrite sur disque dès sa conversion.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import re
+import sys
+import time
+from urllib.parse import urlparse
+
+from app.core.config import (
+    SCRAPER_BATCH_MAX_CONCURRENCY,
+    SCRAPER_CONCURRENCY_LIMIT,
+    SCRAPER_MAX_CONCURRENCY,
+    SCRAPER_MAX_PER_HOST,
+)
+from app.schemas.scraper_schemas import DiscoveryMode
+from app.services.crawl_scheduler import FairShare
+from app.services.export_service import get_file_path_from_url, get_seed_folder
+from app.services.extraction_profiles import ExtractionProfile, build_profile
+from app.services.html_converter import shutdown_conversion_executor
+from app.services.http_client import close_http_session
+from app.services.scraper_service import crawl_and_collect_async
+from app.services.shared_crawl import SharedCrawl, get_crawl_key
+
+# Formats de sortie : fichier Markdown unique, arborescence de fichiers, ou les deux
+OUTPUT_FORMATS = ("single_file", "tree", "both")
+
+# Intervalle minimal entre deux lignes de progression d'un crawl, en secondes
+_PROGRESS_INTERVAL = 1.0
+
+
+class OutputWriter:
+    """
+    Fichiers de sortie d'un site, complétés page par page.
+
+    Le fichier unique reçoit les pages dans leur ordre de conversion, séparées par
+    une ligne vide ; l'arborescence reçoit un fichier par page, placé selon le
+    chemin de son URL sous l'URL de départ.
+    """
+
+    def __init__(
+        self, start_url: str, single_file: str | None = None, tree_dir: str | None = None
+    ):
+        self.start_url = start_url
+        self.tree_dir = tree_dir
+        self.single_file = None
+        if single_file:
+            os.makedirs(os.path.dirname(single_file) or ".", exist_ok=True)
+            self.single_file = open(single_file, "w", encoding="utf-8")
+        # Chemins déjà écrits : deux URLs du même chemin ne s'écrasent pas
+        self.paths: set[str] = set()
+        self.count = 0
+        self.size = 0
+
+    def write(self, url: str, markdown: str) -> None:
+        """Écrit une page dans les fichiers de sortie."""
+        if self.single_file is not None:
+            if self.count:
+                self.single_file.write("\n\n")
+            self.single_file.write(markdown)
+            self.single_file.flush()
+        if self.tree_dir is not None:
+            file_path = os.path.join(self.tree_dir, self.tree_path(url))
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, "w", encoding="utf-8") as page_file:
+                page_file.write(markdown)
+        self.count += 1
+        self.size += len(markdown.encode("utf-8"))
+
+    def tree_path(self, url: str) -> str:
+        """Retourne le chemin relatif, encore libre, du fichier d'une page."""
+        path = get_file_path_from_url(url, self.start_url)
+        stem = path[: -len(".md")]
+        suffix = 1
+        while path in self.paths:
+            suffix += 1
+            path = f"{stem}-{suffix}.md"
+        self.paths.add(path)
+        return path
+
+    def close(self) -> None:
+        """Ferme le fichier unique."""
+        if self.single_file is not None:
+            self.single_file.close()
+            self.single_file = None
+
+
+class OutputCrawl(SharedCrawl):
+    """
+    Crawl d'un site dont les pages sont écrites sur disque au lieu d'être gardées.
+
+    Il n'est attaché à aucune tâche : la progression est affichée sur la sortie
+    d'erreur et les pages ne restent pas en mémoire.
+    """
+
+    def __init__(self, start_url: str, writer: OutputWriter, quiet: bool = False):
+        super().__init__(get_crawl_key(start_url), start_url)
+        self.writer = writer
+        self.quiet = quiet
+        self.status = "running"
+        self.last_report = 0.0
+
+    def export_page(self, url: str, markdown: str) -> None:
+        """Écrit une page convertie dans les fichiers de sortie."""
+        self.writer.write(url, markdown)
+
+    def update_progress(self, **stats: int | str | None) -> None:
+        """Met à jour la progression et l'affiche au plus une fois par seconde."""
+        self.stats.update(stats)
+        now = time.monotonic()
+        if not self.quiet and now - self.last_report >= _PROGRESS_INTERVAL:
+            self.last_report = now
+            self.report()
+
+    async def complete(self, status: str = "completed") -> None:
+        """Ferme les fichiers de sortie."""
+        self.status = status
+        self.writer.close()
+        if not self.quiet:
+            self.report()
+
+    def report(self) -> None:
+        """Affiche la progression du crawl."""
+        print(
+            f"{self.start_url}: {self.stats['processed_pages']}/"
+            f"{self.stats['total_pages']} pages, {self.writer.count} écrites, "
+            f"{self.stats['failed_pages']} en échec",
+            file=sys.stderr,
+        )
+
+
+def get_output_name(url: str) -> str:
+    """Retourne le nom des sorties d'un site : dernier segment du chemin de son URL."""
+    path_segments = urlparse(url).path.strip("/").split("/")
+    name = path_segments[-1] if path_segments[-1] else "documentation"
+    return re.sub(r"[^a-zA-Z0-9\-_.]", "-", name)
+
+
+async def export_site(
+    url: str,
+    single_file: str | None = None,
+    tree_dir: str | None = None,
+    quiet: bool = False,
+    **options,
+) -> OutputCrawl:
+    """
+    Parcourt un site et écrit ses pages dans ``single_file`` et ``tree_dir``.
+
+    ``options`` est transmis au moteur de crawl (concurrence, périmètre, budgets,
+    profil d'extraction).
+    """
+    crawl = OutputCrawl(url, OutputWriter(url, single_file, tree_dir), quiet)
+    try:
+        await crawl_and_collect_async(crawl, **options)
+    finally:
+        # Crawl interrompu (Ctrl+C) : les pages déjà écrites restent lisibles
+        crawl.writer.close()
+    return crawl
+
+
+def get_outputs(args: argparse.Namespace, url: str, index: int) -> tuple[str | None, ...]:
+    """Retourne le fichier unique et le dossier de l'arborescence d'un site."""
+    if args.name and len(args.urls) == 1:
+        name = args.name
+    elif len(args.urls) == 1:
+        name = get_output_name(url)
+    else:
+        name = get_seed_folder(url, index)
+    base = os.path.join(args.output_dir, name)
+    single_file = f"{base}.md" if args.format in ("single_file", "both") else None
+    tree_dir = base if args.format in ("tree", "both") else None
+    return single_file, tree_dir
+
+
+def get_profile(args: argparse.Namespace) -> ExtractionProfile | None:
+    """Construit le profil d'extraction demandé, s'il y en a un."""
+    if not args.keep and not args.strip:
+        return None
+    return build_profile(args.keep, args.strip)
+
+
+async def run(args: argparse.Namespace) -> list[OutputCrawl]:
+    """
+    Parcourt simultanément tous les sites demandés et écrit leurs pages.
+
+    Avec plusieurs sites, chacun a ``max_per_host`` workers et les emplacements de
+    téléchargement (``max_concurrency``) sont répartis équitablement entre eux.
+    """
+    options = {
+        "max_per_host": args.max_per_host,
+        "use_cache": args.use_cache,
+        "use_bloom_filter": args.bloom,
+        "discovery": DiscoveryMode(args.discovery),
+        "max_pages": args.max_pages,
+        "max_depth": args.max_depth,
+        "max_bytes": args.max_bytes,
+        "time_budget": args.deadline,
+        "scope_path": args.scope_path,
+        "exclude": args.exclude,
+        "profile": get_profile(args),
+    }
+    if len(args.urls) == 1:
+        options["max_concurrency"] = args.max_concurrency or SCRAPER_MAX_CONCURRENCY
+    else:
+        options["max_concurrency"] = args.max_per_host
+        options["fair_share"] = FairShare(
+            args.max_concurrency or SCRAPER_BATCH_MAX_CONCURRENCY
+        )
+    try:
+        return await asyncio.gather(
+            *(
+                export_site(url, *get_outputs(args, url, index), args.quiet, **options)
+                for index, url in enumerate(args.urls)
+            )
+        )
+    finally:
+        await close_http_session()
+
+
+def positive_int(value: str) -> int:
+    """Lit un entier strictement positif."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"entier positif attendu: {value}")
+    return number
+
+
+def concurrency(value: str) -> int:
+    """Lit une concurrence, bornée comme dans l'API."""
+    number = positive_int(value)
+    if number > SCRAPER_CONCURRENCY_LIMIT:
+        raise argparse.ArgumentTypeError(f"au plus {SCRAPER_CONCURRENCY_LIMIT}: {value}")
+    return number
+
+
+def regex(value: str) -> str:
+    """Vérifie un motif d'exclusion."""
+    try:
+        re.compile(value)
+    except re.error as e:
+        raise argparse.ArgumentTypeError(f"expression régulière invalide: {e}") from e
+    return value
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Lit les paramètres de l'export."""
+    parser = argparse.ArgumentParser(
+        prog="doc-scraper", description=__doc__.strip().splitlines()[0]
+    )
+    parser.add_argument("urls", nargs="+", metavar="URL", help="URL de départ d'un site")
+
+    output = parser.add_argument_group("sorties")
+    output.add_argument(
+        "-o", "--output-dir", default="extract", help="Dossier des sorties (extract)"
+    )
+    output.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="both",
+        help="Fichier Markdown unique, arborescence de fichiers, ou les deux",
+    )
+    output.add_argument(
+        "--name", help="Nom des sorties d'un site seul (dernier segment de l'URL)"
+    )
+
+    crawl = parser.add_argument_group("crawl")
+    crawl.add_argument(
+        "-c",
+        "--max-concurrency",
+        type=concurrency,
+        help="Téléchargements simultanés, tous sites confondus",
+    )
+    crawl.add_argument(
+        "--max-per-host",
+        type=concurrency,
+        default=SCRAPER_MAX_PER_HOST,
+        help="Requêtes simultanées vers un même hôte",
+    )
+    crawl.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        help="Retélécharger et reconvertir les pages au lieu d'utiliser les caches",
+    )
+    crawl.add_argument(
+        "--bloom",
+        action="store_true",
+        help="Filtre de Bloom pour la déduplication des URLs (très grands sites)",
+    )
+
+    scope = parser.add_argument_group("périmètre")
+    scope.add_argument(
+        "--discovery",
+        choices=[mode.value for mode in DiscoveryMode],
+        default=DiscoveryMode.LINKS.value,
+        help="Suivre les liens, partir des sitemaps, ou les deux",
+    )
+    scope.add_argument(
+        "--scope-path", help="Préfixe de chemin des liens suivis (chemin de l'URL)"
+    )
+    scope.add_argument(
+        "--exclude",
+        action="append",
+        type=regex,
+        default=[],
+        help="Expression régulière des URLs à ignorer (répétable)",
+    )
+    scope.add_argument("--max-pages", type=positive_int, help="Nombre maximal de pages")
+    scope.add_argument("--max-depth", type=int, help="Nombre maximal de liens suivis")
+    scope.add_argument(
+        "--max-bytes", type=positive_int, help="Volume maximal de HTML téléchargé"
+    )
+    scope.add_argument("--deadline", type=float, help="Durée maximale du crawl (s)")
+    scope.add_argument(
+        "--keep",
+        action="append",
+        default=[],
+        help="Sélecteur CSS de la région de contenu (répétable)",
+    )
+    scope.add_argument(
+        "--strip",
+        action="append",
+        default=[],
+        help="Sélecteur CSS des éléments retirés du contenu (répétable)",
+    )
+
+    parser.add_argument("-q", "--quiet", action="store_true", help="Sans progression")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Lance l'export et retourne le code de sortie (1 si un site a échoué)."""
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.ERROR if args.quiet else logging.WARNING)
+    try:
+        crawls = asyncio.run(run(args))
+    except KeyboardInterrupt:
+        print("Export interrompu", file=sys.stderr)
+        return 130
+    finally:
+        shutdown_conversion_executor()
+
+    failed = False
+    for crawl, (index, url) in zip(crawls, enumerate(args.urls), strict=True):
+        single_file, tree_dir = get_outputs(args, url, index)
+        outputs = ", ".join(path for path in (single_file, tree_dir) if path)
+        print(f"{url}: {crawl.writer.count} pages ({crawl.status}) -> {outputs}")
+        failed = failed or crawl.status != "completed" or not crawl.writer.count
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
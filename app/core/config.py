@@ -0,0 +1,169 @@
+"""Configuration du service de scraping, lue depuis les variables d'environnement."""
+
+import os
+
+# Nombre maximal de pages téléchargées simultanément pour une tâche
+SCRAPER_MAX_CONCURRENCY = int(os.getenv("SCRAPER_MAX_CONCURRENCY", "10"))
+
+# Nombre maximal de requêtes simultanées vers un même hôte
+SCRAPER_MAX_PER_HOST = int(os.getenv("SCRAPER_MAX_PER_HOST", "10"))
+
+# Bornes acceptées pour les valeurs fournies dans une requête de scraping
+SCRAPER_CONCURRENCY_LIMIT = int(os.getenv("SCRAPER_CONCURRENCY_LIMIT", "64"))
+
+# Exécuteur de l'étape de conversion HTML -> Markdown : process, thread ou inline
+SCRAPER_CONVERSION_EXECUTOR = os.getenv("SCRAPER_CONVERSION_EXECUTOR", "process")
+
+# Nombre de workers de conversion (0 = nombre de cœurs)
+SCRAPER_CONVERSION_WORKERS = int(os.getenv("SCRAPER_CONVERSION_WORKERS", "0"))
+
+# Backend d'analyse HTML : lxml, ou html.parser (BeautifulSoup) en repli
+SCRAPER_HTML_PARSER = os.getenv("SCRAPER_HTML_PARSER", "lxml")
+
+# N'analyser que la région de contenu principal lorsqu'elle est présente
+SCRAPER_PARTIAL_PARSE = os.getenv("SCRAPER_PARTIAL_PARSE", "true").lower() == "true"
+
+# Cache HTTP persistant utilisé pour revalider les pages lors des crawls suivants
+SCRAPER_HTTP_CACHE_ENABLED = (
+    os.getenv("SCRAPER_HTTP_CACHE_ENABLED", "true").lower() == "true"
+)
+SCRAPER_HTTP_CACHE_DIR = os.getenv("SCRAPER_HTTP_CACHE_DIR", "output/http_cache")
+SCRAPER_HTTP_CACHE_MAX_BYTES = int(
+    os.getenv("SCRAPER_HTTP_CACHE_MAX_BYTES", str(512 * 1024 * 1024))
+)
+
+# Cache persistant des conversions : une page inchangée n'est ni analysée ni convertie
+SCRAPER_CONVERSION_CACHE_ENABLED = (
+    os.getenv("SCRAPER_CONVERSION_CACHE_ENABLED", "true").lower() == "true"
+)
+SCRAPER_CONVERSION_CACHE_DIR = os.getenv(
+    "SCRAPER_CONVERSION_CACHE_DIR", "output/conversion_cache"
+)
+SCRAPER_CONVERSION_CACHE_MAX_BYTES = int(
+    os.getenv("SCRAPER_CONVERSION_CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+)
+
+# Taille au-delà de laquelle une archive ZIP en construction bascule sur disque
+SCRAPER_SPOOL_MAX_BYTES = int(os.getenv("SCRAPER_SPOOL_MAX_BYTES", str(16 * 1024 * 1024)))
+
+# Niveau de compression des archives ZIP (0 = fichiers stockés sans compression,
+# 1 à 9 = Deflate, du plus rapide au plus compact)
+SCRAPER_ZIP_COMPRESSION_LEVEL = int(os.getenv("SCRAPER_ZIP_COMPRESSION_LEVEL", "6"))
+
+# Nombre de threads de compression des archives ZIP (0 = nombre de cœurs)
+SCRAPER_ZIP_WORKERS = int(os.getenv("SCRAPER_ZIP_WORKERS", "0"))
+
+# Taille des blocs envoyés lors des téléchargements en streaming
+SCRAPER_EXPORT_CHUNK_BYTES = int(os.getenv("SCRAPER_EXPORT_CHUNK_BYTES", str(64 * 1024)))
+
+# Stockage des tâches : durée de vie des tâches terminées et budget mémoire des résultats
+SCRAPER_TASK_STORE_DIR = os.getenv("SCRAPER_TASK_STORE_DIR", "output/tasks")
+SCRAPER_TASK_TTL_SECONDS = float(os.getenv("SCRAPER_TASK_TTL_SECONDS", str(24 * 3600)))
+SCRAPER_TASK_MEMORY_BYTES = int(
+    os.getenv("SCRAPER_TASK_MEMORY_BYTES", str(256 * 1024 * 1024))
+)
+
+# Réutiliser par défaut un crawl terminé depuis moins de N minutes (0 = désactivé)
+SCRAPER_REUSE_MAX_AGE_MINUTES = int(os.getenv("SCRAPER_REUSE_MAX_AGE_MINUTES", "0"))
+
+# Frontière en mode filtre de Bloom : capacité prévue et taux de faux positifs
+SCRAPER_BLOOM_CAPACITY = int(os.getenv("SCRAPER_BLOOM_CAPACITY", "1000000"))
+SCRAPER_BLOOM_ERROR_RATE = float(os.getenv("SCRAPER_BLOOM_ERROR_RATE", "0.001"))
+
+# Découverte par sitemap : nombre maximal de sitemaps lus et taille maximale d'un sitemap
+SCRAPER_SITEMAP_MAX_FILES = int(os.getenv("SCRAPER_SITEMAP_MAX_FILES", "100"))
+SCRAPER_SITEMAP_MAX_BYTES = int(
+    os.getenv("SCRAPER_SITEMAP_MAX_BYTES", str(50 * 1024 * 1024))
+)
+
+# Flux de progression SSE : intervalle minimal entre deux envois et keepalive
+SCRAPER_PROGRESS_MIN_INTERVAL = float(os.getenv("SCRAPER_PROGRESS_MIN_INTERVAL", "0.5"))
+SCRAPER_PROGRESS_KEEPALIVE_SECONDS = float(
+    os.getenv("SCRAPER_PROGRESS_KEEPALIVE_SECONDS", "15")
+)
+
+# Pool de connexions HTTP partagé : limites totale et par hôte, keep-alive, cache DNS
+SCRAPER_HTTP_POOL_LIMIT = int(os.getenv("SCRAPER_HTTP_POOL_LIMIT", "100"))
+SCRAPER_HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("SCRAPER_HTTP_POOL_LIMIT_PER_HOST", "0"))
+SCRAPER_HTTP_KEEPALIVE_SECONDS = float(os.getenv("SCRAPER_HTTP_KEEPALIVE_SECONDS", "30"))
+SCRAPER_HTTP_DNS_CACHE_TTL = int(os.getenv("SCRAPER_HTTP_DNS_CACHE_TTL", "300"))
+
+# Limitation adaptative du débit par hôte (requêtes par seconde, AIMD)
+SCRAPER_RATE_LIMIT_ENABLED = (
+    os.getenv("SCRAPER_RATE_LIMIT_ENABLED", "true").lower() == "true"
+)
+SCRAPER_RATE_INITIAL = float(os.getenv("SCRAPER_RATE_INITIAL", "20"))
+SCRAPER_RATE_MIN = float(os.getenv("SCRAPER_RATE_MIN", "0.2"))
+SCRAPER_RATE_MAX = float(os.getenv("SCRAPER_RATE_MAX", "100"))
+SCRAPER_RATE_INCREASE = float(os.getenv("SCRAPER_RATE_INCREASE", "1"))
+SCRAPER_RATE_DECREASE_FACTOR = float(os.getenv("SCRAPER_RATE_DECREASE_FACTOR", "0.5"))
+
+# Durée de validité des limites lues dans le robots.txt d'un hôte, relu ensuite
+SCRAPER_ROBOTS_TTL_SECONDS = float(os.getenv("SCRAPER_ROBOTS_TTL_SECONDS", "3600"))
+
+# Durée sans requête au-delà de laquelle le limiteur d'un hôte est oublié
+SCRAPER_RATE_LIMITER_IDLE_SECONDS = float(
+    os.getenv("SCRAPER_RATE_LIMITER_IDLE_SECONDS", "900")
+)
+
+# Attente maximale accordée à un en-tête Retry-After (réponses 429/503)
+SCRAPER_RETRY_AFTER_MAX_SECONDS = float(os.getenv("SCRAPER_RETRY_AFTER_MAX_SECONDS", "300"))
+
+# Nouvelles tentatives : nombre total de tentatives par page et backoff exponentiel
+SCRAPER_RETRY_MAX_ATTEMPTS = int(os.getenv("SCRAPER_RETRY_MAX_ATTEMPTS", "4"))
+SCRAPER_RETRY_BASE_DELAY = float(os.getenv("SCRAPER_RETRY_BASE_DELAY", "0.5"))
+SCRAPER_RETRY_MAX_DELAY = float(os.getenv("SCRAPER_RETRY_MAX_DELAY", "30"))
+
+# Délais d'une requête : connexion, lecture entre deux paquets et durée totale (0 = aucun)
+SCRAPER_CONNECT_TIMEOUT = float(os.getenv("SCRAPER_CONNECT_TIMEOUT", "10"))
+SCRAPER_READ_TIMEOUT = float(os.getenv("SCRAPER_READ_TIMEOUT", "30"))
+SCRAPER_REQUEST_TIMEOUT = float(os.getenv("SCRAPER_REQUEST_TIMEOUT", "60"))
+
+# Durée maximale d'un crawl en secondes (0 = illimitée)
+SCRAPER_CRAWL_TIME_BUDGET = float(os.getenv("SCRAPER_CRAWL_TIME_BUDGET", "0"))
+
+# Stockage des tâches partagé entre les processus de l'API, et file de travaux
+SCRAPER_TASK_BACKEND = os.getenv("SCRAPER_TASK_BACKEND", "sqlite")
+SCRAPER_WORKER_MAX_TASKS = int(os.getenv("SCRAPER_WORKER_MAX_TASKS", "8"))
+SCRAPER_JOB_POLL_INTERVAL = float(os.getenv("SCRAPER_JOB_POLL_INTERVAL", "0.5"))
+SCRAPER_JOB_STALE_SECONDS = float(os.getenv("SCRAPER_JOB_STALE_SECONDS", "30"))
+SCRAPER_CANCEL_WAIT_SECONDS = float(os.getenv("SCRAPER_CANCEL_WAIT_SECONDS", "5"))
+
+# Nombre maximal de pages téléchargées simultanément pour tout un lot de sites
+SCRAPER_BATCH_MAX_CONCURRENCY = int(os.getenv("SCRAPER_BATCH_MAX_CONCURRENCY", "32"))
+
+# Canonicalisation des URLs : paramètres de requête conservés (vide = tous) ou retirés
+# (motifs shell, séparés par des virgules), fichiers d'index retirés du chemin,
+# chemin mis en minuscules et tri des paramètres
+SCRAPER_CANONICAL_QUERY_ALLOW = os.getenv("SCRAPER_CANONICAL_QUERY_ALLOW", "")
+SCRAPER_CANONICAL_QUERY_DENY = os.getenv(
+    "SCRAPER_CANONICAL_QUERY_DENY", "utm_*,fbclid,gclid,msclkid,mc_cid,mc_eid"
+)
+SCRAPER_CANONICAL_INDEX_FILES = os.getenv(
+    "SCRAPER_CANONICAL_INDEX_FILES", "index.html,index.htm,index.php"
+)
+SCRAPER_CANONICAL_LOWERCASE_PATH = (
+    os.getenv("SCRAPER_CANONICAL_LOWERCASE_PATH", "false").lower() == "true"
+)
+SCRAPER_CANONICAL_SORT_QUERY = (
+    os.getenv("SCRAPER_CANONICAL_SORT_QUERY", "true").lower() == "true"
+)
+
+# Suivre les <link rel="canonical"> et dédupliquer les pages de contenu identique
+SCRAPER_HONOR_CANONICAL = os.getenv("SCRAPER_HONOR_CANONICAL", "true").lower() == "true"
+SCRAPER_DEDUP_CONTENT = os.getenv("SCRAPER_DEDUP_CONTENT", "true").lower() == "true"
+
+# Fichier JSON de profils d'extraction par hôte, ajoutés aux profils intégrés
+SCRAPER_EXTRACTION_PROFILES = os.getenv("SCRAPER_EXTRACTION_PROFILES", "")
+
+# Nombre maximal de pages renvoyées par une tranche de /api/result/{task_id}/pages
+SCRAPER_RESULT_PAGES_MAX_LIMIT = int(os.getenv("SCRAPER_RESULT_PAGES_MAX_LIMIT", "500"))
+
+# Intervalle de mesure du retard de la boucle d'événements (0 = désactivé)
+SCRAPER_METRICS_LOOP_LAG_INTERVAL = float(
+    os.getenv("SCRAPER_METRICS_LOOP_LAG_INTERVAL", "0.25")
+)
+
+# Intervalle d'enregistrement du point de reprise des crawls, en secondes
+# (0 = crawls sans point de reprise)
+SCRAPER_CHECKPOINT_INTERVAL = float(os.getenv("SCRAPER_CHECKPOINT_INTERVAL", "5"))
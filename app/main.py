@@ -6,6 +6,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.api import api_router
+from app.services.export_service import shutdown_zip_executor
+from app.services.html_converter import shutdown_conversion_executor
+from app.services.http_client import close_http_session, get_http_session
+from app.services.metrics import start_loop_lag_monitor, stop_loop_lag_monitor
+from app.services.scraper_service import get_job_runner, stop_job_runner
+from app.services.task_store import close_task_store
 
 
 @asynccontextmanager
@@ -15,8 +21,21 @@ async def lifespan(app: FastAPI):
     os.makedirs("output/single", exist_ok=True)
     os.makedirs("output/tree", exist_ok=True)
 
+    # Client HTTP partagé par tous les crawls
+    get_http_session()
+    # Boucle qui réclame les tâches en attente pour ce processus
+    get_job_runner().start()
+    # Mesure du retard de la boucle d'événements (/api/metrics)
+    start_loop_lag_monitor()
+
     yield
     # Cleanup on shutdown
+    await stop_loop_lag_monitor()
+    await stop_job_runner()
+    await close_http_session()
+    shutdown_conversion_executor()
+    shutdown_zip_executor()
+    close_task_store()
 
 
 app = FastAPI(
@@ -1,9 +1,20 @@
 """Schémas pour l'API de scraping."""
 
+import re
 from datetime import datetime
 from enum import Enum
 
-from pydantic import BaseModel, ConfigDict, HttpUrl, field_validator
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    HttpUrl,
+    computed_field,
+    field_validator,
+)
+
+from app.core.config import SCRAPER_CONCURRENCY_LIMIT
+from app.services.html_converter import find_selector_error
 
 
 class ExportFormat(str, Enum):
@@ -14,12 +25,121 @@ class ExportFormat(str, Enum):
     ZIP_FLAT = "zip_flat"
 
 
+class FrontierMode(str, Enum):
+    """Mode de déduplication des URLs découvertes pendant le crawl."""
+
+    EXACT = "exact"
+    BLOOM = "bloom"
+
+
+class DiscoveryMode(str, Enum):
+    """Mode de découverte des pages à parcourir."""
+
+    LINKS = "links"
+    SITEMAP = "sitemap"
+    SITEMAP_AND_LINKS = "sitemap_and_links"
+
+
+class ExtractionRules(BaseModel):
+    """Schéma d'un profil d'extraction fourni avec une requête de scraping."""
+
+    keep: list[str] = Field(
+        default=[],
+        description=(
+            "Sélecteurs CSS de la région de contenu, par ordre de priorité "
+            "(vide = sélecteurs par défaut)"
+        ),
+    )
+    strip: list[str] = Field(
+        default=[],
+        description="Sélecteurs CSS des éléments retirés de la région (vide = défaut)",
+    )
+
+    @field_validator("keep", "strip")
+    @classmethod
+    def validate_selectors(cls, v):
+        """Vérifie que le backend d'analyse configuré sait appliquer les sélecteurs."""
+        for selector in v:
+            error = find_selector_error(selector)
+            if error is not None:
+                raise ValueError(f"Sélecteur CSS invalide {selector!r}: {error}")
+        return v
+
+
 class ScraperRequest(BaseModel):
     """Schéma pour la requête de scraping."""
 
     url: HttpUrl
     format: ExportFormat = ExportFormat.SINGLE_FILE
     filename: str | None = None
+    max_concurrency: int | None = Field(
+        default=None,
+        ge=1,
+        le=SCRAPER_CONCURRENCY_LIMIT,
+        description="Nombre maximal de pages téléchargées simultanément",
+    )
+    max_per_host: int | None = Field(
+        default=None,
+        ge=1,
+        le=SCRAPER_CONCURRENCY_LIMIT,
+        description="Nombre maximal de requêtes simultanées vers un même hôte",
+    )
+    use_cache: bool = Field(
+        default=True,
+        description=(
+            "Revalider les pages déjà téléchargées au lieu de les retélécharger, et "
+            "réutiliser la conversion des pages inchangées"
+        ),
+    )
+    reuse_max_age_minutes: int | None = Field(
+        default=None,
+        ge=0,
+        description="Réutiliser un crawl du même site terminé depuis moins de N minutes",
+    )
+    discovery: DiscoveryMode = Field(
+        default=DiscoveryMode.LINKS,
+        description=(
+            "Suivre les liens, partir des sitemaps (liens suivis en repli si aucun "
+            "sitemap n'est trouvé), ou combiner les deux"
+        ),
+    )
+    frontier_mode: FrontierMode = Field(
+        default=FrontierMode.EXACT,
+        description="Déduplication exacte, ou filtre de Bloom pour les très grands sites",
+    )
+    max_pages: int | None = Field(
+        default=None,
+        ge=1,
+        description="Nombre maximal de pages parcourues",
+    )
+    max_depth: int | None = Field(
+        default=None,
+        ge=0,
+        description="Nombre maximal de liens suivis depuis l'URL de départ",
+    )
+    max_bytes: int | None = Field(
+        default=None,
+        ge=1,
+        description="Volume maximal de HTML téléchargé, en octets",
+    )
+    deadline_seconds: float | None = Field(
+        default=None,
+        gt=0,
+        description="Durée maximale du crawl en secondes",
+    )
+    extraction: ExtractionRules | None = Field(
+        default=None,
+        description="Profil d'extraction, à la place du profil enregistré pour l'hôte",
+    )
+    compression_level: int | None = Field(
+        default=None,
+        ge=0,
+        le=9,
+        description=(
+            "Niveau de compression des archives ZIP : 0 stocke les fichiers sans "
+            "compression (le plus rapide), 9 produit l'archive la plus petite"
+        ),
+    )
 
     @field_validator("url")
     @classmethod
@@ -38,6 +158,96 @@ class ScraperRequest(BaseModel):
         return v
 
 
+class BatchExportMode(str, Enum):
+    """Organisation de l'export d'un lot de sites."""
+
+    COMBINED = "combined"
+    PER_SEED = "per_seed"
+
+
+class BatchSeed(BaseModel):
+    """Schéma d'une racine de documentation d'un lot, avec son propre périmètre."""
+
+    url: HttpUrl
+    scope_path: str | None = Field(
+        default=None,
+        description=(
+            "Préfixe de chemin des pages suivies (par défaut le chemin de l'URL de départ)"
+        ),
+    )
+    exclude: list[str] = Field(
+        default=[],
+        description="Expressions régulières des URLs à ne pas parcourir",
+    )
+    discovery: DiscoveryMode = DiscoveryMode.LINKS
+    max_pages: int | None = Field(default=None, ge=1)
+    max_depth: int | None = Field(default=None, ge=0)
+    max_bytes: int | None = Field(default=None, ge=1)
+    extraction: ExtractionRules | None = None
+
+    @field_validator("exclude")
+    @classmethod
+    def validate_exclude(cls, v):
+        """Vérifie que les motifs d'exclusion sont des expressions régulières valides."""
+        for pattern in v:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"Motif d'exclusion invalide {pattern!r}: {e}") from e
+        return v
+
+
+class BatchScraperRequest(BaseModel):
+    """Schéma pour la requête de scraping d'un lot de sites en une seule tâche."""
+
+    seeds: list[BatchSeed] = Field(..., min_length=1)
+    format: ExportFormat = ExportFormat.ZIP_FILES
+    export_mode: BatchExportMode = Field(
+        default=BatchExportMode.COMBINED,
+        description=(
+            "Un export unique regroupant tous les sites, ou une archive contenant "
+            "un export par site"
+        ),
+    )
+    filename: str | None = None
+    max_concurrency: int | None = Field(
+        default=None,
+        ge=1,
+        le=SCRAPER_CONCURRENCY_LIMIT,
+        description="Nombre maximal de pages téléchargées simultanément pour tout le lot",
+    )
+    max_per_host: int | None = Field(
+        default=None,
+        ge=1,
+        le=SCRAPER_CONCURRENCY_LIMIT,
+        description="Nombre maximal de requêtes simultanées vers un même hôte",
+    )
+    use_cache: bool = True
+    frontier_mode: FrontierMode = FrontierMode.EXACT
+    deadline_seconds: float | None = Field(
+        default=None,
+        gt=0,
+        description="Durée maximale du crawl de chaque site en secondes",
+    )
+    compression_level: int | None = Field(
+        default=None,
+        ge=0,
+        le=9,
+        description=(
+            "Niveau de compression des archives ZIP : 0 stocke les fichiers sans "
+            "compression (le plus rapide), 9 produit l'archive la plus petite"
+        ),
+    )
+
+    @field_validator("filename")
+    @classmethod
+    def validate_filename(cls, v):
+        """Vérifie que le nom de fichier est valide."""
+        if v and not v.strip():
+            return None
+        return v
+
+
 class ScraperResponse(BaseModel):
     """Schéma pour la réponse de création d'une tâche de scraping."""
 
@@ -47,6 +257,43 @@ class ScraperResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class FailedPage(BaseModel):
+    """Schéma d'une page dont le téléchargement a définitivement échoué."""
+
+    url: str
+    status: int | None = None
+    reason: str
+    attempts: int = 1
+
+
+class SeedStatus(BaseModel):
+    """Schéma de la progression d'une racine d'un lot."""
+
+    url: str
+    folder: str | None = None
+    status: str
+    progress: int = 0
+    processed_pages: int = 0
+    total_pages: int = 0
+    failed_pages: int = 0
+    downloaded_bytes: int = 0
+    stop_reason: str | None = None
+
+
+class StageTiming(BaseModel):
+    """Schéma des durées cumulées d'une étape du traitement des pages d'une tâche."""
+
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @computed_field
+    @property
+    def mean_seconds(self) -> float:
+        """Durée moyenne de l'étape."""
+        return self.total_seconds / self.count if self.count else 0.0
+
+
 class TaskStatus(BaseModel):
     """Schéma pour le statut d'une tâche de scraping."""
 
@@ -58,8 +305,24 @@ class TaskStatus(BaseModel):
     progress: int = 0
     processed_pages: int = 0
     total_pages: int = 0
+    queued_pages: int = 0
+    in_flight_pages: int = 0
+    failed_pages: int = 0
+    duplicate_pages: int = 0
+    throttled_requests: int = 0
+    downloaded_bytes: int = 0
+    failures: list[FailedPage] = []
+    stop_reason: str | None = None
+    current_url: str | None = None
+    cache_hits: int = 0
+    cache_misses: int = 0
+    reused_from: str | None = None
+    resumed_from: str | None = None
     format: ExportFormat = ExportFormat.SINGLE_FILE
     filename: str | None = None
+    export_mode: BatchExportMode | None = None
+    seeds: list[SeedStatus] = []
+    timings: dict[str, StageTiming] = {}
     model_config = ConfigDict(from_attributes=True)
 
 
@@ -74,3 +337,26 @@ class ContentResponse(BaseModel):
     format: ExportFormat = ExportFormat.SINGLE_FILE
     filename: str | None = None
     model_config = ConfigDict(from_attributes=True)
+
+
+class PageContent(BaseModel):
+    """Schéma du contenu Markdown d'une page."""
+
+    url: str
+    markdown: str
+
+
+class PagesResponse(BaseModel):
+    """Schéma d'une tranche des pages d'une tâche de scraping, en cours ou terminée."""
+
+    task_id: str
+    status: str
+    offset: int
+    total: int = Field(description="Nombre de pages disponibles au moment de la lecture")
+    complete: bool = Field(
+        description="Vrai si la tâche est terminée : total est définitif"
+    )
+    next_offset: int | None = Field(
+        default=None, description="Position de la tranche suivante (absente à la fin)"
+    )
+    pages: list[PageContent] = []
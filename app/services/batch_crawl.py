@@ -0,0 +1,197 @@
+"""Lots de sites parcourus ensemble pour une seule tâche."""
+
+import asyncio
+
+from app.schemas.scraper_schemas import BatchExportMode, ExportFormat
+from app.services.crawl_scheduler import FairShare
+from app.services.export_service import (
+    ZipExport,
+    build_batch_readme,
+    build_readme,
+    get_seed_folder,
+    markdown_size,
+)
+from app.services.metrics import merge_timings, time_stage
+from app.services.progress_events import publish_progress
+from app.services.shared_crawl import SharedCrawl, complete_task, wait_completion
+from app.services.task_store import get_task_store
+
+# Compteurs des racines additionnés dans la progression du lot
+_SUMMED_STATS = (
+    "processed_pages",
+    "total_pages",
+    "queued_pages",
+    "in_flight_pages",
+    "failed_pages",
+    "duplicate_pages",
+    "throttled_requests",
+    "downloaded_bytes",
+    "cache_hits",
+    "cache_misses",
+)
+
+
+class SeedCrawl(SharedCrawl):
+    """
+    Crawl d'une racine d'un lot.
+
+    Ses pages et sa progression sont remontées au lot plutôt qu'à des tâches
+    attachées : il n'est pas partagé avec les autres tâches.
+    """
+
+    def __init__(self, batch: "BatchCrawl", index: int, seed: dict):
+        super().__init__(f"{batch.task_id}:{index}", seed["url"])
+        self.batch = batch
+        self.seed = seed
+        self.folder = get_seed_folder(seed["url"], index)
+        self.status = "running"
+
+    def export_page(self, url: str, markdown: str) -> None:
+        """Enregistre une page convertie et l'ajoute à l'export du lot."""
+        super().export_page(url, markdown)
+        self.batch.add_page(self, url, markdown)
+
+    def update_progress(self, **stats: int | str | None) -> None:
+        """Met à jour la progression de la racine et celle du lot."""
+        self.stats.update(stats)
+        self.batch.update_progress()
+
+    async def complete(self, status: str = "completed") -> None:
+        """Marque la racine comme terminée ; l'export est terminé avec le lot."""
+        self.status = status
+        self.batch.update_progress()
+
+    def snapshot(self) -> dict:
+        """Retourne la progression de la racine."""
+        return {
+            "url": self.start_url,
+            "folder": self.folder,
+            "status": self.status,
+            "progress": self.stats["progress"],
+            "processed_pages": self.stats["processed_pages"],
+            "total_pages": self.stats["total_pages"],
+            "failed_pages": self.stats["failed_pages"],
+            "downloaded_bytes": self.stats["downloaded_bytes"],
+            "stop_reason": self.stats["stop_reason"],
+        }
+
+
+class BatchCrawl:
+    """
+    Lot de racines de documentation parcourues par une seule tâche.
+
+    Les racines sont parcourues simultanément et se partagent les emplacements
+    de téléchargement du lot (``FairShare``) : le lot dure à peu près le temps de
+    son plus grand site plutôt que la somme de tous. L'export regroupe toutes les
+    racines (``combined``) ou contient un export distinct par racine
+    (``per_seed``) ; dans une archive ZIP, chaque racine a son dossier.
+    """
+
+    def __init__(self, task_id: str, task: dict):
+        self.task_id = task_id
+        self.export_format = ExportFormat(task["format"])
+        self.export_mode = BatchExportMode(task["export_mode"])
+        self.fair_share = FairShare(task["max_concurrency"])
+        # Tâche asyncio qui exécute le lot (gardée pour pouvoir l'annuler)
+        self.runner: asyncio.Task | None = None
+        # Vrai une fois l'export terminé : les workers interrompus n'y touchent plus
+        self.done = False
+        self.crawls = [
+            SeedCrawl(self, index, seed)
+            for index, seed in enumerate(task["options"]["seeds"])
+        ]
+        self.zip_export = None
+        if (
+            self.export_mode == BatchExportMode.PER_SEED
+            or self.export_format != ExportFormat.SINGLE_FILE
+        ):
+            self.zip_export = ZipExport(
+                task["url"],
+                self.export_format,
+                compression_level=task.get("compression_level"),
+                path=get_task_store().export_path(task_id),
+            )
+
+    def add_page(self, crawl: SeedCrawl, url: str, markdown: str) -> None:
+        """Ajoute une page au journal du lot et au dossier de sa racine dans l'archive."""
+        if self.done:
+            return
+        get_task_store().append_page(self.task_id, url, markdown)
+        if self.zip_export is not None and self.export_format != ExportFormat.SINGLE_FILE:
+            with time_stage("zip_write", crawl.timings):
+                self.zip_export.add_page(url, markdown, crawl.folder, crawl.start_url)
+
+    def update_progress(self) -> None:
+        """Met à jour la progression de la tâche : totaux du lot et détail par racine."""
+        if self.done:
+            return
+        task = get_task_store()[self.task_id]
+        seeds = [crawl.snapshot() for crawl in self.crawls]
+        for key in _SUMMED_STATS:
+            task[key] = sum(crawl.stats[key] for crawl in self.crawls)
+        task["progress"] = sum(seed["progress"] for seed in seeds) // len(seeds)
+        task["seeds"] = seeds
+        task["failures"] = self.failures()
+        task["timings"] = merge_timings([crawl.timings for crawl in self.crawls])
+        publish_progress(self.task_id)
+
+    def failures(self) -> list[dict]:
+        """Retourne les pages en échec de toutes les racines."""
+        return [failure for crawl in self.crawls for failure in crawl.failures]
+
+    def url_to_markdown(self) -> dict[str, str]:
+        """Retourne les pages de toutes les racines, dans l'ordre des racines."""
+        return {
+            url: markdown
+            for crawl in self.crawls
+            for url, markdown in crawl.url_to_markdown.items()
+        }
+
+    async def cancel(self) -> None:
+        """Annule le lot en livrant les pages déjà collectées."""
+        if self.done:
+            # Export déjà en cours de finalisation : le lot se termine normalement
+            await wait_completion(self.task_id)
+            return
+        if self.runner is not None:
+            self.runner.cancel()
+        for crawl in self.crawls:
+            if crawl.status == "running":
+                crawl.status = "cancelled"
+        await self.complete(status="cancelled")
+
+    async def complete(self, status: str = "completed") -> None:
+        """Termine l'export du lot et marque la tâche comme terminée."""
+        if self.done:
+            return
+        self.update_progress()
+        self.done = True
+        failures = self.failures()
+        readme = None
+        if self.zip_export is not None:
+            if self.export_mode == BatchExportMode.PER_SEED:
+                self.add_seed_exports()
+            readme = build_batch_readme(get_task_store()[self.task_id]["seeds"], failures)
+
+        url_to_markdown = self.url_to_markdown()
+        await complete_task(
+            self.task_id,
+            url_to_markdown,
+            self.zip_export,
+            markdown_size(url_to_markdown.values()),
+            failures,
+            status,
+            readme,
+        )
+
+    def add_seed_exports(self) -> None:
+        """Ajoute à l'archive le fichier Markdown unique ou le README de chaque racine."""
+        for crawl in self.crawls:
+            if self.export_format == ExportFormat.SINGLE_FILE:
+                content = "\n\n".join(crawl.url_to_markdown.values())
+                self.zip_export.add_file(f"{crawl.folder}.md", content)
+            else:
+                readme = build_readme(
+                    crawl.start_url, crawl.url_to_markdown, crawl.failures
+                )
+                self.zip_export.add_file(f"{crawl.folder}/README.md", readme)
@@ -0,0 +1,70 @@
+"""Cache persistant des conversions HTML vers Markdown, indexé par contenu."""
+
+import json
+import logging
+import os
+
+from app.core.config import (
+    SCRAPER_CONVERSION_CACHE_DIR,
+    SCRAPER_CONVERSION_CACHE_ENABLED,
+    SCRAPER_CONVERSION_CACHE_MAX_BYTES,
+)
+from app.services.disk_cache import DiskCache
+from app.services.html_converter import ExtractedPage
+
+# Cache partagé entre les tâches (créé à la première utilisation)
+_conversion_cache: "ConversionCache | None" = None
+
+
+class ConversionCache(DiskCache):
+    """
+    Cache sur disque du résultat de la conversion des pages, indexé par clé de contenu.
+
+    La clé (``conversion_key``) couvre le HTML de la page et tout ce dont dépend
+    sa conversion : une entrée ne devient jamais fausse, elle cesse seulement
+    d'être demandée. Chaque entrée est un fichier JSON (Markdown, liens, URL
+    canonique). La taille totale est bornée : les entrées les moins récemment
+    utilisées sont supprimées en premier.
+    """
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> ExtractedPage | None:
+        """Retourne la conversion associée à la clé, ou ``None`` si elle est absente."""
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as entry_file:
+                entry = json.load(entry_file)
+            page = ExtractedPage(
+                entry["markdown"], entry["links"], entry["canonical_url"], {}
+            )
+            # Marquer l'entrée comme récemment utilisée
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return page
+
+    def put(self, key: str, page: ExtractedPage) -> None:
+        """Enregistre une conversion, puis applique la limite de taille."""
+        entry = json.dumps(
+            {
+                "markdown": page.markdown,
+                "links": page.links,
+                "canonical_url": page.canonical_url,
+            }
+        )
+        try:
+            self.write_entry(os.path.join(self.directory, key), {".json": entry})
+        except OSError as e:
+            logging.warning(f"Impossible d'écrire dans le cache des conversions: {e}")
+
+
+def get_conversion_cache() -> ConversionCache | None:
+    """Retourne le cache des conversions partagé, ou ``None`` s'il est désactivé."""
+    global _conversion_cache
+    if _conversion_cache is None and SCRAPER_CONVERSION_CACHE_ENABLED:
+        _conversion_cache = ConversionCache(
+            SCRAPER_CONVERSION_CACHE_DIR, SCRAPER_CONVERSION_CACHE_MAX_BYTES
+        )
+    return _conversion_cache
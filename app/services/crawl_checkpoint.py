@@ -0,0 +1,192 @@
+"""Points de reprise des crawls : état de la frontière et pages, en ajout seul."""
+
+import json
+import logging
+import os
+import shutil
+import time
+from typing import NamedTuple
+
+from app.core.config import SCRAPER_CHECKPOINT_INTERVAL
+from app.services.page_log import PageLog, read_pages
+
+# Journal des événements de la frontière, à côté du journal des pages du crawl
+JOURNAL_FILE = "frontier.jsonl"
+
+# Compteurs du crawl qui ne se déduisent pas de la frontière
+CHECKPOINT_STATS = (
+    "downloaded_bytes",
+    "cache_hits",
+    "cache_misses",
+    "throttled_requests",
+    "duplicate_pages",
+)
+
+
+class CheckpointState(NamedTuple):
+    """État d'un crawl interrompu, relu depuis son point de reprise."""
+
+    # URLs mises en file, avec leur profondeur, dans l'ordre de leur découverte
+    queued: dict[str, int]
+    # URLs canoniques marquées vues sans être mises en file
+    aliases: set[str]
+    # URLs dont le traitement est terminé (page enregistrée, doublon ou échec)
+    done: set[str]
+    pages: list[dict]
+    failures: list[dict]
+    stats: dict
+    # Taille de la partie lisible du journal, complétée par la reprise
+    journal_size: int
+
+
+class CrawlCheckpoint:
+    """
+    Point de reprise d'un crawl, enregistré dans ``directory``.
+
+    Chaque page convertie est ajoutée aussitôt au journal des pages du crawl. Les
+    événements de la frontière (URL mise en file, marquée vue, terminée) et les
+    échecs sont gardés en mémoire et ajoutés au journal de la frontière toutes les
+    ``interval`` secondes, avec les compteurs du crawl : une interruption ne perd
+    que les événements des dernières secondes. Une page déjà enregistrée sous son
+    URL n'est pas téléchargée de nouveau, même si elle n'a pas été marquée terminée.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        state: CheckpointState | None = None,
+        interval: float = SCRAPER_CHECKPOINT_INTERVAL,
+    ):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.interval = interval
+        # Avec ``state``, le point de reprise relu est complété ; sinon il est vidé
+        self.pages = PageLog(directory, append=state is not None)
+        journal_path = os.path.join(directory, JOURNAL_FILE)
+        self.journal = open(journal_path, "r+b" if state is not None else "wb")
+        # Ligne interrompue en fin de journal : retirée avant de le compléter
+        journal_size = state.journal_size if state is not None else 0
+        self.journal.truncate(journal_size)
+        self.journal.seek(journal_size)
+        self._records: list[bytes] = []
+        self._last_flush = time.monotonic()
+
+    def record(self, kind: str, *values) -> None:
+        """Ajoute un événement de la frontière au prochain enregistrement."""
+        self._records.append(json.dumps([kind, *values]).encode("utf-8") + b"\n")
+
+    def add_page(self, url: str, markdown: str) -> None:
+        """Enregistre une page convertie."""
+        self.pages.append(url, markdown)
+
+    def maybe_flush(self, stats: dict) -> None:
+        """Enregistre les événements en attente si l'intervalle est écoulé."""
+        if time.monotonic() - self._last_flush >= self.interval:
+            self.flush(stats)
+
+    def flush(self, stats: dict) -> None:
+        """Enregistre les événements en attente et les compteurs du crawl."""
+        self.record("stats", {key: stats.get(key, 0) for key in CHECKPOINT_STATS})
+        try:
+            self.journal.writelines(self._records)
+            self.journal.flush()
+        except OSError as e:
+            logging.error(f"Point de reprise non enregistré ({self.directory}): {e}")
+        self._records.clear()
+        self._last_flush = time.monotonic()
+
+    def close(self, stats: dict) -> None:
+        """Enregistre les événements en attente et ferme le point de reprise."""
+        if self.journal.closed:
+            return
+        self.flush(stats)
+        self.journal.close()
+        self.pages.close()
+
+    def discard(self) -> None:
+        """Supprime le point de reprise d'un crawl terminé."""
+        if not self.journal.closed:
+            self.journal.close()
+            self.pages.close()
+        discard_checkpoint(self.directory)
+
+
+def load_checkpoint(directory: str) -> CheckpointState | None:
+    """
+    Relit le point de reprise enregistré dans ``directory``.
+
+    Le journal est relu jusqu'à sa dernière ligne complète. Retourne ``None`` s'il
+    n'y a pas de point de reprise.
+    """
+    state = CheckpointState({}, set(), set(), [], [], {}, 0)
+    try:
+        with open(os.path.join(directory, JOURNAL_FILE), "rb") as journal:
+            journal_size = 0
+            for line in journal:
+                record = parse_record(line)
+                if record is None:
+                    break
+                apply_record(state, *record)
+                journal_size += len(line)
+    except FileNotFoundError:
+        return None
+    pages, _ = read_pages(directory)
+    return state._replace(pages=pages, journal_size=journal_size)
+
+
+def parse_record(line: bytes) -> list | None:
+    """Décode une ligne du journal ; retourne ``None`` pour une ligne interrompue."""
+    if not line.endswith(b"\n"):
+        return None
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    return record if isinstance(record, list) and record else None
+
+
+def apply_record(state: CheckpointState, kind: str, *values) -> None:
+    """Applique un événement du journal à l'état relu."""
+    if kind == "add":
+        state.queued.setdefault(values[0], values[1])
+    elif kind == "seen":
+        state.aliases.add(values[0])
+    elif kind == "done":
+        state.done.add(values[0])
+    elif kind == "failure":
+        state.failures.append(values[0])
+    elif kind == "stats":
+        state.stats.update(values[0])
+
+
+def has_checkpoint(directory: str) -> bool:
+    """Indique si ``directory`` contient un point de reprise, ou celui d'une racine d'un lot."""
+    try:
+        entries = os.listdir(directory)
+    except (FileNotFoundError, NotADirectoryError):
+        return False
+    return JOURNAL_FILE in entries or any(
+        has_checkpoint(os.path.join(directory, entry)) for entry in entries
+    )
+
+
+def discard_checkpoint(directory: str) -> None:
+    """Supprime un point de reprise, avec ceux des racines d'un lot."""
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def move_checkpoint(source: str, target: str) -> bool:
+    """
+    Transmet le point de reprise ``source`` à ``target`` (reprise par une autre tâche).
+
+    Retourne ``False`` s'il n'y a pas de point de reprise à transmettre.
+    """
+    if not has_checkpoint(source):
+        return False
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        os.replace(source, target)
+    except OSError as e:
+        logging.error(f"Point de reprise non transmis ({source}): {e}")
+        return False
+    return True
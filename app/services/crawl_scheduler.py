@@ -0,0 +1,212 @@
+"""Ordonnanceur de crawl à fenêtre glissante."""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+from app.services.rate_limiter import get_rate_limiter
+from app.services.retry_policy import FetchError, RetryPolicy
+from app.services.url_frontier import UrlFrontier
+
+UrlHandler = Callable[[str], Awaitable[Iterable[str]]]
+FailureHandler = Callable[[str, FetchError, int], None]
+
+
+class FairShare:
+    """
+    Emplacements de téléchargement partagés équitablement par les crawls d'un lot.
+
+    Tant qu'il reste des emplacements libres, ils sont accordés immédiatement ;
+    sinon chaque emplacement libéré est attribué à tour de rôle aux hôtes en
+    attente, quel que soit le nombre de workers de chacun : un grand site ne peut
+    pas priver les petits de téléchargements. Les sémaphores par hôte sont eux
+    aussi partagés, pour que deux racines d'un même hôte respectent ensemble
+    ``max_per_host``.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.active = 0
+        self.host_limits: dict[str, asyncio.Semaphore] = {}
+        self._waiters: OrderedDict[str, deque[asyncio.Future]] = OrderedDict()
+
+    @asynccontextmanager
+    async def slot(self, host: str) -> AsyncIterator[None]:
+        """Occupe un emplacement pendant le téléchargement d'une page de l'hôte."""
+        await self.acquire(host)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, host: str) -> None:
+        """Attend qu'un emplacement soit attribué à l'hôte."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(host, deque()).append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Emplacement attribué juste avant l'annulation : le passer au suivant
+                self.release()
+            else:
+                # Toujours en attente : ne plus compter dans le tour de rôle des hôtes
+                self._remove_waiter(host, future)
+            raise
+
+    def release(self) -> None:
+        """Libère un emplacement et l'attribue à l'hôte suivant en attente."""
+        self.active -= 1
+        while self.active < self.limit and self._waiters:
+            host, waiters = next(iter(self._waiters.items()))
+            future = waiters.popleft()
+            if waiters:
+                self._waiters.move_to_end(host)
+            else:
+                del self._waiters[host]
+            if not future.cancelled():
+                future.set_result(None)
+                self.active += 1
+
+    def _remove_waiter(self, host: str, future: asyncio.Future) -> None:
+        waiters = self._waiters.get(host)
+        if waiters is None or future not in waiters:
+            return
+        waiters.remove(future)
+        if not waiters:
+            del self._waiters[host]
+
+
+def get_host_limit(
+    host_limits: dict[str, asyncio.Semaphore], url: str, max_per_host: int
+) -> asyncio.Semaphore:
+    """Retourne le sémaphore qui borne les requêtes simultanées vers l'hôte de l'URL."""
+    host = urlparse(url).netloc
+    host_limit = host_limits.get(host)
+    if host_limit is None:
+        host_limit = host_limits[host] = asyncio.Semaphore(max_per_host)
+    return host_limit
+
+
+async def run_handler(
+    handler: UrlHandler,
+    url: str,
+    host_limits: dict[str, asyncio.Semaphore],
+    max_per_host: int,
+    fair_share: FairShare | None,
+) -> Iterable[str]:
+    """
+    Exécute le handler d'une URL dans les limites de son hôte et du lot.
+
+    Le débit de l'hôte (``Crawl-delay``, pause après une réponse 429/503) est
+    attendu avant d'occuper un emplacement du lot : un hôte ralenti ne retient
+    pas d'emplacements pendant qu'il attend, au détriment des autres sites.
+    """
+    host = urlparse(url).netloc
+    async with get_host_limit(host_limits, url, max_per_host):
+        limiter = get_rate_limiter().for_host(host)
+        if limiter is not None:
+            await limiter.acquire()
+        if fair_share is None:
+            return await handler(url)
+        async with fair_share.slot(host):
+            return await handler(url)
+
+
+def handle_error(
+    frontier: UrlFrontier,
+    url: str,
+    exception: Exception,
+    retry_policy: RetryPolicy,
+    on_failure: FailureHandler | None,
+) -> float | None:
+    """
+    Retourne le délai avant une nouvelle tentative de l'URL en échec.
+
+    Retourne ``None`` pour un échec définitif, transmis à ``on_failure``.
+    """
+    error = FetchError.from_exception(exception)
+    attempts = frontier.attempts[url] = frontier.attempts.get(url, 0) + 1
+    if retry_policy.should_retry(error, attempts):
+        return retry_policy.get_delay(error, attempts)
+    logging.error(f"Échec du traitement de {url}: {error.reason}")
+    if on_failure is not None:
+        on_failure(url, error, attempts)
+    return None
+
+
+async def run_crawl_pool(
+    frontier: UrlFrontier,
+    handler: UrlHandler,
+    max_concurrency: int,
+    max_per_host: int,
+    on_progress: Callable[[str], None] | None = None,
+    retry_policy: RetryPolicy | None = None,
+    on_failure: FailureHandler | None = None,
+    deadline: float | None = None,
+    fair_share: FairShare | None = None,
+) -> None:
+    """
+    Parcourt la frontière avec un pool de workers de taille fixe.
+
+    Chaque worker démarre un nouveau téléchargement dès qu'un emplacement se libère,
+    sans attendre la page la plus lente d'un lot. Le handler retourne les URLs
+    découvertes, ajoutées à la frontière qui les déduplique ; le nombre de requêtes
+    simultanées vers un même hôte est borné par ``max_per_host``. ``on_progress``
+    est appelé avec chaque URL traitée.
+
+    Une page en échec transitoire est remise dans la frontière après le délai de
+    ``retry_policy`` ; un échec définitif est transmis à ``on_failure`` avec le
+    nombre de tentatives. Passé ``deadline`` (horloge ``time.monotonic``), plus
+    aucune page n'est démarrée.
+
+    Les crawls d'un lot partagent ``fair_share`` : leurs téléchargements
+    simultanés sont bornés ensemble et répartis équitablement entre les hôtes.
+    """
+    host_limits = fair_share.host_limits if fair_share is not None else {}
+    retry_policy = retry_policy or RetryPolicy(max_attempts=1)
+
+    async def worker() -> None:
+        while (url := await frontier.get()) is not None:
+            retry_delay = None
+            try:
+                new_urls = await run_handler(
+                    handler, url, host_limits, max_per_host, fair_share
+                )
+                depth = frontier.depth(url) + 1
+                for new_url in new_urls:
+                    frontier.add(new_url, depth)
+            except Exception as e:
+                retry_delay = handle_error(frontier, url, e, retry_policy, on_failure)
+            # Une URL interrompue (annulation) n'est pas marquée traitée : le point
+            # de reprise du crawl la garde à parcourir
+            if retry_delay is not None:
+                frontier.retry(url, retry_delay)
+            else:
+                frontier.task_done(url)
+            if on_progress is not None:
+                on_progress(url)
+
+    deadline_timer = None
+    if deadline is not None:
+        deadline_timer = asyncio.get_running_loop().call_later(
+            max(0.0, deadline - time.monotonic()), frontier.close, "time_budget"
+        )
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, max_concurrency))]
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        if deadline_timer is not None:
+            deadline_timer.cancel()
+        for worker_task in workers:
+            worker_task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
@@ -0,0 +1,124 @@
+"""Dossiers de cache sur disque de taille bornée, vidés par ordre d'utilisation."""
+
+import os
+import tempfile
+import threading
+import time
+
+# Fichiers en cours d'écriture, renommés une fois complets
+_TEMP_PREFIX = "."
+_TEMP_SUFFIX = ".tmp"
+# Âge à partir duquel un fichier en cours d'écriture est considéré abandonné
+_STALE_TEMP_SECONDS = 3600
+
+
+class DiskCache:
+    """
+    Cache stocké dans un dossier, dont la taille totale est bornée.
+
+    Une entrée est composée d'un fichier par extension de ``suffixes``, de même
+    nom ; la date de modification du premier marque sa dernière utilisation.
+    Chaque fichier est écrit à côté de sa destination puis renommé : un lecteur,
+    de ce processus ou d'un autre, ne voit jamais un fichier à moitié écrit.
+
+    Le dossier peut être partagé par plusieurs processus : sa taille n'est pas
+    tenue en mémoire mais mesurée sur disque, à la première écriture puis chaque
+    fois que le processus a écrit un dixième de ``max_bytes``. Au-delà de
+    ``max_bytes``, les entrées les moins récemment utilisées sont supprimées
+    jusqu'à 90 % de la limite.
+    """
+
+    # Extensions des fichiers d'une entrée ; le premier date sa dernière utilisation
+    suffixes: tuple[str, ...] = (".json",)
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        # Octets écrits depuis la dernière mesure du dossier
+        self._check_interval = max(1, max_bytes // 10)
+        self._unchecked_bytes = self._check_interval
+
+    def write_entry(self, base: str, contents: dict[str, str]) -> None:
+        """
+        Écrit les fichiers d'une entrée, dans l'ordre de ``contents`` (extension et
+        contenu), puis applique la limite de taille.
+
+        Bloquant : depuis la boucle d'événements, appeler dans un thread. Lève
+        ``OSError`` si l'entrée ne peut pas être écrite.
+        """
+        written = 0
+        for suffix, content in contents.items():
+            written += self._replace(base + suffix, content.encode("utf-8"))
+
+        with self._lock:
+            self._unchecked_bytes += written
+            if self._unchecked_bytes < self._check_interval:
+                return
+            self._unchecked_bytes = 0
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Mesure le dossier et, au-delà de la limite, supprime les entrées les moins
+        récemment utilisées jusqu'à 90 % de la limite.
+        """
+        primary = self.suffixes[0]
+        stale_before = time.time() - _STALE_TEMP_SECONDS
+        with self._lock:
+            total = 0
+            entries = []
+            for entry in os.scandir(self.directory):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    # Supprimé entre-temps par un autre processus
+                    continue
+                if entry.name.endswith(_TEMP_SUFFIX):
+                    # Écriture interrompue par l'arrêt d'un processus
+                    if stat.st_mtime < stale_before:
+                        self._remove(entry.path)
+                        continue
+                elif entry.name.endswith(primary):
+                    entries.append((stat.st_mtime, entry.path))
+                total += stat.st_size
+            if total <= self.max_bytes:
+                return
+            entries.sort()
+
+            target = int(self.max_bytes * 0.9)
+            for _, primary_path in entries:
+                if total <= target:
+                    break
+                base = primary_path[: -len(primary)]
+                for suffix in self.suffixes:
+                    total -= self._file_size(base + suffix)
+                    self._remove(base + suffix)
+
+    def _replace(self, path: str, data: bytes) -> int:
+        fd, temp_path = tempfile.mkstemp(
+            dir=self.directory, prefix=_TEMP_PREFIX, suffix=_TEMP_SUFFIX
+        )
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                temp_file.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            self._remove(temp_path)
+            raise
+        return len(data)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _file_size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
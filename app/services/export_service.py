@@ -0,0 +1,364 @@
+"""Construction incrémentale des exports produits par les tâches de scraping."""
+
+import asyncio
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import zipfile
+from collections.abc import AsyncIterator, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import BinaryIO
+from urllib.parse import urlparse
+
+from app.core.config import (
+    SCRAPER_EXPORT_CHUNK_BYTES,
+    SCRAPER_SPOOL_MAX_BYTES,
+    SCRAPER_ZIP_COMPRESSION_LEVEL,
+    SCRAPER_ZIP_WORKERS,
+)
+from app.schemas.scraper_schemas import ExportFormat
+from app.services.zip_writer import ZipWriter, compress_member
+
+# Pool de threads qui compresse les membres des archives ZIP
+_zip_executor: ThreadPoolExecutor | None = None
+
+
+def get_file_path_from_url(url: str, base_url: str) -> str:
+    """Convertit une URL en chemin de fichier relatif."""
+    base_parsed = urlparse(base_url)
+    url_parsed = urlparse(url)
+
+    # Si l'URL ne contient qu'un chemin relatif
+    if url_parsed.path.startswith(base_parsed.path):
+        relative_path = url_parsed.path[len(base_parsed.path) :].lstrip("/")
+    else:
+        relative_path = url_parsed.path.lstrip("/")
+
+    # S'il n'y a pas de chemin, utiliser 'index'
+    if not relative_path:
+        relative_path = "index"
+
+    # Convertir les chemins en noms de fichiers valides
+    # Remplacer les caractères non alphanumériques par des tirets
+    relative_path = re.sub(r"[^a-zA-Z0-9/\-_]", "-", relative_path)
+
+    # S'assurer qu'il n'y a pas de double tirets
+    relative_path = re.sub(r"-+", "-", relative_path)
+
+    # Assurez-vous que le chemin se termine par .md
+    if not relative_path.endswith(".md"):
+        if relative_path.endswith("/"):
+            relative_path = relative_path[:-1]
+        relative_path += ".md"
+
+    return relative_path
+
+
+def get_flat_file_path(url: str, index: int) -> str:
+    """Construit le nom d'un fichier à la racine de l'archive (format plat)."""
+    # Extraire uniquement le nom du fichier et ajouter un indice pour éviter les collisions
+    parsed_url = urlparse(url)
+    path_segments = parsed_url.path.strip("/").split("/")
+    file_name = path_segments[-1] if path_segments else f"page_{index}"
+    if not file_name:
+        file_name = f"page_{index}"
+    if not file_name.endswith(".md"):
+        file_name = f"{file_name}.md"
+    # Nettoyer le nom de fichier des caractères non valides
+    file_name = re.sub(r"[^a-zA-Z0-9\-_.]", "-", file_name)
+    file_name = re.sub(r"-+", "-", file_name)
+    # Ajouter un index pour éviter les doublons
+    return f"{index + 1:03d}_{file_name}"
+
+
+def get_seed_folder(url: str, index: int) -> str:
+    """Construit le nom du dossier d'une racine dans l'export d'un lot."""
+    parsed_url = urlparse(url)
+    name = f"{parsed_url.netloc}{parsed_url.path}".strip("/")
+    name = re.sub(r"[^a-zA-Z0-9\-_.]", "-", name)
+    name = re.sub(r"-+", "-", name)
+    # Préfixe numérique : deux racines ne partagent jamais un dossier
+    return f"{index + 1:02d}_{name}"
+
+
+def build_readme(
+    start_url: str, urls: Iterable[str], failures: list[dict] | None = None
+) -> str:
+    """Construit le fichier README décrivant le contenu de l'archive."""
+    urls = list(urls)
+    readme = f"""# Documentation scrapée depuis {start_url}
+
+Date: {datetime.now().isoformat()}
+Nombre de pages: {len(urls)}
+
+## Pages incluses:
+
+{chr(10).join([f"- [{url}]({url})" for url in urls])}
+"""
+    return readme + build_failures_section(failures)
+
+
+def build_failures_section(failures: list[dict] | None) -> str:
+    """Construit la section du README qui liste les pages en échec."""
+    if not failures:
+        return ""
+    rows = [
+        f"| {failure['url']} | {failure['status'] or '-'} | {failure['reason']}"
+        f" | {failure['attempts']} |"
+        for failure in failures
+    ]
+    return f"""
+## Pages en échec ({len(failures)}):
+
+| URL | Statut | Cause | Tentatives |
+| --- | --- | --- | --- |
+{chr(10).join(rows)}
+"""
+
+
+def build_batch_readme(seeds: list[dict], failures: list[dict] | None = None) -> str:
+    """Construit le fichier README d'un export regroupant plusieurs sites."""
+    rows = [
+        f"| {seed['url']} | `{seed['folder']}` | {seed['status']}"
+        f" | {seed['processed_pages']} | {seed['failed_pages']} |"
+        for seed in seeds
+    ]
+    return f"""# Documentation scrapée depuis {len(seeds)} sites
+
+Date: {datetime.now().isoformat()}
+
+| Site | Dossier | Statut | Pages | Pages en échec |
+| --- | --- | --- | --- | --- |
+{chr(10).join(rows)}
+""" + build_failures_section(failures)
+
+
+def get_zip_executor() -> ThreadPoolExecutor:
+    """Retourne le pool de compression des archives ZIP, en le créant au besoin."""
+    global _zip_executor
+    if _zip_executor is None:
+        _zip_executor = ThreadPoolExecutor(
+            max_workers=SCRAPER_ZIP_WORKERS or os.cpu_count() or 1,
+            thread_name_prefix="zip",
+        )
+    return _zip_executor
+
+
+def shutdown_zip_executor() -> None:
+    """Arrête le pool de compression des archives ZIP."""
+    global _zip_executor
+    if _zip_executor is not None:
+        _zip_executor.shutdown(wait=False, cancel_futures=True)
+        _zip_executor = None
+
+
+class ZipExport:
+    """
+    Archive ZIP construite au fil du crawl dans un fichier temporaire.
+
+    Avec ``path``, l'archive est écrite dans ce fichier, puis renommée par
+    ``save`` ; sinon le fichier reste en mémoire tant qu'il est petit, puis
+    bascule sur disque (``SpooledTemporaryFile``). Chaque page est confiée dès sa conversion au pool
+    de compression : les membres sont compressés en parallèle, hors de la boucle
+    d'événements, et écrits dans l'archive à mesure que leur compression se
+    termine. ``compression_level`` va de 0 (membres stockés sans compression) à 9.
+    """
+
+    def __init__(
+        self,
+        start_url: str,
+        export_format: ExportFormat,
+        file: BinaryIO | None = None,
+        compression_level: int | None = None,
+        path: str | None = None,
+    ):
+        self.start_url = start_url
+        self.path = path
+        self.export_format = export_format
+        self.urls: list[str] = []
+        if compression_level is None:
+            compression_level = SCRAPER_ZIP_COMPRESSION_LEVEL
+        self.compression_level = compression_level
+        # Membres en cours de compression ; un seul thread écrit à la fois
+        self._pending: set[Future] = set()
+        self._lock = threading.Lock()
+        # Première erreur de compression ou d'écriture, signalée à la fermeture
+        self.error: Exception | None = None
+        if file is None:
+            self.file = self._create_file()
+            self.writer = ZipWriter(self.file)
+            self.size = 0
+            self.closed = False
+        else:
+            # Archive déjà terminée, ouverte en lecture seule
+            self.file = file
+            self.writer = None
+            self.size = file.seek(0, 2)
+            self.closed = True
+
+    def add_page(
+        self, url: str, markdown: str, folder: str = "", start_url: str | None = None
+    ) -> None:
+        """
+        Ajoute le Markdown d'une page à l'archive.
+
+        Dans l'export d'un lot, la page est placée dans le dossier ``folder`` de sa
+        racine et son chemin est calculé à partir de ``start_url``.
+        """
+        index = len(self.urls)
+        # Déterminer le chemin du fichier en fonction du format
+        if self.export_format == ExportFormat.ZIP_FILES:
+            # Format hiérarchique - conserver la structure des dossiers
+            file_path = get_file_path_from_url(url, start_url or self.start_url)
+        else:  # ZIP_FLAT
+            # Format plat - tous les fichiers à la racine
+            file_path = get_flat_file_path(url, index)
+
+        # Éviter les doublons dans les noms de fichiers
+        if not file_path:
+            file_path = f"page_{index}.md"
+
+        self.add_file(f"{folder}/{file_path}" if folder else file_path, markdown)
+        self.urls.append(url)
+
+    def add_file(self, path: str, content: str) -> None:
+        """Confie un fichier texte au pool de compression, qui l'ajoute à l'archive."""
+        future = get_zip_executor().submit(self._write_member, path, content)
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+
+    def _write_member(self, path: str, content: str) -> None:
+        """Compresse un membre puis l'écrit dans l'archive (thread du pool)."""
+        try:
+            member = compress_member(path, content.encode("utf-8"), self.compression_level)
+            with self._lock:
+                if self.error is None:
+                    self.writer.write(member)
+        except Exception as e:
+            self.error = self.error or e
+
+    async def drain(self) -> None:
+        """Attend la fin des compressions en cours sans bloquer la boucle d'événements."""
+        pending = list(self._pending)
+        if pending:
+            await asyncio.wait([asyncio.wrap_future(future) for future in pending])
+
+    async def finish(
+        self, failures: list[dict] | None = None, readme: str | None = None
+    ) -> None:
+        """
+        Termine l'archive sans bloquer la boucle d'événements.
+
+        Attend les compressions en cours (``drain``), puis ajoute le README et
+        écrit le répertoire central dans un thread (``close``).
+        """
+        await self.drain()
+        await asyncio.to_thread(self.close, failures, readme)
+
+    def close(self, failures: list[dict] | None = None, readme: str | None = None) -> None:
+        """
+        Ajoute le README, avec la liste des pages en échec, et termine l'archive.
+
+        ``readme`` remplace le README construit à partir des pages de l'archive.
+        Bloquant : depuis la boucle d'événements, utiliser ``finish``.
+        """
+        if self.closed:
+            return
+        try:
+            # Compressions restantes (déjà terminées si l'archive a été vidée par ``drain``)
+            wait(list(self._pending))
+            if self.error is not None:
+                raise self.error
+            # Ajouter un fichier README avec des informations sur le scraping
+            readme_content = readme or build_readme(self.start_url, self.urls, failures)
+            self.writer.write(
+                compress_member(
+                    "README.md", readme_content.encode("utf-8"), self.compression_level
+                )
+            )
+            self.writer.close()
+        except Exception as e:
+            logging.error(f"Erreur lors de la création du ZIP: {e}")
+            # En cas d'erreur, on crée quand même un fichier ZIP de base avec un message d'erreur
+            self.file.close()
+            self.file = self._create_file()
+            with zipfile.ZipFile(self.file, "w", zipfile.ZIP_DEFLATED) as zip_file:
+                error_message = f"Erreur lors de la création du ZIP: {e}"
+                zip_file.writestr("error.md", error_message.encode("utf-8"))
+
+        self.size = self.file.seek(0, 2)
+        self.closed = True
+
+    @classmethod
+    def open(cls, path: str, start_url: str, export_format: ExportFormat) -> "ZipExport":
+        """Ouvre en lecture une archive terminée enregistrée sur disque."""
+        return cls(start_url, export_format, file=open(path, "rb"))
+
+    def save(self, path: str) -> None:
+        """Enregistre l'archive terminée dans un fichier sur disque."""
+        if self.path is not None:
+            # Archive déjà sur disque : renommée, sans copie (le fichier ouvert
+            # reste lisible sous son nouveau nom)
+            os.replace(self.path, path)
+            self.path = path
+            return
+        self.file.seek(0)
+        with open(path, "wb") as output:
+            shutil.copyfileobj(self.file, output)
+
+    def discard(self) -> None:
+        """Libère le fichier temporaire de l'archive."""
+        self.closed = True
+        self.file.close()
+
+    async def iter_chunks(
+        self, chunk_size: int = SCRAPER_EXPORT_CHUNK_BYTES
+    ) -> AsyncIterator[bytes]:
+        """
+        Lit l'archive terminée par blocs, dans un thread.
+
+        Plusieurs téléchargements simultanés peuvent partager le fichier : chaque
+        bloc est lu par ``read_chunk``.
+        """
+        offset = 0
+        while offset < self.size:
+            chunk = await asyncio.to_thread(
+                self.read_chunk, offset, min(chunk_size, self.size - offset)
+            )
+            if not chunk:
+                break
+            offset += len(chunk)
+            yield chunk
+
+    def read_chunk(self, offset: int, size: int) -> bytes:
+        """Lit un bloc de l'archive terminée ; ``seek`` et ``read`` sous verrou."""
+        with self._lock:
+            self.file.seek(offset)
+            return self.file.read(size)
+
+    def _create_file(self) -> BinaryIO:
+        if self.path is not None:
+            return open(self.path, "w+b")
+        return tempfile.SpooledTemporaryFile(max_size=SCRAPER_SPOOL_MAX_BYTES)
+
+
+def markdown_size(pages: Iterable[str], separator: str = "\n\n") -> int:
+    """Retourne la taille en octets du fichier Markdown unique."""
+    size = 0
+    count = 0
+    for markdown in pages:
+        size += len(markdown.encode("utf-8"))
+        count += 1
+    return size + len(separator.encode("utf-8")) * max(count - 1, 0)
+
+
+def iter_markdown(pages: Iterable[str], separator: str = "\n\n") -> Iterator[bytes]:
+    """Produit le fichier Markdown unique page par page."""
+    for index, markdown in enumerate(pages):
+        if index:
+            yield separator.encode("utf-8")
+        yield markdown.encode("utf-8")
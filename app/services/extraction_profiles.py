@@ -0,0 +1,119 @@
+"""Profils d'extraction : région de contenu principal à conserver selon le site."""
+
+import fnmatch
+import json
+import logging
+from typing import NamedTuple
+
+from app.core.config import SCRAPER_EXTRACTION_PROFILES
+
+
+class ExtractionProfile(NamedTuple):
+    """
+    Sélecteurs CSS de la région de contenu d'un site.
+
+    La région est le premier élément qui correspond à un sélecteur de ``keep``,
+    essayés dans l'ordre ; à défaut, le bloc de texte le plus dense de la page.
+    Les éléments qui correspondent à ``strip`` en sont retirés avant conversion.
+    Le profil est transmis aux processus de conversion : il doit rester
+    sérialisable.
+    """
+
+    keep: tuple[str, ...] = ()
+    strip: tuple[str, ...] = ()
+    name: str = "default"
+
+
+# Régions des générateurs de documentation courants, par ordre de priorité
+DEFAULT_PROFILE = ExtractionProfile(
+    keep=(
+        "main#article-contents",
+        "div.markdown-body",
+        "article.md-content__inner",
+        "div.theme-doc-markdown",
+        "div[role=main]",
+        "div.rst-content",
+        "main article",
+    ),
+    strip=("script", "style", "noscript", "nav", "footer", "svg", "form", "button"),
+)
+
+# Profils intégrés, indexés par motif d'hôte (``*.readthedocs.io``)
+BUILTIN_PROFILES: dict[str, ExtractionProfile] = {
+    "docs.python.org": ExtractionProfile(
+        keep=("div.body[role=main]", "div.body"),
+        strip=("a.headerlink", "script", "style"),
+        name="docs.python.org",
+    ),
+    "*.readthedocs.io": ExtractionProfile(
+        keep=("div[itemprop=articleBody]", "div[role=main]"),
+        strip=("a.headerlink", "div.rst-footer-buttons", "script", "style"),
+        name="readthedocs",
+    ),
+    "developer.mozilla.org": ExtractionProfile(
+        keep=("main#content article", "article.main-page-content"),
+        strip=("section.metadata", "aside", "script", "style"),
+        name="developer.mozilla.org",
+    ),
+    "docs.github.com": ExtractionProfile(
+        keep=("main#article-contents", "div.markdown-body"),
+        strip=("nav", "footer", "script", "style"),
+        name="docs.github.com",
+    ),
+}
+
+
+def build_profile(
+    keep: list[str] | None = None, strip: list[str] | None = None, name: str = "custom"
+) -> ExtractionProfile:
+    """Construit un profil ; une liste vide reprend celle du profil par défaut."""
+    return ExtractionProfile(
+        keep=tuple(keep or DEFAULT_PROFILE.keep),
+        strip=tuple(strip or DEFAULT_PROFILE.strip),
+        name=name,
+    )
+
+
+def load_profiles(path: str = SCRAPER_EXTRACTION_PROFILES) -> dict[str, ExtractionProfile]:
+    """
+    Retourne les profils intégrés, complétés par ceux du fichier JSON ``path``.
+
+    Le fichier associe un motif d'hôte à ``{"keep": [...], "strip": [...]}`` ;
+    ses profils remplacent les profils intégrés du même motif.
+    """
+    profiles = dict(BUILTIN_PROFILES)
+    if not path:
+        return profiles
+    try:
+        with open(path, encoding="utf-8") as profiles_file:
+            entries = json.load(profiles_file)
+        for host, entry in entries.items():
+            profiles[host] = build_profile(entry.get("keep"), entry.get("strip"), host)
+    except (OSError, ValueError, AttributeError) as e:
+        logging.error(f"Profils d'extraction illisibles ({path}): {e}")
+    return profiles
+
+
+# Registre chargé une fois par processus (y compris les processus de conversion)
+_profiles = load_profiles()
+
+
+def get_extraction_profile(host: str) -> ExtractionProfile:
+    """Retourne le profil de l'hôte : correspondance exacte, puis par motif."""
+    host = host.lower()
+    profile = _profiles.get(host)
+    if profile is not None:
+        return profile
+    for pattern, profile in _profiles.items():
+        if fnmatch.fnmatch(host, pattern):
+            return profile
+    return DEFAULT_PROFILE
+
+
+def get_extraction_profiles() -> dict[str, dict]:
+    """Retourne le registre des profils, pour l'API."""
+    profiles = {"*": DEFAULT_PROFILE, **_profiles}
+    return {
+        host: {"name": profile.name, "keep": profile.keep, "strip": profile.strip}
+        for host, profile in profiles.items()
+    }
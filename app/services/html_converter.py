@@ -0,0 +1,597 @@
+"""Conversion HTML vers Markdown exécutée hors de la boucle d'événements."""
+
+import asyncio
+import functools
+import hashlib
+import html
+import json
+import logging
+import multiprocessing
+import os
+import re
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import NamedTuple
+from urllib.parse import urldefrag, urljoin, urlparse
+
+import html2text
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
+from soupsieve import SelectorSyntaxError
+
+from app.core.config import (
+    SCRAPER_CONVERSION_EXECUTOR,
+    SCRAPER_CONVERSION_WORKERS,
+    SCRAPER_HONOR_CANONICAL,
+    SCRAPER_HTML_PARSER,
+    SCRAPER_PARTIAL_PARSE,
+)
+from app.services.extraction_profiles import (
+    DEFAULT_PROFILE,
+    ExtractionProfile,
+    get_extraction_profile,
+)
+from app.services.url_utils import is_in_scope, normalize_url
+
+try:
+    import lxml.html
+    from cssselect import SelectorError
+    from lxml.cssselect import CSSSelector
+    from lxml.etree import ParserError
+except ImportError:  # pragma: no cover - lxml et cssselect sont optionnels
+    lxml = None
+
+# Éléments dont le texte compte dans la recherche du bloc le plus dense
+_TEXT_BLOCK_TAGS = ("p", "pre", "li", "td", "dd", "blockquote", "h1", "h2", "h3", "h4")
+
+# Part du texte de la page que doit contenir le bloc le plus dense retenu
+_DENSEST_BLOCK_SHARE = 0.8
+
+# Part maximale de texte de liens d'un bloc compté (menus, tables des matières)
+_MAX_LINK_DENSITY = 0.5
+
+# Sélecteur simple (``tag#id`` ou ``tag.classe``) analysable partiellement
+_SIMPLE_SELECTOR = re.compile(r"^([a-zA-Z][\w-]*)?(?:#([\w-]+)|\.([\w-]+))$")
+
+# Balise ouvrante et ses attributs, repérés dans le HTML brut pour l'analyse partielle
+_START_TAG = re.compile(
+    r"<([a-zA-Z][\w-]*)((?:\s+[^\s=>/]+(?:\s*=\s*(?:\"[^\"]*\"|'[^']*'|[^\s>]+))?)*)\s*/?>"
+)
+_TAG_ATTRIBUTE = re.compile(r"([^\s=>/]+)(?:\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s>]+)))?")
+
+# Balise <link rel="canonical"> et son attribut href
+_CANONICAL_LINK = re.compile(r"<link\b[^>]*\brel=[\"']?canonical\b[^>]*>", re.IGNORECASE)
+_HREF_ATTRIBUTE = re.compile(r"\bhref=(?:\"([^\"]*)\"|'([^']*)'|([^\s>]+))", re.IGNORECASE)
+
+# Version des règles d'extraction et de conversion, incluse dans la clé du cache des
+# conversions : à incrémenter lorsqu'une modification change le résultat d'``extract_page``
+CONVERSION_VERSION = 1
+
+# Exécuteur partagé pour l'étape de conversion (créé à la première utilisation)
+_executor: Executor | None = None
+
+
+class ContentRegion(NamedTuple):
+    """Région de contenu principal extraite d'une page HTML."""
+
+    html: str
+    hrefs: list[str]
+
+
+class ExtractedPage(NamedTuple):
+    """
+    Page convertie : Markdown, liens du périmètre et URL canonique déclarée.
+
+    ``timings`` donne la durée en secondes de chaque étape de la conversion
+    (``parse``, ``convert``, ``links`` et ``conversion_wait``, l'attente d'un
+    worker de l'exécuteur).
+    """
+
+    markdown: str
+    links: list[str]
+    canonical_url: str | None = None
+    timings: dict[str, float] | None = None
+
+
+def select_densest_block(
+    root, weights: dict, children: Callable, key: Callable = id
+) -> object:
+    """
+    Retourne le plus petit élément qui contient l'essentiel du texte de la page.
+
+    ``weights`` associe à chaque élément (par ``key``) la longueur du texte des
+    blocs qu'il contient ; la descente depuis ``root`` s'arrête lorsqu'aucun
+    enfant n'en contient au moins ``_DENSEST_BLOCK_SHARE``.
+    """
+    total = weights.get(key(root), 0)
+    node = root
+    while total:
+        for child in children(node):
+            if weights.get(key(child), 0) >= total * _DENSEST_BLOCK_SHARE:
+                node = child
+                break
+        else:
+            break
+    return node
+
+
+def parse_simple_selector(selector: str) -> tuple[str | None, dict[str, str], str] | None:
+    """Retourne l'élément, les attributs et le marqueur textuel d'un sélecteur simple."""
+    match = _SIMPLE_SELECTOR.match(selector)
+    if match is None:
+        return None
+    name, element_id, class_name = match.groups()
+    if element_id:
+        return name, {"id": element_id}, element_id
+    return name, {"class": class_name}, class_name
+
+
+def find_region_start(
+    html_content: str, name: str | None, attrs: dict[str, str], marker: str
+) -> int | None:
+    """
+    Retourne la position de la balise ouvrante décrite par un sélecteur simple.
+
+    Seules les occurrences du marqueur situées dans une balise sont examinées ;
+    celles d'un script ou d'un commentaire sont ignorées.
+    """
+    position = html_content.find(marker)
+    while position >= 0:
+        start = html_content.rfind("<", 0, position)
+        match = _START_TAG.match(html_content, start) if start >= 0 else None
+        if (
+            match is not None
+            and match.end() > position
+            and (name is None or match.group(1).lower() == name.lower())
+            and matches_attributes(parse_tag_attributes(match.group(2)), attrs)
+            and html_content.rfind("<script", 0, start)
+            <= html_content.rfind("</script", 0, start)
+            and html_content.rfind("<!--", 0, start) <= html_content.rfind("-->", 0, start)
+        ):
+            return start
+        position = html_content.find(marker, position + len(marker))
+    return None
+
+
+def parse_tag_attributes(attributes: str) -> dict[str, str]:
+    """Retourne les attributs d'une balise ouvrante ; le premier d'un nom l'emporte."""
+    parsed: dict[str, str] = {}
+    for match in _TAG_ATTRIBUTE.finditer(attributes):
+        value = html.unescape(next(filter(None, match.groups()[1:]), ""))
+        parsed.setdefault(match.group(1).lower(), value)
+    return parsed
+
+
+def matches_attributes(found: dict[str, str], attrs: dict[str, str]) -> bool:
+    """Indique si l'élément porte l'``id``, ou la classe parmi les siennes, attendu."""
+    if "id" in attrs:
+        return found.get("id") == attrs["id"]
+    return attrs["class"] in found.get("class", "").split()
+
+
+def find_soup_region_partial(html_content: str, profile: ExtractionProfile):
+    """
+    Cherche la région avec une analyse partielle (``SoupStrainer``).
+
+    Seuls les sélecteurs simples en tête de ``keep`` peuvent être cherchés ainsi,
+    pour respecter l'ordre de priorité ; le marqueur textuel évite une analyse
+    vouée à l'échec.
+    """
+    for selector in profile.keep:
+        simple_selector = parse_simple_selector(selector)
+        if simple_selector is None:
+            return None
+        name, attrs, marker = simple_selector
+        if marker not in html_content:
+            continue
+        strainer = SoupStrainer(name, attrs=attrs)
+        region_soup = BeautifulSoup(html_content, "html.parser", parse_only=strainer)
+        region = region_soup.find(name, attrs)
+        if region is not None:
+            return region
+    return None
+
+
+def find_soup_densest_block(soup: BeautifulSoup):
+    """Retourne le bloc de texte le plus dense d'une page analysée par BeautifulSoup."""
+    root = soup.body or soup
+    weights: dict[int, int] = {}
+    for block in root.find_all(_TEXT_BLOCK_TAGS):
+        text_length = len(block.get_text(strip=True))
+        link_length = sum(len(link.get_text(strip=True)) for link in block.find_all("a"))
+        if not text_length or link_length > text_length * _MAX_LINK_DENSITY:
+            continue
+        for element in (block, *block.parents):
+            weights[id(element)] = weights.get(id(element), 0) + text_length
+    return select_densest_block(
+        root, weights, lambda node: node.find_all(True, recursive=False)
+    )
+
+
+def parse_with_soup(
+    html_content: str,
+    profile: ExtractionProfile = DEFAULT_PROFILE,
+    partial: bool = SCRAPER_PARTIAL_PARSE,
+) -> ContentRegion:
+    """
+    Localise le contenu principal avec BeautifulSoup et ``html.parser``.
+
+    En mode partiel, seul le sous-arbre de la région recherchée est construit
+    (``SoupStrainer``) ; la page entière n'est analysée qu'en dernier recours.
+    Sans région du profil, le bloc le plus dense est converti et les liens de
+    toute la page sont suivis.
+    """
+    region = find_soup_region_partial(html_content, profile) if partial else None
+    link_root = region
+    if region is None:
+        soup = BeautifulSoup(html_content, "html.parser")
+        for selector in profile.keep:
+            try:
+                region = soup.select_one(selector)
+            except (SelectorSyntaxError, NotImplementedError):
+                continue
+            if region is not None:
+                break
+        link_root = region
+        if region is None:
+            region = find_soup_densest_block(soup)
+            link_root = soup
+
+    hrefs = [link["href"] for link in link_root.find_all("a", href=True)]
+    for selector in profile.strip:
+        try:
+            elements = region.select(selector)
+        except (SelectorSyntaxError, NotImplementedError):
+            continue
+        for element in elements:
+            element.extract()
+    return ContentRegion(str(region), hrefs)
+
+
+@functools.lru_cache(maxsize=256)
+def compile_selector(selector: str) -> "CSSSelector | None":
+    """
+    Compile un sélecteur CSS pour lxml ; retourne ``None`` s'il est invalide.
+
+    Un sélecteur refusé par cssselect est signalé une fois par processus : la règle
+    ``keep`` ou ``strip`` correspondante n'est pas appliquée.
+    """
+    try:
+        return CSSSelector(selector, translator="html")
+    except SelectorError as e:
+        logging.warning(
+            f"Sélecteur CSS non pris en charge par lxml ignoré {selector!r}: {e}"
+        )
+        return None
+
+
+def select_lxml(element, selector: str) -> list:
+    """Retourne les éléments qui correspondent au sélecteur CSS."""
+    compiled = compile_selector(selector)
+    return compiled(element) if compiled is not None else []
+
+
+def find_lxml_densest_block(document):
+    """Retourne le bloc de texte le plus dense d'une page analysée par lxml."""
+    root = document.find("body")
+    if root is None:
+        root = document
+    # Les éléments servent eux-mêmes de clés : lxml ne garantit pas la stabilité
+    # de l'``id`` d'un élément qui n'est plus référencé
+    weights: dict = {}
+    for block in root.iter(*_TEXT_BLOCK_TAGS):
+        text_length = len(block.text_content().strip())
+        link_length = sum(len(link.text_content().strip()) for link in block.iter("a"))
+        if not text_length or link_length > text_length * _MAX_LINK_DENSITY:
+            continue
+        for element in (block, *block.iterancestors()):
+            weights[element] = weights.get(element, 0) + text_length
+    return select_densest_block(
+        root,
+        weights,
+        lambda node: (child for child in node if isinstance(child.tag, str)),
+        key=lambda element: element,
+    )
+
+
+def parse_lxml_document(html_content: str):
+    """Analyse un document avec lxml ; retourne ``None`` s'il est vide."""
+    try:
+        try:
+            return lxml.html.document_fromstring(html_content)
+        except ValueError:
+            # Les chaînes contenant une déclaration d'encodage XML doivent être en bytes
+            return lxml.html.document_fromstring(html_content.encode("utf-8"))
+    except ParserError:
+        return None
+
+
+def find_lxml_region_partial(html_content: str, profile: ExtractionProfile):
+    """
+    Cherche la région en n'analysant le HTML qu'à partir de sa balise ouvrante.
+
+    L'en-tête et le menu qui précèdent la région ne sont pas analysés. Comme pour
+    ``find_soup_region_partial``, seuls les sélecteurs simples en tête de ``keep``
+    sont cherchés ainsi ; si l'élément obtenu ne correspond pas au sélecteur
+    (balise mal imbriquée), la page entière est analysée.
+    """
+    for selector in profile.keep:
+        simple_selector = parse_simple_selector(selector)
+        if simple_selector is None:
+            return None
+        name, attrs, marker = simple_selector
+        start = find_region_start(html_content, name, attrs, marker)
+        if start is None:
+            continue
+        document = parse_lxml_document(html_content[start:])
+        body = document.find("body") if document is not None else None
+        region = body[0] if body is not None and len(body) else None
+        if region is None or not isinstance(region.tag, str):
+            return None
+        if (name is not None and region.tag != name.lower()) or not matches_attributes(
+            dict(region.attrib), attrs
+        ):
+            return None
+        return region
+    return None
+
+
+def parse_with_lxml(
+    html_content: str,
+    profile: ExtractionProfile = DEFAULT_PROFILE,
+    partial: bool = SCRAPER_PARTIAL_PARSE,
+) -> ContentRegion:
+    """
+    Localise le contenu principal avec lxml, dont l'arbre est construit en C.
+
+    En mode partiel, le HTML n'est analysé qu'à partir de la région recherchée ;
+    la page entière n'est analysée qu'en dernier recours. Sans région du profil,
+    le bloc le plus dense est converti et les liens de toute la page sont suivis.
+    """
+    region = link_root = (
+        find_lxml_region_partial(html_content, profile) if partial else None
+    )
+    if region is None:
+        document = parse_lxml_document(html_content)
+        if document is None:
+            return ContentRegion("", [])
+        for selector in profile.keep:
+            matches = select_lxml(document, selector)
+            if matches:
+                region = link_root = matches[0]
+                break
+        if region is None:
+            region, link_root = find_lxml_densest_block(document), document
+
+    hrefs = [
+        link.get("href") for link in link_root.iter("a") if link.get("href") is not None
+    ]
+    for selector in profile.strip:
+        for element in select_lxml(region, selector):
+            if element is not region:
+                element.drop_tree()
+    return ContentRegion(lxml.html.tostring(region, encoding="unicode"), hrefs)
+
+
+# Backends d'analyse disponibles, sélectionnés par SCRAPER_HTML_PARSER
+PARSER_BACKENDS: dict[str, Callable[[str, ExtractionProfile], ContentRegion]] = {
+    "html.parser": parse_with_soup,
+}
+if lxml is not None:
+    PARSER_BACKENDS["lxml"] = parse_with_lxml
+
+
+def get_parser_backend(
+    name: str = SCRAPER_HTML_PARSER,
+) -> Callable[[str, ExtractionProfile], ContentRegion]:
+    """Retourne le backend demandé, ou ``html.parser`` s'il n'est pas disponible."""
+    return PARSER_BACKENDS.get(name, parse_with_soup)
+
+
+def find_selector_error(selector: str) -> str | None:
+    """
+    Retourne l'erreur de compilation d'un sélecteur CSS par le backend d'analyse
+    configuré (cssselect pour lxml, soupsieve pour ``html.parser``), ou ``None``
+    s'il est valide.
+    """
+    if get_parser_backend() is parse_with_lxml:
+        try:
+            CSSSelector(selector, translator="html")
+        except SelectorError as e:
+            return str(e)
+        return None
+    try:
+        soupsieve.compile(selector)
+    except (SelectorSyntaxError, NotImplementedError) as e:
+        return str(e)
+    return None
+
+
+def find_canonical_url(
+    html_content: str, url: str, base_netloc: str, base_path: str
+) -> str | None:
+    """
+    Retourne l'URL canonique déclarée par la page (``<link rel="canonical">``).
+
+    Seule une URL du périmètre, dont la forme canonique diffère de celle de la page,
+    est retournée.
+    """
+    head_end = html_content.find("</head>")
+    match = _CANONICAL_LINK.search(
+        html_content, 0, head_end if head_end >= 0 else len(html_content)
+    )
+    if match is None:
+        return None
+    href = _HREF_ATTRIBUTE.search(match.group(0))
+    if href is None:
+        return None
+
+    canonical_url = urljoin(url, html.unescape(next(filter(None, href.groups()), "")))
+    canonical_url, _ = urldefrag(canonical_url)
+    if not is_in_scope(canonical_url, base_netloc, base_path):
+        return None
+    return canonical_url if normalize_url(canonical_url) != normalize_url(url) else None
+
+
+def extract_page(
+    html_content: str,
+    url: str,
+    base_netloc: str,
+    base_path: str,
+    profile: ExtractionProfile | None = None,
+) -> ExtractedPage:
+    """
+    Extrait le contenu principal d'une page, le convertit en Markdown et
+    retourne les liens sortants situés dans le périmètre du crawl, ainsi que
+    l'URL canonique déclarée par la page.
+
+    La région de contenu est choisie par ``profile``, ou à défaut par le profil
+    enregistré pour l'hôte de la page.
+
+    Fonction pure exécutée dans un processus de travail : ses arguments et
+    son résultat doivent rester sérialisables.
+    """
+    # Extraire le contenu principal
+    started = time.perf_counter()
+    profile = profile or get_extraction_profile(urlparse(url).netloc)
+    region = get_parser_backend()(html_content, profile)
+    parsed = time.perf_counter()
+
+    # Convertir le contenu principal en Markdown
+    converter = html2text.HTML2Text()
+    converter.ignore_links = False
+    markdown = converter.handle(region.html)
+
+    # Supprimer tout avant le premier titre de niveau 1
+    lines = markdown.split("\n")
+    start_index = None
+    for i, line in enumerate(lines):
+        if line.startswith("# "):
+            start_index = i
+            break
+
+    if start_index is not None:
+        markdown = "\n".join(lines[start_index:])
+    converted = time.perf_counter()
+
+    # Trouver tous les liens du périmètre, tels qu'ils sont écrits : la frontière
+    # les déduplique par leur forme canonique
+    links = []
+    for href in region.hrefs:
+        next_url, _ = urldefrag(urljoin(url, href))
+        if is_in_scope(next_url, base_netloc, base_path):
+            links.append(next_url)
+
+    canonical_url = None
+    if SCRAPER_HONOR_CANONICAL:
+        canonical_url = find_canonical_url(html_content, url, base_netloc, base_path)
+    timings = {
+        "parse": parsed - started,
+        "convert": converted - parsed,
+        "links": time.perf_counter() - converted,
+    }
+    return ExtractedPage(markdown, links, canonical_url, timings)
+
+
+def conversion_key(
+    html_content: str,
+    url: str,
+    base_netloc: str,
+    base_path: str,
+    profile: ExtractionProfile | None = None,
+) -> str:
+    """
+    Retourne la clé de la conversion d'une page dans le cache des conversions.
+
+    Elle couvre tout ce dont dépend le résultat d'``extract_page`` : le HTML de la
+    page, son URL (liens relatifs), le périmètre, le profil d'extraction, le backend
+    d'analyse et les réglages du convertisseur.
+    """
+    profile = profile or get_extraction_profile(urlparse(url).netloc)
+    settings = [
+        CONVERSION_VERSION,
+        html2text.__version__,
+        get_parser_backend().__name__,
+        SCRAPER_PARTIAL_PARSE,
+        SCRAPER_HONOR_CANONICAL,
+        url,
+        base_netloc,
+        base_path,
+        profile.keep,
+        profile.strip,
+    ]
+    digest = hashlib.blake2b(json.dumps(settings).encode("utf-8"), digest_size=32)
+    digest.update(html_content.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def create_conversion_executor(
+    kind: str = SCRAPER_CONVERSION_EXECUTOR, max_workers: int | None = None
+) -> Executor | None:
+    """
+    Crée l'exécuteur de l'étape de conversion.
+
+    ``process`` (défaut) répartit le travail sur tous les cœurs, ``thread`` utilise
+    un pool de threads et ``inline`` exécute la conversion dans la boucle d'événements.
+    """
+    max_workers = max_workers or SCRAPER_CONVERSION_WORKERS or os.cpu_count() or 1
+    if kind == "process":
+        # "spawn" évite de dupliquer les threads de la boucle d'événements du parent
+        return ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="convert")
+    if kind == "inline":
+        return None
+    raise ValueError(f"Exécuteur de conversion inconnu: {kind}")
+
+
+def get_conversion_executor() -> Executor | None:
+    """Retourne l'exécuteur de conversion partagé, en le créant au besoin."""
+    global _executor
+    if _executor is None and SCRAPER_CONVERSION_EXECUTOR != "inline":
+        _executor = create_conversion_executor()
+    return _executor
+
+
+def set_conversion_executor(executor: Executor | None) -> None:
+    """Remplace l'exécuteur de conversion partagé (``None`` pour revenir au défaut)."""
+    global _executor
+    _executor = executor
+
+
+def shutdown_conversion_executor() -> None:
+    """Arrête l'exécuteur de conversion partagé."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def convert_page(
+    html_content: str,
+    url: str,
+    base_netloc: str,
+    base_path: str,
+    profile: ExtractionProfile | None = None,
+) -> ExtractedPage:
+    """
+    Exécute ``extract_page`` dans l'exécuteur de conversion.
+
+    Le temps passé hors des étapes de conversion (file d'attente de l'exécuteur,
+    transfert vers le processus de travail) est mesuré comme ``conversion_wait``.
+    """
+    executor = get_conversion_executor()
+    if executor is None:
+        return extract_page(html_content, url, base_netloc, base_path, profile)
+
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    page = await loop.run_in_executor(
+        executor, extract_page, html_content, url, base_netloc, base_path, profile
+    )
+    elapsed = time.perf_counter() - started
+    page.timings["conversion_wait"] = max(0.0, elapsed - sum(page.timings.values()))
+    return page
@@ -0,0 +1,114 @@
+"""Cache HTTP persistant sur disque avec revalidation ETag / Last-Modified."""
+
+import hashlib
+import json
+import logging
+import os
+from typing import NamedTuple
+
+from app.core.config import (
+    SCRAPER_HTTP_CACHE_DIR,
+    SCRAPER_HTTP_CACHE_ENABLED,
+    SCRAPER_HTTP_CACHE_MAX_BYTES,
+)
+from app.services.disk_cache import DiskCache
+from app.services.url_utils import normalize_url
+
+# Cache partagé entre les tâches (créé à la première utilisation)
+_http_cache: "HttpCache | None" = None
+
+
+class CachedResponse(NamedTuple):
+    """Réponse conservée dans le cache avec ses validateurs."""
+
+    body: str
+    etag: str | None
+    last_modified: str | None
+
+
+class HttpCache(DiskCache):
+    """
+    Cache de réponses HTTP stocké sur disque, indexé par URL normalisée.
+
+    Chaque entrée est composée d'un fichier de métadonnées (validateurs et
+    empreinte du contenu) et d'un fichier de contenu. Un contenu qui ne correspond
+    pas à l'empreinte (écriture interrompue, ou concurrente dans un autre
+    processus) n'est jamais associé aux validateurs d'une autre version : l'entrée
+    est ignorée. La taille totale est bornée : les entrées les moins récemment
+    utilisées sont supprimées en premier.
+    """
+
+    # Métadonnées (validateurs, date de dernière utilisation) puis contenu
+    suffixes = (".json", ".body")
+
+    def _base(self, url: str) -> str:
+        key = hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key)
+
+    def _paths(self, url: str) -> tuple[str, str]:
+        base = self._base(url)
+        return f"{base}.json", f"{base}.body"
+
+    def get(self, url: str) -> CachedResponse | None:
+        """Retourne l'entrée associée à l'URL, ou ``None`` si elle est absente."""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as meta_file:
+                meta = json.load(meta_file)
+            with open(body_path, encoding="utf-8") as body_file:
+                body = body_file.read()
+        except (OSError, ValueError):
+            return None
+        if meta.get("digest") != body_digest(body):
+            return None
+        return CachedResponse(body, meta.get("etag"), meta.get("last_modified"))
+
+    def touch(self, url: str) -> None:
+        """Marque l'entrée comme récemment utilisée."""
+        meta_path, _ = self._paths(url)
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+
+    def put(self, url: str, body: str, etag: str | None, last_modified: str | None) -> None:
+        """Enregistre une réponse et ses validateurs, puis applique la limite de taille."""
+        meta = json.dumps(
+            {
+                "url": normalize_url(url),
+                "etag": etag,
+                "last_modified": last_modified,
+                "digest": body_digest(body),
+            }
+        )
+        try:
+            # Écrire le contenu avant les métadonnées : une entrée n'est lue que
+            # si ses métadonnées existent
+            self.write_entry(self._base(url), {".body": body, ".json": meta})
+        except OSError as e:
+            logging.warning(f"Impossible d'écrire {url} dans le cache HTTP: {e}")
+
+
+def body_digest(body: str) -> str:
+    """Retourne l'empreinte du contenu d'une entrée, enregistrée avec ses validateurs."""
+    return hashlib.blake2b(body.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def conditional_headers(cached: CachedResponse | None) -> dict[str, str]:
+    """Construit les en-têtes de requête conditionnelle pour une entrée du cache."""
+    headers: dict[str, str] = {}
+    if cached is None:
+        return headers
+    if cached.etag:
+        headers["If-None-Match"] = cached.etag
+    if cached.last_modified:
+        headers["If-Modified-Since"] = cached.last_modified
+    return headers
+
+
+def get_http_cache() -> HttpCache | None:
+    """Retourne le cache HTTP partagé, ou ``None`` s'il est désactivé."""
+    global _http_cache
+    if _http_cache is None and SCRAPER_HTTP_CACHE_ENABLED:
+        _http_cache = HttpCache(SCRAPER_HTTP_CACHE_DIR, SCRAPER_HTTP_CACHE_MAX_BYTES)
+    return _http_cache
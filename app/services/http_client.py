@@ -0,0 +1,226 @@
+"""Client HTTP partagé par tous les crawls, avec pool de connexions réglable."""
+
+import asyncio
+import time
+
+import aiohttp
+
+from app.core.config import (
+    SCRAPER_HTTP_DNS_CACHE_TTL,
+    SCRAPER_HTTP_KEEPALIVE_SECONDS,
+    SCRAPER_HTTP_POOL_LIMIT,
+    SCRAPER_HTTP_POOL_LIMIT_PER_HOST,
+)
+from app.services.metrics import RECEIVED_BYTES, register_gauge
+
+try:
+    from aiohttp.compression_utils import HAS_BROTLI
+except ImportError:  # pragma: no cover - dépend de la version d'aiohttp
+    HAS_BROTLI = False
+
+# Encodages acceptés : brotli seulement si aiohttp sait le décoder
+ACCEPT_ENCODING = "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"
+
+# Session partagée (créée à la première utilisation, fermée à l'arrêt du service)
+_http_session: aiohttp.ClientSession | None = None
+_pool_stats: "PoolStats | None" = None
+
+
+class PoolStats:
+    """
+    Compteurs d'utilisation du pool de connexions, alimentés par un ``TraceConfig``.
+
+    Permettent de dimensionner le pool : un nombre élevé de requêtes mises en
+    attente d'une connexion libre indique que ``limit`` ou ``limit_per_host`` est
+    trop bas, un faible taux de réutilisation que le keep-alive est trop court.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.active_requests = 0
+        self.max_active_requests = 0
+        self.failed_requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.queued_requests = 0
+        self.waiting_for_connection = 0
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Construit le ``TraceConfig`` qui met à jour les compteurs."""
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_request_end.append(self._on_request_end)
+        trace_config.on_request_redirect.append(self._on_request_end)
+        trace_config.on_request_exception.append(self._on_request_exception)
+        trace_config.on_connection_queued_start.append(self._on_queued_start)
+        trace_config.on_connection_queued_end.append(self._on_queued_end)
+        trace_config.on_connection_create_end.append(self._on_connection_create)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuse)
+        trace_config.on_dns_cache_hit.append(self._on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(self._on_dns_cache_miss)
+        return trace_config
+
+    def snapshot(self, connector: aiohttp.BaseConnector | None = None) -> dict:
+        """Retourne les compteurs, complétés des limites du connecteur."""
+        stats = dict(vars(self))
+        reused = self.connections_reused
+        total = reused + self.connections_created
+        stats["reuse_ratio"] = round(reused / total, 3) if total else 0.0
+        if connector is not None:
+            stats["limit"] = connector.limit
+            stats["limit_per_host"] = connector.limit_per_host
+        stats["accept_encoding"] = ACCEPT_ENCODING
+        return stats
+
+    async def _on_request_start(self, session, context, params) -> None:
+        self.requests += 1
+        self.active_requests += 1
+        self.max_active_requests = max(self.max_active_requests, self.active_requests)
+
+    async def _on_request_end(self, session, context, params) -> None:
+        self.active_requests -= 1
+
+    async def _on_request_exception(self, session, context, params) -> None:
+        self.active_requests -= 1
+        self.failed_requests += 1
+
+    async def _on_queued_start(self, session, context, params) -> None:
+        self.queued_requests += 1
+        self.waiting_for_connection += 1
+
+    async def _on_queued_end(self, session, context, params) -> None:
+        self.waiting_for_connection -= 1
+
+    async def _on_connection_create(self, session, context, params) -> None:
+        self.connections_created += 1
+
+    async def _on_connection_reuse(self, session, context, params) -> None:
+        self.connections_reused += 1
+
+    async def _on_dns_cache_hit(self, session, context, params) -> None:
+        self.dns_cache_hits += 1
+
+    async def _on_dns_cache_miss(self, session, context, params) -> None:
+        self.dns_cache_misses += 1
+
+
+class RequestTimer:
+    """
+    Mesure des étapes réseau d'une requête, alimentée par un ``TraceConfig``.
+
+    Une requête lancée avec un dictionnaire ``trace_request_ctx`` y reçoit la durée
+    de ses étapes : résolution DNS (``dns``), établissement de la connexion hors
+    DNS (``connect``) et attente des en-têtes de la réponse après l'envoi de la
+    requête (``ttfb``). Les étapes absentes ont été évitées (cache DNS, connexion
+    réutilisée). Les octets reçus sont comptés pour toutes les requêtes.
+    """
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Construit le ``TraceConfig`` qui mesure les étapes des requêtes."""
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_dns_resolvehost_start.append(self._on_dns_start)
+        trace_config.on_dns_resolvehost_end.append(self._on_dns_end)
+        trace_config.on_connection_create_start.append(self._on_connect_start)
+        trace_config.on_connection_create_end.append(self._on_connect_end)
+        trace_config.on_request_headers_sent.append(self._on_headers_sent)
+        trace_config.on_request_end.append(self._on_request_end)
+        trace_config.on_response_chunk_received.append(self._on_chunk_received)
+        return trace_config
+
+    @staticmethod
+    def _record(context, stage: str, seconds: float) -> None:
+        if isinstance(context.trace_request_ctx, dict):
+            context.trace_request_ctx[stage] = seconds
+
+    async def _on_request_start(self, session, context, params) -> None:
+        context.started = context.sent = time.perf_counter()
+        context.dns_seconds = 0.0
+
+    async def _on_dns_start(self, session, context, params) -> None:
+        context.dns_started = time.perf_counter()
+
+    async def _on_dns_end(self, session, context, params) -> None:
+        context.dns_seconds = time.perf_counter() - context.dns_started
+        self._record(context, "dns", context.dns_seconds)
+
+    async def _on_connect_start(self, session, context, params) -> None:
+        context.connect_started = time.perf_counter()
+
+    async def _on_connect_end(self, session, context, params) -> None:
+        # La résolution DNS a lieu pendant l'établissement de la connexion
+        elapsed = time.perf_counter() - context.connect_started - context.dns_seconds
+        self._record(context, "connect", max(0.0, elapsed))
+
+    async def _on_headers_sent(self, session, context, params) -> None:
+        context.sent = time.perf_counter()
+
+    async def _on_request_end(self, session, context, params) -> None:
+        self._record(context, "ttfb", time.perf_counter() - context.sent)
+
+    async def _on_chunk_received(self, session, context, params) -> None:
+        RECEIVED_BYTES.inc(len(params.chunk))
+
+
+def create_http_session(stats: PoolStats | None = None) -> aiohttp.ClientSession:
+    """
+    Crée une session HTTP dont le connecteur est réglé par la configuration.
+
+    Le connecteur garde les connexions ouvertes entre les requêtes (keep-alive)
+    et met en cache les résolutions DNS ; les réponses compressées sont décodées
+    de manière transparente.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=SCRAPER_HTTP_POOL_LIMIT,
+        limit_per_host=SCRAPER_HTTP_POOL_LIMIT_PER_HOST,
+        keepalive_timeout=SCRAPER_HTTP_KEEPALIVE_SECONDS,
+        ttl_dns_cache=SCRAPER_HTTP_DNS_CACHE_TTL or None,
+        use_dns_cache=SCRAPER_HTTP_DNS_CACHE_TTL > 0,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers={"Accept-Encoding": ACCEPT_ENCODING},
+        auto_decompress=True,
+        trace_configs=[
+            RequestTimer().trace_config(),
+            *([stats.trace_config()] if stats is not None else []),
+        ],
+    )
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Retourne la session HTTP partagée, créée au premier appel."""
+    global _http_session, _pool_stats
+    if _http_session is None or _http_session.closed:
+        _pool_stats = PoolStats()
+        _http_session = create_http_session(_pool_stats)
+    return _http_session
+
+
+def count_active_requests() -> int:
+    """Retourne le nombre de requêtes HTTP en cours sur la session partagée."""
+    return _pool_stats.active_requests if _pool_stats is not None else 0
+
+
+register_gauge(
+    "scraper_http_active_requests", "Requêtes HTTP en cours", count_active_requests
+)
+
+
+def get_pool_stats() -> dict:
+    """Retourne les statistiques d'utilisation du pool de connexions partagé."""
+    if _pool_stats is None or _http_session is None:
+        return PoolStats().snapshot()
+    return _pool_stats.snapshot(_http_session.connector)
+
+
+async def close_http_session() -> None:
+    """Ferme la session HTTP partagée et ses connexions (arrêt du service)."""
+    global _http_session
+    if _http_session is not None:
+        await _http_session.close()
+        _http_session = None
+        # Laisser aux connexions TLS le temps de se fermer proprement
+        await asyncio.sleep(0)
@@ -0,0 +1,101 @@
+"""Exécution des tâches en attente réclamées dans le stockage partagé."""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from collections.abc import Callable
+
+from app.core.config import (
+    SCRAPER_JOB_POLL_INTERVAL,
+    SCRAPER_JOB_STALE_SECONDS,
+    SCRAPER_WORKER_MAX_TASKS,
+)
+from app.services.task_store import TaskBackend
+
+
+class JobRunner:
+    """
+    Boucle d'un processus de l'API qui réclame et exécute les tâches en attente.
+
+    Chaque processus lancé par ``uvicorn --workers N`` a sa propre boucle : elle
+    réclame des tâches tant qu'il en exécute moins de ``max_tasks``, enregistre
+    leur progression dans le stockage partagé, transmet les demandes d'annulation
+    reçues par les autres processus, remet en attente les tâches des workers
+    qui ne donnent plus signe de vie et supprime les tâches expirées.
+    """
+
+    def __init__(
+        self,
+        store: TaskBackend,
+        start_task: Callable[[str], None],
+        cancel_task: Callable[[str], None],
+        max_tasks: int = SCRAPER_WORKER_MAX_TASKS,
+        poll_interval: float = SCRAPER_JOB_POLL_INTERVAL,
+        stale_after: float = SCRAPER_JOB_STALE_SECONDS,
+    ):
+        self.store = store
+        self.start_task = start_task
+        self.cancel_task = cancel_task
+        self.max_tasks = max_tasks
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._wakeup = asyncio.Event()
+        self._loop_task: asyncio.Task | None = None
+        self._last_requeue = 0.0
+
+    def start(self) -> None:
+        """Démarre la boucle si elle n'est pas déjà lancée."""
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._run())
+
+    def notify(self) -> None:
+        """Réveille la boucle : une tâche vient d'être mise en attente."""
+        self.start()
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        """Arrête la boucle et remet en attente les tâches de ce processus."""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+        self.store.release(self.worker_id)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except Exception as e:
+                logging.error(f"Échec de la boucle des tâches: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def tick(self) -> None:
+        """Synchronise les tâches en cours puis réclame les tâches en attente."""
+        await self.store.sync(self.worker_id)
+        for task_id in self.store.cancel_requests(self.worker_id):
+            self.cancel_task(task_id)
+
+        now = time.monotonic()
+        if now - self._last_requeue >= self.stale_after / 2:
+            self._last_requeue = now
+            requeued = self.store.requeue_stale(self.stale_after)
+            if requeued:
+                logging.warning(
+                    f"{requeued} tâche(s) d'un worker inactif remise(s) en attente"
+                )
+            # Sans nouvelle tâche, les résultats expirés seraient gardés indéfiniment
+            self.store.purge_expired()
+
+        while self.store.owned_count() < self.max_tasks:
+            task_id = self.store.claim(self.worker_id)
+            if task_id is None:
+                break
+            self.start_task(task_id)
@@ -0,0 +1,287 @@
+"""Mesures du service (durées des étapes, octets, boucle d'événements) au format Prometheus."""
+
+import asyncio
+import bisect
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from app.core.config import SCRAPER_METRICS_LOOP_LAG_INTERVAL
+
+# Bornes des histogrammes de durée, en secondes
+DURATION_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def escape_label(value: str) -> str:
+    """Échappe la valeur d'une étiquette (barre oblique inverse, guillemet, saut de ligne)."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: dict[str, str]) -> str:
+    """Retourne les étiquettes d'un échantillon (``{cle="valeur"}``)."""
+    if not labels:
+        return ""
+    pairs = (f'{key}="{escape_label(value)}"' for key, value in labels.items())
+    return "{" + ",".join(pairs) + "}"
+
+
+def format_value(value: float) -> str:
+    """Retourne la valeur d'un échantillon au format texte."""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Histogramme cumulatif, éventuellement décliné selon une étiquette."""
+
+    def __init__(
+        self, name: str, help: str, label: str | None = None, buckets=DURATION_BUCKETS
+    ):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.buckets = tuple(buckets)
+        # Par valeur d'étiquette : effectifs par borne, somme et nombre d'observations
+        self.series: dict[str, list] = {}
+
+    def observe(self, value: float, label_value: str = "") -> None:
+        """Ajoute une observation."""
+        series = self.series.get(label_value)
+        if series is None:
+            series = self.series[label_value] = [[0] * len(self.buckets), 0.0, 0]
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> Iterator[str]:
+        """Produit les lignes de l'histogramme au format texte Prometheus."""
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for label_value, (counts, total, count) in sorted(self.series.items()):
+            labels = {self.label: label_value} if self.label else {}
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts, strict=True):
+                cumulative += bucket_count
+                bucket_labels = format_labels({**labels, "le": format_value(bound)})
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            yield f"{self.name}_bucket{format_labels({**labels, 'le': '+Inf'})} {count}"
+            yield f"{self.name}_sum{format_labels(labels)} {format_value(total)}"
+            yield f"{self.name}_count{format_labels(labels)} {count}"
+
+
+class Counter:
+    """Compteur croissant, éventuellement décliné selon une étiquette."""
+
+    def __init__(self, name: str, help: str, label: str | None = None):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.values: dict[str, float] = {}
+
+    def inc(self, amount: float = 1, label_value: str = "") -> None:
+        """Incrémente le compteur."""
+        self.values[label_value] = self.values.get(label_value, 0) + amount
+
+    def render(self) -> Iterator[str]:
+        """Produit les lignes du compteur au format texte Prometheus."""
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for label_value, value in sorted(self.values.items()):
+            labels = format_labels({self.label: label_value} if self.label else {})
+            yield f"{self.name}{labels} {format_value(value)}"
+
+
+class Gauge:
+    """Valeur instantanée, lue au moment de l'export."""
+
+    def __init__(self, name: str, help: str, read: Callable[[], float]):
+        self.name = name
+        self.help = help
+        self.read = read
+
+    def render(self) -> Iterator[str]:
+        """Produit la ligne de la jauge au format texte Prometheus."""
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        yield f"{self.name} {format_value(self.read())}"
+
+
+class MetricsRegistry:
+    """Mesures d'un processus de l'API, exportées ensemble par ``/api/metrics``."""
+
+    def __init__(self):
+        self.metrics: dict[str, Histogram | Counter | Gauge] = {}
+
+    def register(self, metric: Histogram | Counter | Gauge):
+        """Enregistre une mesure (la précédente du même nom est remplacée)."""
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Retourne toutes les mesures au format texte Prometheus."""
+        lines = [line for metric in self.metrics.values() for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+_registry = MetricsRegistry()
+
+STAGE_DURATION = _registry.register(
+    Histogram(
+        "scraper_stage_duration_seconds",
+        "Durée de chaque étape du traitement d'une page",
+        label="stage",
+    )
+)
+LOOP_LAG = _registry.register(
+    Histogram(
+        "scraper_event_loop_lag_seconds",
+        "Retard de réveil de la boucle d'événements (traitements bloquants)",
+    )
+)
+PAGES = _registry.register(
+    Counter("scraper_pages_total", "Pages traitées, par résultat", label="outcome")
+)
+RECEIVED_BYTES = _registry.register(
+    Counter("scraper_http_received_bytes_total", "Octets reçus dans les réponses HTTP")
+)
+CONVERSION_CACHE = _registry.register(
+    Counter(
+        "scraper_conversion_cache_total",
+        "Consultations du cache des conversions, par résultat",
+        label="outcome",
+    )
+)
+EXPORTED_BYTES = _registry.register(
+    Counter(
+        "scraper_exported_bytes_total",
+        "Octets de Markdown ajoutés aux résultats des tâches",
+    )
+)
+
+# Monitor de la boucle d'événements de ce processus (démarré avec le service)
+_loop_lag_monitor: "LoopLagMonitor | None" = None
+
+
+def register_gauge(name: str, help: str, read: Callable[[], float]) -> None:
+    """Enregistre une jauge lue à chaque export des mesures."""
+    _registry.register(Gauge(name, help, read))
+
+
+def render_metrics() -> str:
+    """Retourne les mesures de ce processus au format texte Prometheus."""
+    return _registry.render()
+
+
+def record_stage(stage: str, seconds: float, timings: dict | None = None) -> None:
+    """
+    Enregistre la durée d'une étape dans l'histogramme du service.
+
+    ``timings`` est le résumé des durées d'une tâche (nombre, total et maximum
+    par étape), complété au passage.
+    """
+    STAGE_DURATION.observe(seconds, stage)
+    if timings is None:
+        return
+    timing = timings.get(stage)
+    if timing is None:
+        timing = timings[stage] = {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+    timing["count"] += 1
+    timing["total_seconds"] += seconds
+    timing["max_seconds"] = max(timing["max_seconds"], seconds)
+
+
+@contextmanager
+def time_stage(stage: str, timings: dict | None = None) -> Iterator[None]:
+    """Mesure la durée du bloc et l'enregistre comme étape ``stage``."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started, timings)
+
+
+def merge_timings(summaries: list[dict]) -> dict:
+    """Additionne les résumés de durées de plusieurs crawls."""
+    merged: dict[str, dict] = {}
+    for timings in summaries:
+        for stage, timing in timings.items():
+            target = merged.setdefault(
+                stage, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+            )
+            target["count"] += timing["count"]
+            target["total_seconds"] += timing["total_seconds"]
+            target["max_seconds"] = max(target["max_seconds"], timing["max_seconds"])
+    return merged
+
+
+class LoopLagMonitor:
+    """
+    Mesure le retard de la boucle d'événements du service.
+
+    Une tâche se réveille toutes les ``interval`` secondes ; l'écart entre le
+    réveil prévu et le réveil effectif est le temps pendant lequel la boucle était
+    occupée par un traitement bloquant (analyse HTML, compression, disque).
+    """
+
+    def __init__(self, interval: float = SCRAPER_METRICS_LOOP_LAG_INTERVAL):
+        self.interval = interval
+        self.last_lag = 0.0
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Démarre la mesure si elle n'est pas déjà lancée."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Arrête la mesure."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(0.0, time.perf_counter() - expected)
+            LOOP_LAG.observe(self.last_lag)
+
+
+def start_loop_lag_monitor() -> None:
+    """Démarre la mesure du retard de la boucle d'événements de ce processus."""
+    global _loop_lag_monitor
+    if SCRAPER_METRICS_LOOP_LAG_INTERVAL <= 0:
+        return
+    if _loop_lag_monitor is None:
+        _loop_lag_monitor = LoopLagMonitor()
+        register_gauge(
+            "scraper_event_loop_lag_last_seconds",
+            "Dernier retard mesuré de la boucle d'événements",
+            lambda: _loop_lag_monitor.last_lag,
+        )
+    _loop_lag_monitor.start()
+
+
+async def stop_loop_lag_monitor() -> None:
+    """Arrête la mesure du retard de la boucle d'événements."""
+    if _loop_lag_monitor is not None:
+        await _loop_lag_monitor.stop()
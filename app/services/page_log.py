@@ -0,0 +1,148 @@
+"""Journal des pages d'une tâche, écrit au fil du crawl et lisible par tranches."""
+
+import json
+import logging
+import os
+import struct
+from collections.abc import Iterable, Iterator
+
+# Fichiers du journal : pages au format JSON Lines et position de chaque ligne
+PAGES_FILE = "pages.jsonl"
+INDEX_FILE = "pages.idx"
+
+# Position d'une page dans le fichier des pages : entier non signé de 8 octets
+_OFFSET = struct.Struct("<Q")
+
+
+class PageLog:
+    """
+    Journal en ajout seul des pages converties d'une tâche.
+
+    Chaque page est une ligne JSON ``{"url", "markdown"}`` ; sa position est
+    ajoutée au fichier d'index, écrit après la page : un lecteur d'un autre
+    processus ne voit que des pages complètes et accède directement à la page
+    ``offset`` sans relire les précédentes.
+    """
+
+    def __init__(self, directory: str, append: bool = False):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.count, self.size = truncate_page_log(directory) if append else (0, 0)
+        # Sans ``append``, le journal d'une tentative précédente est vidé
+        mode = "ab" if self.count else "wb"
+        self.pages_file = open(os.path.join(directory, PAGES_FILE), mode)
+        self.index_file = open(os.path.join(directory, INDEX_FILE), mode)
+
+    def append(self, url: str, markdown: str) -> None:
+        """Ajoute une page au journal et la rend aussitôt lisible."""
+        line = json.dumps({"url": url, "markdown": markdown}).encode("utf-8") + b"\n"
+        self.pages_file.write(line)
+        self.pages_file.flush()
+        self.index_file.write(_OFFSET.pack(self.size))
+        self.index_file.flush()
+        self.size += len(line)
+        self.count += 1
+
+    def close(self) -> None:
+        """Ferme les fichiers du journal."""
+        self.pages_file.close()
+        self.index_file.close()
+
+
+def truncate_page_log(directory: str) -> tuple[int, int]:
+    """
+    Tronque le journal d'une tâche après sa dernière page complète.
+
+    Retourne le nombre de pages et la taille du fichier des pages : un journal
+    interrompu en pleine écriture peut ensuite être complété.
+    """
+    try:
+        with (
+            open(os.path.join(directory, INDEX_FILE), "r+b") as index_file,
+            open(os.path.join(directory, PAGES_FILE), "r+b") as pages_file,
+        ):
+            count = index_file.seek(0, os.SEEK_END) // _OFFSET.size
+            size = 0
+            while count:
+                index_file.seek((count - 1) * _OFFSET.size)
+                (position,) = _OFFSET.unpack(index_file.read(_OFFSET.size))
+                pages_file.seek(position)
+                line = pages_file.readline()
+                if line.endswith(b"\n"):
+                    size = position + len(line)
+                    break
+                count -= 1
+            index_file.truncate(count * _OFFSET.size)
+            pages_file.truncate(size)
+            return count, size
+    except FileNotFoundError:
+        return 0, 0
+
+
+def write_pages(directory: str, pages: Iterable[tuple[str, str]]) -> None:
+    """
+    Remplace le journal des pages d'une tâche par ``pages``.
+
+    Les fichiers sont écrits à côté puis renommés : un lecteur ne voit jamais de
+    journal à moitié écrit.
+    """
+    os.makedirs(directory, exist_ok=True)
+    pages_path = os.path.join(directory, PAGES_FILE)
+    index_path = os.path.join(directory, INDEX_FILE)
+    size = 0
+    with (
+        open(pages_path + ".tmp", "wb") as pages_file,
+        open(index_path + ".tmp", "wb") as index_file,
+    ):
+        for url, markdown in pages:
+            line = json.dumps({"url": url, "markdown": markdown}).encode("utf-8") + b"\n"
+            pages_file.write(line)
+            index_file.write(_OFFSET.pack(size))
+            size += len(line)
+    os.replace(index_path + ".tmp", index_path)
+    os.replace(pages_path + ".tmp", pages_path)
+
+
+def read_pages(
+    directory: str, offset: int = 0, limit: int | None = None
+) -> tuple[list[dict], int]:
+    """
+    Lit les pages ``offset`` à ``offset + limit`` du journal d'une tâche.
+
+    Retourne les pages lues et le nombre de pages du journal au moment de la
+    lecture ; un journal absent est vide.
+    """
+    try:
+        with (
+            open(os.path.join(directory, INDEX_FILE), "rb") as index_file,
+            open(os.path.join(directory, PAGES_FILE), "rb") as pages_file,
+        ):
+            total = index_file.seek(0, os.SEEK_END) // _OFFSET.size
+            stop = total if limit is None else min(total, offset + limit)
+            if offset >= stop:
+                return [], total
+
+            index_file.seek(offset * _OFFSET.size)
+            (position,) = _OFFSET.unpack(index_file.read(_OFFSET.size))
+            pages_file.seek(position)
+            pages = []
+            for _ in range(stop - offset):
+                line = pages_file.readline()
+                if not line.endswith(b"\n"):
+                    break
+                pages.append(json.loads(line))
+            return pages, total
+    except FileNotFoundError:
+        return [], 0
+    except (OSError, ValueError) as e:
+        # Journal remplacé pendant la lecture (fin de tâche) : la lecture suivante
+        # verra le journal final
+        logging.warning(f"Lecture du journal des pages impossible ({directory}): {e}")
+        return [], 0
+
+
+def iter_logged_pages(directory: str) -> Iterator[dict]:
+    """Parcourt toutes les pages du journal d'une tâche."""
+    with open(os.path.join(directory, PAGES_FILE), encoding="utf-8") as pages_file:
+        for line in pages_file:
+            yield json.loads(line)
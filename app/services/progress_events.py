@@ -0,0 +1,34 @@
+"""Notification des changements de progression aux flux d'événements."""
+
+import asyncio
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+# Événements des connexions abonnées, par tâche
+_subscribers: dict[str, set[asyncio.Event]] = {}
+
+
+def publish_progress(task_id: str) -> None:
+    """Signale aux abonnés d'une tâche que sa progression a changé."""
+    for event in _subscribers.get(task_id, ()):
+        event.set()
+
+
+@contextmanager
+def subscribe_progress(task_id: str) -> Iterator[asyncio.Event]:
+    """
+    Abonne une connexion aux changements de progression d'une tâche.
+
+    L'événement retourné est levé à chaque publication ; plusieurs publications
+    entre deux lectures sont fusionnées en une seule.
+    """
+    event = asyncio.Event()
+    _subscribers.setdefault(task_id, set()).add(event)
+    try:
+        yield event
+    finally:
+        subscribers = _subscribers.get(task_id)
+        if subscribers is not None:
+            subscribers.discard(event)
+            if not subscribers:
+                del _subscribers[task_id]
@@ -0,0 +1,228 @@
+"""Limitation adaptative du débit de requêtes par hôte."""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.robotparser import RobotFileParser
+
+from app.core.config import (
+    SCRAPER_RATE_DECREASE_FACTOR,
+    SCRAPER_RATE_INCREASE,
+    SCRAPER_RATE_INITIAL,
+    SCRAPER_RATE_LIMIT_ENABLED,
+    SCRAPER_RATE_LIMITER_IDLE_SECONDS,
+    SCRAPER_RATE_MAX,
+    SCRAPER_RATE_MIN,
+    SCRAPER_RETRY_AFTER_MAX_SECONDS,
+    SCRAPER_ROBOTS_TTL_SECONDS,
+)
+
+# Codes de réponse signalant que l'hôte demande de ralentir
+THROTTLE_STATUSES = frozenset({429, 503})
+
+# Registre partagé entre les crawls (créé à la première utilisation)
+_rate_limiter: "RateLimiter | None" = None
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Retourne le délai en secondes d'un en-tête ``Retry-After``.
+
+    L'en-tête est soit un nombre de secondes, soit une date HTTP ; le délai est
+    borné par ``SCRAPER_RETRY_AFTER_MAX_SECONDS``.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        delay = float(value)
+    else:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    return min(max(delay, 0.0), SCRAPER_RETRY_AFTER_MAX_SECONDS)
+
+
+class HostRateLimiter:
+    """
+    Seau à jetons d'un hôte, dont le débit s'adapte aux réponses (AIMD).
+
+    Chaque réponse saine augmente le débit de ``increase`` requêtes par seconde,
+    jusqu'à ``max_rate`` ; une réponse 429/503 le multiplie par ``decrease_factor``
+    et suspend l'hôte pendant la durée de ``Retry-After``. Un ``Crawl-delay`` du
+    robots.txt plafonne le débit ; il est relu toutes les ``robots_ttl`` secondes.
+    """
+
+    def __init__(
+        self,
+        rate: float = SCRAPER_RATE_INITIAL,
+        min_rate: float = SCRAPER_RATE_MIN,
+        max_rate: float = SCRAPER_RATE_MAX,
+        increase: float = SCRAPER_RATE_INCREASE,
+        decrease_factor: float = SCRAPER_RATE_DECREASE_FACTOR,
+        robots_ttl: float = SCRAPER_ROBOTS_TTL_SECONDS,
+    ):
+        self.min_rate = self.base_min_rate = min_rate
+        self.max_rate = self.base_max_rate = max_rate
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.rate = min(max(rate, min_rate), max_rate)
+        self.tokens = 1.0
+        self.paused_until = 0.0
+        self.throttled = 0
+        self.robots_ttl = robots_ttl
+        self.robots_read_at: float | None = None
+        self.last_used = time.monotonic()
+        self._updated_at = self.last_used
+        self._robots_lock = asyncio.Lock()
+
+    @property
+    def burst(self) -> float:
+        """Nombre de jetons accumulables : environ une seconde de débit."""
+        return max(1.0, self.rate)
+
+    def robots_expired(self) -> bool:
+        """Indique si les limites du robots.txt doivent être (re)lues."""
+        return (
+            self.robots_read_at is None
+            or time.monotonic() - self.robots_read_at >= self.robots_ttl
+        )
+
+    def apply_robots(self, robots: RobotFileParser | None) -> None:
+        """
+        Plafonne le débit selon le ``Crawl-delay`` ou ``Request-rate`` du robots.txt.
+
+        Les bornes configurées sont rétablies avant d'appliquer le nouveau plafond :
+        un délai retiré ou réduit du robots.txt relève le débit maximal.
+        """
+        self.robots_read_at = time.monotonic()
+        self.max_rate, self.min_rate = self.base_max_rate, self.base_min_rate
+        if robots is None:
+            return
+
+        delays = []
+        crawl_delay = robots.crawl_delay("*")
+        if crawl_delay:
+            delays.append(float(crawl_delay))
+        request_rate = robots.request_rate("*")
+        if request_rate and request_rate.requests:
+            delays.append(request_rate.seconds / request_rate.requests)
+        if delays and max(delays) > 0:
+            self.max_rate = min(self.max_rate, 1 / max(delays))
+            self.min_rate = min(self.min_rate, self.max_rate)
+            self.rate = min(self.rate, self.max_rate)
+            self.tokens = min(self.tokens, 1.0)
+
+    async def refresh_robots(
+        self, read_robots: Callable[[], Awaitable[RobotFileParser | None]]
+    ) -> None:
+        """
+        Relit le robots.txt avec ``read_robots`` lorsque ses limites ont expiré.
+
+        Une seule lecture a lieu à la fois ; les requêtes concurrentes de l'hôte
+        attendent son résultat.
+        """
+        if not self.robots_expired():
+            return
+        async with self._robots_lock:
+            if self.robots_expired():
+                self.apply_robots(await read_robots())
+
+    async def acquire(self) -> None:
+        """Attend qu'un jeton soit disponible pour envoyer une requête."""
+        while True:
+            now = time.monotonic()
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+
+            elapsed = now - self._updated_at
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self._updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def on_success(self) -> None:
+        """Augmente le débit après une réponse saine (croissance additive)."""
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after: float | None = None) -> None:
+        """Réduit le débit après une réponse 429/503 (décroissance multiplicative)."""
+        self.throttled += 1
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        self.tokens = 0.0
+        # Sans Retry-After, laisser passer au moins un intervalle au nouveau débit
+        pause = retry_after if retry_after is not None else 1 / self.rate
+        self.paused_until = max(self.paused_until, time.monotonic() + pause)
+
+    def snapshot(self) -> dict:
+        """Retourne l'état du limiteur."""
+        return {
+            "rate": round(self.rate, 3),
+            "max_rate": round(self.max_rate, 3),
+            "throttled": self.throttled,
+            "paused_for": round(max(0.0, self.paused_until - time.monotonic()), 3),
+        }
+
+
+class RateLimiter:
+    """
+    Limiteurs de débit des hôtes parcourus, partagés par tous les crawls.
+
+    Le limiteur d'un hôte sans requête depuis ``idle_seconds``, et qui n'est pas
+    suspendu par un ``Retry-After``, est oublié : le registre d'un processus de
+    longue durée ne grossit pas avec chaque site parcouru.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = SCRAPER_RATE_LIMIT_ENABLED,
+        idle_seconds: float = SCRAPER_RATE_LIMITER_IDLE_SECONDS,
+    ):
+        self.enabled = enabled
+        self.idle_seconds = idle_seconds
+        self.hosts: dict[str, HostRateLimiter] = {}
+        self._next_eviction = time.monotonic() + idle_seconds
+
+    def for_host(self, host: str) -> HostRateLimiter | None:
+        """Retourne le limiteur d'un hôte, ou ``None`` si la limitation est désactivée."""
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        if now >= self._next_eviction:
+            self.evict_idle(now)
+        limiter = self.hosts.get(host)
+        if limiter is None:
+            limiter = self.hosts[host] = HostRateLimiter()
+        limiter.last_used = now
+        return limiter
+
+    def evict_idle(self, now: float | None = None) -> None:
+        """Oublie les limiteurs des hôtes inactifs depuis ``idle_seconds``."""
+        now = time.monotonic() if now is None else now
+        self.hosts = {
+            host: limiter
+            for host, limiter in self.hosts.items()
+            if now - limiter.last_used < self.idle_seconds or limiter.paused_until > now
+        }
+        self._next_eviction = now + self.idle_seconds
+
+    def snapshot(self) -> dict[str, dict]:
+        """Retourne l'état des limiteurs de chaque hôte."""
+        return {host: limiter.snapshot() for host, limiter in self.hosts.items()}
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Retourne le registre partagé des limiteurs de débit."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter()
+    return _rate_limiter
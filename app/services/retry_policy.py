@@ -0,0 +1,106 @@
+"""Politique de nouvelles tentatives des téléchargements en échec."""
+
+import asyncio
+import random
+
+import aiohttp
+
+from app.core.config import (
+    SCRAPER_CONNECT_TIMEOUT,
+    SCRAPER_READ_TIMEOUT,
+    SCRAPER_REQUEST_TIMEOUT,
+    SCRAPER_RETRY_BASE_DELAY,
+    SCRAPER_RETRY_MAX_ATTEMPTS,
+    SCRAPER_RETRY_MAX_DELAY,
+)
+
+# Codes de réponse transitoires : la même requête peut réussir plus tard
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+def get_request_timeout() -> aiohttp.ClientTimeout:
+    """Retourne les délais d'une requête : connexion, lecture et durée totale."""
+    return aiohttp.ClientTimeout(
+        total=SCRAPER_REQUEST_TIMEOUT or None,
+        sock_connect=SCRAPER_CONNECT_TIMEOUT,
+        sock_read=SCRAPER_READ_TIMEOUT,
+    )
+
+
+class FetchError(Exception):
+    """
+    Échec du téléchargement d'une page.
+
+    ``status`` est le code HTTP reçu (``None`` pour une erreur réseau) et
+    ``retry_after`` le délai demandé par le serveur avant une nouvelle tentative.
+    """
+
+    def __init__(
+        self,
+        reason: str,
+        status: int | None = None,
+        retryable: bool = False,
+        retry_after: float | None = None,
+    ):
+        super().__init__(reason)
+        self.reason = reason
+        self.status = status
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_status(cls, status: int, retry_after: float | None = None) -> "FetchError":
+        """Construit l'erreur correspondant à une réponse HTTP en échec."""
+        return cls(
+            f"HTTP {status}",
+            status=status,
+            retryable=status in RETRYABLE_STATUSES,
+            retry_after=retry_after,
+        )
+
+    @classmethod
+    def from_exception(cls, error: Exception) -> "FetchError":
+        """Construit l'erreur correspondant à une exception levée pendant le crawl."""
+        if isinstance(error, FetchError):
+            return error
+        if isinstance(error, asyncio.TimeoutError | aiohttp.ServerTimeoutError):
+            return cls("Délai dépassé", retryable=True)
+        if isinstance(error, aiohttp.ClientConnectionError | aiohttp.ClientPayloadError):
+            return cls(f"Erreur réseau: {error}", retryable=True)
+        return cls(f"{type(error).__name__}: {error}")
+
+
+class RetryPolicy:
+    """
+    Nombre de tentatives et délai d'attente entre deux tentatives d'une page.
+
+    Le délai croît exponentiellement avec le nombre de tentatives, borné par
+    ``max_delay``, avec une gigue complète pour étaler les nouvelles tentatives
+    des pages tombées en échec au même moment. Un ``Retry-After`` du serveur
+    impose un délai minimal. La gigue est tirée de ``rng`` (le générateur du module
+    ``random`` par défaut).
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = SCRAPER_RETRY_MAX_ATTEMPTS,
+        base_delay: float = SCRAPER_RETRY_BASE_DELAY,
+        max_delay: float = SCRAPER_RETRY_MAX_DELAY,
+        rng: random.Random | None = None,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = rng or random
+
+    def should_retry(self, error: FetchError, attempts: int) -> bool:
+        """Indique si une page en échec après ``attempts`` tentatives doit être retentée."""
+        return error.retryable and attempts < self.max_attempts
+
+    def get_delay(self, error: FetchError, attempts: int) -> float:
+        """Retourne le délai avant la tentative suivante."""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        delay = self.rng.uniform(0, ceiling)
+        if error.retry_after is not None:
+            delay = max(delay, error.retry_after)
+        return delay
@@ -0,0 +1,34 @@
+"""Lecture du fichier robots.txt des sites parcourus."""
+
+import logging
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import aiohttp
+
+
+def get_origin(url: str) -> str:
+    """Retourne l'origine (schéma et hôte) d'une URL."""
+    parsed_url = urlparse(url)
+    return f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+
+async def fetch_robots(session: aiohttp.ClientSession, url: str) -> RobotFileParser | None:
+    """
+    Télécharge et analyse le robots.txt de l'origine d'une URL.
+
+    Retourne ``None`` si le fichier est absent ou inaccessible.
+    """
+    robots_url = f"{get_origin(url)}/robots.txt"
+    try:
+        async with session.get(robots_url, timeout=30) as response:
+            if response.status != 200:
+                return None
+            content = await response.text(errors="replace")
+    except Exception as e:
+        logging.warning(f"Impossible de lire {robots_url}: {e}")
+        return None
+
+    robots = RobotFileParser(robots_url)
+    robots.parse(content.splitlines())
+    return robots
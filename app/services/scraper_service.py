@@ -2,62 +2,170 @@
 
 import asyncio
 import logging
+import os
+import re
+import time
 import uuid
-import zipfile
-from collections import deque
-from datetime import datetime
-from io import BytesIO
-from urllib.parse import urldefrag, urljoin, urlparse
+from collections.abc import Callable, Coroutine, Iterator
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
 
 import aiohttp
-import html2text
-from bs4 import BeautifulSoup
 
-from app.schemas.scraper_schemas import ExportFormat
-
-# Dictionnaire global pour suivre la progression des tâches de scraping
-scraping_tasks: dict[str, dict] = {}
-
-
-def normalize_url(url: str) -> str:
-    """Normalise l'URL en supprimant le fragment et la barre oblique finale."""
-    url, _ = urldefrag(url)
-    if url.endswith("/"):
-        url = url[:-1]
-    return url
+from app.core.config import (
+    SCRAPER_BATCH_MAX_CONCURRENCY,
+    SCRAPER_CANCEL_WAIT_SECONDS,
+    SCRAPER_CHECKPOINT_INTERVAL,
+    SCRAPER_CRAWL_TIME_BUDGET,
+    SCRAPER_DEDUP_CONTENT,
+    SCRAPER_MAX_CONCURRENCY,
+    SCRAPER_MAX_PER_HOST,
+    SCRAPER_REUSE_MAX_AGE_MINUTES,
+)
+from app.schemas.scraper_schemas import (
+    BatchExportMode,
+    DiscoveryMode,
+    ExportFormat,
+    FrontierMode,
+)
+from app.services.batch_crawl import BatchCrawl
+from app.services.conversion_cache import ConversionCache, get_conversion_cache
+from app.services.crawl_checkpoint import (
+    CrawlCheckpoint,
+    discard_checkpoint,
+    load_checkpoint,
+    move_checkpoint,
+)
+from app.services.crawl_scheduler import FairShare, run_crawl_pool
+from app.services.export_service import ZipExport, iter_markdown
+from app.services.extraction_profiles import ExtractionProfile, build_profile
+from app.services.html_converter import ExtractedPage, conversion_key, convert_page
+from app.services.http_cache import HttpCache, conditional_headers, get_http_cache
+from app.services.http_client import get_http_session
+from app.services.job_runner import JobRunner
+from app.services.metrics import CONVERSION_CACHE, record_stage, register_gauge
+from app.services.rate_limiter import (
+    THROTTLE_STATUSES,
+    get_rate_limiter,
+    parse_retry_after,
+)
+from app.services.retry_policy import FetchError, RetryPolicy, get_request_timeout
+from app.services.robots import fetch_robots
+from app.services.shared_crawl import (
+    SharedCrawl,
+    complete_task,
+    export_from_completed_task,
+    find_inflight_crawl,
+    get_crawl_key,
+    register_crawl,
+    unregister_crawl,
+)
+from app.services.sitemap import discover_sitemap_urls
+from app.services.task_store import ACTIVE_STATUSES, get_task_store
+from app.services.url_frontier import UrlFrontier
+
+# Tâches d'arrière-plan en cours (références fortes) et exports de tâches réutilisées
+_running_tasks: set[asyncio.Task] = set()
+_background_tasks: dict[str, asyncio.Task] = {}
+
+# Lots de sites en cours dans ce processus
+_batches: dict[str, BatchCrawl] = {}
+
+# Boucle des tâches de ce processus (créée à la première utilisation)
+_job_runner: JobRunner | None = None
+
+
+async def fetch_page(
+    url: str,
+    session: aiohttp.ClientSession,
+    stats: dict[str, int],
+    http_cache: HttpCache | None = None,
+    timings: dict | None = None,
+) -> str:
+    """
+    Télécharge le HTML d'une page, en revalidant l'entrée du cache HTTP si elle existe.
+
+    Une réponse 304 réutilise le contenu en cache ; les compteurs de succès et
+    d'échecs du cache sont mis à jour dans ``stats``. Le débit de l'hôte est
+    attendu par l'ordonnanceur (``run_handler``) ; la réponse l'ajuste. Lève
+    ``FetchError`` pour toute autre réponse qu'une page HTML, avec le délai
+    ``Retry-After`` d'une réponse 429/503. La durée des étapes réseau (DNS,
+    connexion, premier octet, corps) est ajoutée au résumé ``timings`` du crawl.
+    """
+    cached = await asyncio.to_thread(http_cache.get, url) if http_cache else None
+    limiter = get_rate_limiter().for_host(urlparse(url).netloc)
 
+    request_timings: dict[str, float] = {}
+    try:
+        async with session.get(
+            url,
+            timeout=get_request_timeout(),
+            headers=conditional_headers(cached),
+            trace_request_ctx=request_timings,
+        ) as response:
+            if response.status in THROTTLE_STATUSES:
+                stats["throttled_requests"] += 1
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if limiter is not None:
+                    limiter.on_throttle(retry_after)
+                raise FetchError.from_status(response.status, retry_after)
+
+            if limiter is not None and response.status < 500:
+                limiter.on_success()
+
+            if response.status == 304 and cached is not None:
+                stats["cache_hits"] += 1
+                await asyncio.to_thread(http_cache.touch, url)
+                return cached.body
 
-def get_file_path_from_url(url: str, base_url: str) -> str:
-    """Convertit une URL en chemin de fichier relatif."""
-    base_parsed = urlparse(base_url)
-    url_parsed = urlparse(url)
+            if response.status != 200:
+                raise FetchError.from_status(response.status)
 
-    # Si l'URL ne contient qu'un chemin relatif
-    if url_parsed.path.startswith(base_parsed.path):
-        relative_path = url_parsed.path[len(base_parsed.path) :].lstrip("/")
-    else:
-        relative_path = url_parsed.path.lstrip("/")
+            started = time.perf_counter()
+            html_content = await response.text()
+            request_timings["download"] = time.perf_counter() - started
+            stats["downloaded_bytes"] += len(html_content)
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            no_store = "no-store" in response.headers.get("Cache-Control", "")
+    finally:
+        for stage, seconds in request_timings.items():
+            record_stage(stage, seconds, timings)
 
-    # S'il n'y a pas de chemin, utiliser 'index'
-    if not relative_path:
-        relative_path = "index"
+    if http_cache is not None:
+        stats["cache_misses"] += 1
+        if (etag or last_modified) and not no_store:
+            await asyncio.to_thread(http_cache.put, url, html_content, etag, last_modified)
 
-    # Convertir les chemins en noms de fichiers valides
-    # Remplacer les caractères non alphanumériques par des tirets
-    import re
+    return html_content
 
-    relative_path = re.sub(r"[^a-zA-Z0-9/\-_]", "-", relative_path)
 
-    # S'assurer qu'il n'y a pas de double tirets
-    relative_path = re.sub(r"-+", "-", relative_path)
+async def convert_cached(
+    html_content: str,
+    url: str,
+    base_netloc: str,
+    base_path: str,
+    profile: ExtractionProfile | None = None,
+    conversion_cache: ConversionCache | None = None,
+) -> ExtractedPage:
+    """
+    Convertit une page, ou reprend sa conversion dans le cache des conversions.
 
-    # Assurez-vous que le chemin se termine par .md
-    if not relative_path.endswith(".md"):
-        if relative_path.endswith("/"):
-            relative_path = relative_path[:-1]
-        relative_path += ".md"
+    Une page dont le HTML n'a pas changé depuis une conversion précédente (même
+    tâche, autre tâche ou avant un redémarrage) n'est ni analysée ni convertie.
+    """
+    if conversion_cache is None:
+        return await convert_page(html_content, url, base_netloc, base_path, profile)
 
-    return relative_path
+    key = conversion_key(html_content, url, base_netloc, base_path, profile)
+    page = await asyncio.to_thread(conversion_cache.get, key)
+    if page is not None:
+        CONVERSION_CACHE.inc(label_value="hit")
+        return page
+    CONVERSION_CACHE.inc(label_value="miss")
+    page = await convert_page(html_content, url, base_netloc, base_path, profile)
+    await asyncio.to_thread(conversion_cache.put, key, page)
+    return page
 
 
 async def process_url(
@@ -65,221 +173,298 @@ async def process_url(
     session: aiohttp.ClientSession,
     base_netloc: str,
     base_path: str,
-    visited: set[str],
-    url_to_markdown: dict[str, str],
-    total_urls: list[str],
-    task_id: str,
+    crawl: SharedCrawl,
+    http_cache: HttpCache | None = None,
+    frontier: UrlFrontier | None = None,
+    profile: ExtractionProfile | None = None,
+    conversion_cache: ConversionCache | None = None,
 ) -> list[str]:
-    """Traite une URL spécifique et extrait son contenu en markdown."""
-    new_urls_to_process = []
+    """
+    Traite une URL spécifique et extrait son contenu en markdown.
 
-    try:
-        async with session.get(url, timeout=30) as response:
-            if response.status != 200:
-                return new_urls_to_process
+    Retourne les liens du périmètre trouvés dans la page ; la frontière se charge
+    d'écarter ceux qui ont déjà été vus. Les échecs sont levés pour que
+    l'ordonnanceur décide d'une nouvelle tentative.
 
-            html_content = await response.text()
-            soup = BeautifulSoup(html_content, "html.parser")
-
-            # Extraire le contenu principal
-            main_content = soup.find("main", {"id": "article-contents"})
-            if main_content is None:
-                main_content = soup.find("div", {"class": "markdown-body"})
-                if main_content is None:
-                    main_content = soup
-
-            # Convertir le contenu principal en Markdown
-            html_main_content = str(main_content)
-            converter = html2text.HTML2Text()
-            converter.ignore_links = False
-            markdown = converter.handle(html_main_content)
-
-            # Supprimer tout avant le premier titre de niveau 1
-            lines = markdown.split("\n")
-            start_index = None
-            for i, line in enumerate(lines):
-                if line.startswith("# "):
-                    start_index = i
-                    break
-
-            if start_index is not None:
-                markdown = "\n".join(lines[start_index:])
-
-            # Stocker le contenu Markdown associé à l'URL - même si aucun titre h1 n'est trouvé
-            url_to_markdown[url] = markdown
-
-            # Trouver tous les liens et les ajouter à la file d'attente
-            for link in main_content.find_all("a", href=True):
-                href = link["href"]
-                next_url = urljoin(url, href)
-                parsed_next_url = urlparse(next_url)
-                if parsed_next_url.netloc != base_netloc:
-                    continue
-                next_url = normalize_url(next_url)
-                if not parsed_next_url.path.startswith(base_path):
-                    continue
-                if next_url not in visited:
-                    new_urls_to_process.append(next_url)
-                    total_urls.append(next_url)
-
-        # Mettre à jour la progression
-        scraping_tasks[task_id]["processed_pages"] += 1
-        scraping_tasks[task_id]["total_pages"] = len(total_urls)
-        scraping_tasks[task_id]["progress"] = min(
-            100,
-            int(
-                (scraping_tasks[task_id]["processed_pages"] / max(len(total_urls), 1)) * 100
-            ),
-        )
+    Une page qui déclare une autre URL canonique est enregistrée sous cette URL,
+    marquée vue dans ``frontier`` ; si l'URL canonique est déjà connue, la page
+    est un doublon. Une page dont le Markdown a déjà été vu n'est enregistrée
+    qu'une fois, mais ses liens sont suivis.
 
-    except Exception as e:
-        logging.error(f"Échec du traitement de {url}: {e}")
-    return new_urls_to_process
+    La région de contenu est choisie par ``profile``, ou par le profil enregistré
+    pour l'hôte.
+    """
+    html_content = await fetch_page(url, session, crawl.stats, http_cache, crawl.timings)
+
+    # L'extraction et la conversion s'exécutent hors de la boucle d'événements
+    page = await convert_cached(
+        html_content, url, base_netloc, base_path, profile, conversion_cache
+    )
+    for stage, seconds in page.timings.items():
+        record_stage(stage, seconds, crawl.timings)
+
+    if page.canonical_url is not None and frontier is not None:
+        if not frontier.mark_seen(page.canonical_url):
+            crawl.record_duplicate()
+            return page.links
+        url = page.canonical_url
+
+    # Contenu déjà enregistré (même HTML sous une autre URL, par exemple) : la page
+    # n'est pas exportée, mais ses liens relatifs, résolus depuis cette URL,
+    # peuvent mener à des pages encore inconnues
+    if SCRAPER_DEDUP_CONTENT and not crawl.add_content(page.markdown):
+        return page.links
+
+    # Stocker le contenu Markdown associé à l'URL - même si aucun titre h1 n'est trouvé
+    crawl.add_page(url, page.markdown)
+    return page.links
+
+
+def filter_excluded(urls: list[str], patterns: list[re.Pattern]) -> list[str]:
+    """Retire les URLs qui correspondent à l'un des motifs d'exclusion."""
+    if not patterns:
+        return urls
+    return [url for url in urls if not any(pattern.search(url) for pattern in patterns)]
+
+
+async def open_checkpoint(
+    crawl: SharedCrawl, frontier: UrlFrontier, directory: str | None
+) -> CrawlCheckpoint | None:
+    """
+    Ouvre le point de reprise du crawl et reprend l'état qu'il contient.
 
+    Les pages déjà enregistrées sont rejouées sans nouveau téléchargement ; seules
+    les URLs découvertes mais pas encore traitées sont remises dans la frontière.
+    Retourne ``None`` sans ``directory``.
+    """
+    if directory is None:
+        return None
+    try:
+        state = load_checkpoint(directory)
+        checkpoint = CrawlCheckpoint(directory, state)
+    except OSError as e:
+        logging.error(f"Point de reprise indisponible pour {crawl.start_url}: {e}")
+        return None
 
-async def crawl_and_collect_async(start_url: str, task_id: str) -> dict[str, str]:
+    if state is not None:
+        await crawl.restore(state)
+        page_urls = {page["url"] for page in state.pages}
+        done = state.done | (page_urls & state.queued.keys())
+        # Le journal garde les URLs découvertes ; la frontière, leurs formes canoniques
+        queued = {frontier.canonicalize(url) for url in state.queued}
+        seen = queued | {frontier.canonicalize(url) for url in state.aliases | page_urls}
+        frontier.restore(
+            seen,
+            [(url, depth) for url, depth in state.queued.items() if url not in done],
+            len(done),
+            aliases=len(seen) - len(queued),
+        )
+        crawl.update_progress(**frontier.stats())
+        logging.info(
+            f"Reprise du crawl de {crawl.start_url}: {len(state.pages)} pages déjà "
+            f"collectées, {frontier.queued} URLs à parcourir"
+        )
+    frontier.journal = checkpoint.record
+    crawl.checkpoint = checkpoint
+    return checkpoint
+
+
+async def refresh_robots_limits(
+    session: aiohttp.ClientSession, start_url: str, host: str
+) -> None:
+    """Relit le robots.txt de l'hôte lorsque ses limites de débit ont expiré."""
+    limiter = get_rate_limiter().for_host(host)
+    if limiter is not None:
+        await limiter.refresh_robots(lambda: fetch_robots(session, start_url))
+
+
+async def crawl_and_collect_async(
+    crawl: SharedCrawl,
+    max_concurrency: int = SCRAPER_MAX_CONCURRENCY,
+    max_per_host: int = SCRAPER_MAX_PER_HOST,
+    use_cache: bool = True,
+    use_bloom_filter: bool = False,
+    discovery: DiscoveryMode = DiscoveryMode.LINKS,
+    max_pages: int | None = None,
+    max_depth: int | None = None,
+    max_bytes: int | None = None,
+    time_budget: float | None = None,
+    scope_path: str | None = None,
+    exclude: list[str] | None = None,
+    fair_share: FairShare | None = None,
+    profile: ExtractionProfile | None = None,
+    checkpoint_dir: str | None = None,
+    keep_checkpoint: bool = False,
+) -> dict[str, str]:
     """
     Version asynchrone de la fonction de crawl qui parcourt la documentation
     et collecte le contenu Markdown de chaque page.
+
+    Les pages sont partagées par toutes les tâches attachées au crawl. En mode
+    sitemap, la frontière est remplie dès le départ avec toutes les pages du site.
+    Le crawl s'arrête dès qu'un de ses budgets (pages, profondeur, octets, durée)
+    est épuisé ; les pages déjà collectées sont exportées.
+
+    Seuls les liens du même hôte sous ``scope_path`` (par défaut le chemin de
+    l'URL de départ) sont suivis, hormis ceux qui correspondent à un motif
+    d'``exclude``. Les crawls d'un lot partagent ``fair_share``. ``profile``
+    remplace le profil d'extraction enregistré pour l'hôte. Sans ``use_cache``,
+    ni le cache HTTP ni le cache des conversions ne sont utilisés.
+
+    Avec ``checkpoint_dir``, l'état du crawl y est enregistré au fil de l'eau et un
+    crawl interrompu y reprend là où il s'était arrêté. Le point de reprise est
+    supprimé à la fin du crawl, sauf si son budget de durée l'a interrompu ou avec
+    ``keep_checkpoint`` (racine d'un lot, dont le point de reprise dure autant que
+    le lot).
     """
     # Initialisation des structures de données
-    visited = set()
-    queue = deque([start_url])
-    total_urls = [start_url]
+    start_url = crawl.start_url
+    frontier = UrlFrontier(
+        use_bloom_filter=use_bloom_filter, max_pages=max_pages, max_depth=max_depth
+    )
     base_netloc = urlparse(start_url).netloc
-    base_path = urlparse(start_url).path
-    url_to_markdown = {}
-
-    # Initialiser la progression
-    scraping_tasks[task_id]["start_time"] = datetime.now().isoformat()
-    scraping_tasks[task_id]["processed_pages"] = 0
-    scraping_tasks[task_id]["total_pages"] = 1  # Au moins l'URL de départ
-    scraping_tasks[task_id]["progress"] = 0
-    scraping_tasks[task_id]["url"] = start_url
-
-    async with aiohttp.ClientSession() as session:
-        while queue:
-            # Traiter au maximum 10 URLs en parallèle
-            batch_urls = []
-            for _ in range(min(10, len(queue))):
-                if not queue:
-                    break
-                url = queue.popleft()
-                url = normalize_url(url)
-                if url in visited:
-                    continue
-                visited.add(url)
-                batch_urls.append(url)
-
-            # Traiter ce lot d'URLs en parallèle
-            tasks = [
-                process_url(
-                    url,
-                    session,
-                    base_netloc,
-                    base_path,
-                    visited,
-                    url_to_markdown,
-                    total_urls,
-                    task_id,
-                )
-                for url in batch_urls
-            ]
-            results = await asyncio.gather(*tasks)
-
-            # Ajouter les nouvelles URLs découvertes à la queue
-            for new_urls in results:
-                for url in new_urls:
-                    if url not in visited:
-                        queue.append(url)
-
-    # Combiner tout le contenu Markdown en un seul texte
-    all_markdown = "\n\n".join(url_to_markdown.values())
-
-    # Créer le contenu ZIP si nécessaire
-    zip_content = None
-    if scraping_tasks[task_id]["format"] in [ExportFormat.ZIP_FILES, ExportFormat.ZIP_FLAT]:
-        try:
-            # Créer un buffer en mémoire pour le ZIP
-            zip_buffer = BytesIO()
-
-            # Créer un fichier ZIP avec compression
-            with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-                # Pour chaque URL, ajouter un fichier dans le ZIP
-                for i, (url, markdown_content) in enumerate(url_to_markdown.items()):
-                    # Déterminer le chemin du fichier en fonction du format
-                    if scraping_tasks[task_id]["format"] == ExportFormat.ZIP_FILES:
-                        # Format hiérarchique - conserver la structure des dossiers
-                        file_path = get_file_path_from_url(url, start_url)
-                    else:  # ZIP_FLAT
-                        # Format plat - tous les fichiers à la racine
-                        # Extraire uniquement le nom du fichier et ajouter un indice pour éviter les collisions
-                        parsed_url = urlparse(url)
-                        path_segments = parsed_url.path.strip("/").split("/")
-                        file_name = path_segments[-1] if path_segments else f"page_{i}"
-                        if not file_name:
-                            file_name = f"page_{i}"
-                        if not file_name.endswith(".md"):
-                            file_name = f"{file_name}.md"
-                        # Nettoyer le nom de fichier des caractères non valides
-                        import re
-
-                        file_name = re.sub(r"[^a-zA-Z0-9\-_.]", "-", file_name)
-                        file_name = re.sub(r"-+", "-", file_name)
-                        # Ajouter un index pour éviter les doublons
-                        file_path = f"{i + 1:03d}_{file_name}"
-
-                    # Éviter les doublons dans les noms de fichiers
-                    if not file_path:
-                        file_path = f"page_{i}.md"
-
-                    # Encoder le contenu en bytes avec utf-8
-                    encoded_content = markdown_content.encode("utf-8")
-
-                    # Ajouter le fichier au ZIP
-                    zip_file.writestr(file_path, encoded_content)
-
-                # Ajouter un fichier README avec des informations sur le scraping
-                readme_content = f"""# Documentation scrapée depuis {start_url}
-
-Date: {datetime.now().isoformat()}
-Nombre de pages: {len(url_to_markdown)}
-
-## Pages incluses:
-
-{chr(10).join([f"- [{url}]({url})" for url in url_to_markdown.keys()])}
-"""
-                zip_file.writestr("README.md", readme_content.encode("utf-8"))
-
-            # Rembobiner le buffer et récupérer le contenu
-            zip_buffer.seek(0)
-            zip_content = zip_buffer.getvalue()
-
-        except Exception as e:
-            print(f"Erreur lors de la création du ZIP: {e}")
-            # En cas d'erreur, on crée quand même un fichier ZIP de base avec un message d'erreur
-            zip_buffer = BytesIO()
-            with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-                error_message = f"Erreur lors de la création du ZIP: {e}\n\nContenu brut:\n\n{all_markdown}"
-                zip_file.writestr("error.md", error_message.encode("utf-8"))
-            zip_buffer.seek(0)
-            zip_content = zip_buffer.getvalue()
-
-    # Mettre à jour l'état de la tâche
-    scraping_tasks[task_id]["status"] = "completed"
-    scraping_tasks[task_id]["progress"] = 100
-    scraping_tasks[task_id]["end_time"] = datetime.now().isoformat()
-    scraping_tasks[task_id]["markdown_content"] = all_markdown
-    scraping_tasks[task_id]["url_to_markdown"] = url_to_markdown
-    scraping_tasks[task_id]["zip_content"] = zip_content
-
-    return url_to_markdown
+    base_path = scope_path or urlparse(start_url).path
+    exclude_patterns = [re.compile(pattern) for pattern in exclude or []]
+    http_cache = get_http_cache() if use_cache else None
+    conversion_cache = get_conversion_cache() if use_cache else None
+    time_budget = time_budget or SCRAPER_CRAWL_TIME_BUDGET
+    deadline = time.monotonic() + time_budget if time_budget else None
+
+    def report_progress(current_url: str | None = None) -> None:
+        stats = frontier.stats()
+        stats["current_url"] = current_url
+        expected_pages = min(stats["total_pages"], max_pages or stats["total_pages"])
+        stats["progress"] = min(
+            100, int(stats["processed_pages"] / max(expected_pages, 1) * 100)
+        )
+        crawl.update_progress(**stats)
+        crawl.save_checkpoint()
+
+    # Session partagée : connexions, sessions TLS et résolutions DNS réutilisées
+    session = get_http_session()
+    try:
+        # Un crawl interrompu reprend là où son point de reprise s'arrête
+        await open_checkpoint(crawl, frontier, checkpoint_dir)
+        frontier.add(start_url)
+
+        # Le robots.txt plafonne le débit de l'hôte et liste ses sitemaps
+        robots = await fetch_robots(session, start_url)
+        limiter = get_rate_limiter().for_host(base_netloc)
+        if limiter is not None and limiter.robots_expired():
+            limiter.apply_robots(robots)
+
+        follow_links = True
+        if discovery != DiscoveryMode.LINKS:
+            sitemap_urls = await discover_sitemap_urls(
+                session, start_url, base_netloc, base_path, robots
+            )
+            for url in filter_excluded(sitemap_urls, exclude_patterns):
+                frontier.add(url, depth=1)
+            report_progress()
+            # Sans sitemap exploitable, le suivi des liens prend le relais
+            combined = discovery == DiscoveryMode.SITEMAP_AND_LINKS
+            follow_links = combined or not sitemap_urls
+
+        async def visit(url: str) -> list[str]:
+            await refresh_robots_limits(session, start_url, base_netloc)
+            links = await process_url(
+                url,
+                session,
+                base_netloc,
+                base_path,
+                crawl,
+                http_cache,
+                frontier,
+                profile,
+                conversion_cache,
+            )
+            if max_bytes and crawl.stats["downloaded_bytes"] >= max_bytes:
+                frontier.close("max_bytes")
+            return filter_excluded(links, exclude_patterns) if follow_links else []
+
+        # Un nouveau téléchargement démarre dès qu'un emplacement se libère
+        await run_crawl_pool(
+            frontier,
+            visit,
+            max_concurrency,
+            max_per_host,
+            on_progress=report_progress,
+            retry_policy=RetryPolicy(),
+            on_failure=crawl.record_failure,
+            deadline=deadline,
+            fair_share=fair_share,
+        )
+        if frontier.stop_reason is not None:
+            crawl.update_progress(stop_reason=frontier.stop_reason)
+    except Exception as e:
+        # Les tâches attachées ne doivent pas rester en cours indéfiniment
+        logging.error(f"Échec du crawl de {start_url}: {e}")
+        await crawl.complete(status="error")
+        return crawl.url_to_markdown
+    finally:
+        unregister_crawl(crawl)
+        # Crawl interrompu ou annulé : il pourra reprendre depuis ce point
+        crawl.close_checkpoint()
+
+    # Terminer les exports de toutes les tâches attachées
+    await crawl.complete()
+    if not keep_checkpoint and frontier.stop_reason != "time_budget":
+        crawl.close_checkpoint(discard=True)
+
+    return crawl.url_to_markdown
+
+
+def initial_task_state(url: str, format: ExportFormat, filename: str) -> dict:
+    """Retourne l'état d'une tâche qui vient d'être mise en attente."""
+    return {
+        "status": "pending",
+        "url": url,
+        "start_time": datetime.now().isoformat(),
+        "end_time": None,
+        "processed_pages": 0,
+        "total_pages": 0,
+        "queued_pages": 0,
+        "in_flight_pages": 0,
+        "progress": 0,
+        "failed_pages": 0,
+        "duplicate_pages": 0,
+        "throttled_requests": 0,
+        "downloaded_bytes": 0,
+        "failures": [],
+        "stop_reason": None,
+        "current_url": None,
+        "cache_hits": 0,
+        "cache_misses": 0,
+        "markdown_size": 0,
+        "timings": {},
+        "format": format,
+        "filename": filename,
+    }
 
 
 def start_scraping_task(
-    url: str, format: ExportFormat = ExportFormat.SINGLE_FILE, filename: str | None = None
+    url: str,
+    format: ExportFormat = ExportFormat.SINGLE_FILE,
+    filename: str | None = None,
+    max_concurrency: int | None = None,
+    max_per_host: int | None = None,
+    use_cache: bool = True,
+    reuse_max_age_minutes: int | None = None,
+    frontier_mode: FrontierMode = FrontierMode.EXACT,
+    discovery: DiscoveryMode = DiscoveryMode.LINKS,
+    max_pages: int | None = None,
+    max_depth: int | None = None,
+    max_bytes: int | None = None,
+    deadline_seconds: float | None = None,
+    extraction: dict | None = None,
+    compression_level: int | None = None,
 ) -> str:
-    """Démarre une tâche de scraping et retourne son identifiant."""
+    """
+    Met en attente une tâche de scraping et retourne son identifiant.
+
+    La tâche est enregistrée dans le stockage partagé ; le premier processus de
+    l'API disponible la réclame et l'exécute (voir ``run_job``).
+    """
     task_id = str(uuid.uuid4())
 
     # Extraire le dernier segment de l'URL pour le nom du fichier si non fourni
@@ -291,62 +476,461 @@ def start_scraping_task(
         )
 
     # Initialiser l'état de la tâche
-    scraping_tasks[task_id] = {
-        "status": "running",
-        "url": url,
-        "start_time": None,
-        "end_time": None,
-        "processed_pages": 0,
-        "total_pages": 0,
-        "progress": 0,
-        "markdown_content": None,
-        "url_to_markdown": None,
-        "zip_content": None,
-        "format": format,
-        "filename": filename,
+    budgets = {
+        "max_pages": max_pages,
+        "max_depth": max_depth,
+        "max_bytes": max_bytes,
+        "deadline_seconds": deadline_seconds,
     }
+    if reuse_max_age_minutes is None:
+        reuse_max_age_minutes = SCRAPER_REUSE_MAX_AGE_MINUTES
+    get_task_store().create(
+        task_id,
+        {
+            **initial_task_state(url, format, filename),
+            "max_concurrency": max_concurrency or SCRAPER_MAX_CONCURRENCY,
+            "max_per_host": max_per_host or SCRAPER_MAX_PER_HOST,
+            "compression_level": compression_level,
+            "crawl_key": get_crawl_key(
+                url, {"discovery": discovery, "extraction": extraction, **budgets}
+            ),
+            "options": {
+                "use_cache": use_cache,
+                "reuse_max_age_minutes": reuse_max_age_minutes,
+                "frontier_mode": frontier_mode,
+                "discovery": discovery,
+                "extraction": extraction,
+                **budgets,
+            },
+            **budgets,
+        },
+    )
+    get_job_runner().notify()
 
-    # Lancer la tâche en arrière-plan
-    asyncio.create_task(crawl_and_collect_async(url, task_id))
+    return task_id
+
+
+def start_batch_task(
+    seeds: list[dict],
+    format: ExportFormat = ExportFormat.ZIP_FILES,
+    export_mode: BatchExportMode = BatchExportMode.COMBINED,
+    filename: str | None = None,
+    max_concurrency: int | None = None,
+    max_per_host: int | None = None,
+    use_cache: bool = True,
+    frontier_mode: FrontierMode = FrontierMode.EXACT,
+    deadline_seconds: float | None = None,
+    compression_level: int | None = None,
+) -> str:
+    """
+    Met en attente une tâche qui parcourt un lot de sites et retourne son identifiant.
+
+    Chaque racine (``url``, ``scope_path``, ``exclude``, ``discovery`` et budgets)
+    a son propre périmètre ; ``max_concurrency`` borne les téléchargements
+    simultanés de tout le lot.
+    """
+    task_id = str(uuid.uuid4())
+    seeds = [{**seed, "url": str(seed["url"])} for seed in seeds]
+    get_task_store().create(
+        task_id,
+        {
+            **initial_task_state(seeds[0]["url"], format, filename or "documentation"),
+            "kind": "batch",
+            "export_mode": export_mode,
+            "seeds": [{"url": seed["url"], "status": "pending"} for seed in seeds],
+            "max_concurrency": max_concurrency or SCRAPER_BATCH_MAX_CONCURRENCY,
+            "max_per_host": max_per_host or SCRAPER_MAX_PER_HOST,
+            "compression_level": compression_level,
+            # Un lot n'est jamais partagé ni réutilisé par une autre tâche
+            "crawl_key": f"batch:{task_id}",
+            "options": {
+                "use_cache": use_cache,
+                "frontier_mode": frontier_mode,
+                "deadline_seconds": deadline_seconds,
+                "seeds": seeds,
+            },
+        },
+    )
+    get_job_runner().notify()
 
     return task_id
 
 
+# Paramètres d'une tâche interrompue repris par la tâche qui la reprend
+_RESUMED_SETTINGS = (
+    "kind",
+    "export_mode",
+    "max_concurrency",
+    "max_per_host",
+    "compression_level",
+    "crawl_key",
+    "options",
+    "max_pages",
+    "max_depth",
+    "max_bytes",
+    "deadline_seconds",
+)
+
+
+def resume_scraping_task(task_id: str) -> str | None:
+    """
+    Met en attente la reprise d'une tâche interrompue et retourne son identifiant.
+
+    La nouvelle tâche reprend les paramètres et le point de reprise de la tâche
+    interrompue (annulée, en erreur ou arrêtée par son budget de durée) : seules
+    les pages qui n'avaient pas encore été collectées sont téléchargées. Retourne
+    ``None`` si la tâche n'a pas de point de reprise.
+    """
+    task_store = get_task_store()
+    task = task_store[task_id]
+    resumed_task_id = str(uuid.uuid4())
+    if not move_checkpoint(
+        task_store.checkpoint_directory(task_id),
+        task_store.checkpoint_directory(resumed_task_id),
+    ):
+        return None
+
+    metadata = {
+        **initial_task_state(task["url"], task["format"], task["filename"]),
+        **{key: task[key] for key in _RESUMED_SETTINGS if key in task},
+        "resumed_from": task_id,
+    }
+    if task.get("kind") == "batch":
+        metadata["crawl_key"] = f"batch:{resumed_task_id}"
+        metadata["seeds"] = [
+            {"url": seed["url"], "status": "pending"} for seed in task["seeds"]
+        ]
+    task_store.create(resumed_task_id, metadata)
+    get_job_runner().notify()
+
+    return resumed_task_id
+
+
+def run_job(task_id: str) -> None:
+    """
+    Exécute une tâche réclamée par ce processus.
+
+    Si un crawl du même site est déjà en cours, la tâche s'y attache au lieu d'en
+    lancer un nouveau. Avec ``reuse_max_age_minutes``, les pages d'un crawl terminé
+    depuis moins de ce délai sont réutilisées sans nouveau téléchargement.
+    """
+    task_store = get_task_store()
+    task = task_store[task_id]
+    if task.get("kind") == "batch":
+        run_batch_job(task_id)
+        return
+
+    options = task["options"]
+    crawl_key = task["crawl_key"]
+
+    # Réutiliser un crawl récent du même site si la requête l'autorise
+    if options["reuse_max_age_minutes"] > 0:
+        completed_after = datetime.now() - timedelta(
+            minutes=options["reuse_max_age_minutes"]
+        )
+        source_task_id = task_store.find_completed(crawl_key, completed_after.isoformat())
+        if source_task_id and task_store.get_result(source_task_id) is not None:
+            _background_tasks[task_id] = run_in_background(
+                export_from_completed_task(task_id, source_task_id),
+                lambda _: _background_tasks.pop(task_id, None),
+            )
+            return
+
+    # S'attacher au crawl en cours du même site, ou en lancer un nouveau
+    crawl = find_inflight_crawl(crawl_key)
+    if crawl is not None:
+        crawl.attach(task_id)
+        return
+
+    crawl = SharedCrawl(crawl_key, task["url"])
+    crawl.attach(task_id)
+    register_crawl(crawl)
+
+    # Lancer la tâche en arrière-plan
+    crawl.runner = run_in_background(
+        crawl_and_collect_async(
+            crawl,
+            max_concurrency=task["max_concurrency"],
+            max_per_host=task["max_per_host"],
+            use_cache=options["use_cache"],
+            use_bloom_filter=options["frontier_mode"] == FrontierMode.BLOOM,
+            discovery=DiscoveryMode(options["discovery"]),
+            max_pages=options["max_pages"],
+            max_depth=options["max_depth"],
+            max_bytes=options["max_bytes"],
+            time_budget=options["deadline_seconds"],
+            profile=get_request_profile(options.get("extraction")),
+            checkpoint_dir=get_checkpoint_dir(task_id),
+        )
+    )
+
+
+def get_checkpoint_dir(task_id: str, index: int | None = None) -> str | None:
+    """
+    Retourne le dossier du point de reprise du crawl lancé par une tâche.
+
+    Chaque racine d'un lot (``index``) a son propre point de reprise. Retourne
+    ``None`` si les points de reprise sont désactivés.
+    """
+    if SCRAPER_CHECKPOINT_INTERVAL <= 0:
+        return None
+    directory = get_task_store().checkpoint_directory(task_id)
+    return directory if index is None else os.path.join(directory, str(index))
+
+
+def get_request_profile(extraction: dict | None) -> ExtractionProfile | None:
+    """Construit le profil d'extraction fourni avec une requête, s'il y en a un."""
+    if not extraction:
+        return None
+    return build_profile(extraction.get("keep"), extraction.get("strip"))
+
+
+def run_batch_job(task_id: str) -> None:
+    """Exécute une tâche de lot réclamée par ce processus."""
+    task = get_task_store()[task_id]
+    batch = BatchCrawl(task_id, task)
+    _batches[task_id] = batch
+    batch.runner = run_in_background(
+        crawl_batch_async(batch, task),
+        lambda _: _batches.pop(task_id, None),
+    )
+
+
+async def crawl_batch_async(batch: BatchCrawl, task: dict) -> None:
+    """
+    Parcourt simultanément toutes les racines d'un lot, puis termine son export.
+
+    Chaque racine a ``max_per_host`` workers ; les emplacements de téléchargement
+    du lot sont répartis équitablement entre les hôtes.
+    """
+    options = task["options"]
+    await asyncio.gather(
+        *(
+            crawl_and_collect_async(
+                crawl,
+                max_concurrency=task["max_per_host"],
+                max_per_host=task["max_per_host"],
+                use_cache=options["use_cache"],
+                use_bloom_filter=options["frontier_mode"] == FrontierMode.BLOOM,
+                discovery=DiscoveryMode(crawl.seed.get("discovery", DiscoveryMode.LINKS)),
+                max_pages=crawl.seed.get("max_pages"),
+                max_depth=crawl.seed.get("max_depth"),
+                max_bytes=crawl.seed.get("max_bytes"),
+                time_budget=options["deadline_seconds"],
+                scope_path=crawl.seed.get("scope_path"),
+                exclude=crawl.seed.get("exclude"),
+                fair_share=batch.fair_share,
+                profile=get_request_profile(crawl.seed.get("extraction")),
+                checkpoint_dir=get_checkpoint_dir(batch.task_id, index),
+                keep_checkpoint=True,
+            )
+            for index, crawl in enumerate(batch.crawls)
+        )
+    )
+    await batch.complete()
+    # Lot terminé : ses racines ne reprendront que si le budget de durée a coupé court
+    checkpoint_dir = get_checkpoint_dir(batch.task_id)
+    if checkpoint_dir is not None and all(
+        crawl.stats["stop_reason"] != "time_budget" for crawl in batch.crawls
+    ):
+        discard_checkpoint(checkpoint_dir)
+
+
+def run_in_background(
+    coroutine: Coroutine, on_done: Callable[[asyncio.Task], None] | None = None
+) -> asyncio.Task:
+    """
+    Lance une coroutine en arrière-plan en gardant une référence à sa tâche.
+
+    La boucle d'événements ne garde qu'une référence faible vers les tâches : sans
+    référence forte, une tâche peut être détruite en cours d'exécution.
+    """
+    task = asyncio.create_task(coroutine)
+    _running_tasks.add(task)
+    task.add_done_callback(_running_tasks.discard)
+    task.add_done_callback(log_task_error)
+    if on_done is not None:
+        task.add_done_callback(on_done)
+    return task
+
+
+def log_task_error(task: asyncio.Task) -> None:
+    """Journalise l'exception qui a interrompu une tâche d'arrière-plan."""
+    if not task.cancelled() and task.exception() is not None:
+        logging.error(f"Échec d'une tâche d'arrière-plan: {task.exception()}")
+
+
+async def cancel_local_task(task_id: str) -> None:
+    """
+    Annule une tâche en cours dans ce processus.
+
+    La tâche reçoit un export partiel des pages déjà collectées. Le crawl n'est
+    interrompu que si aucune autre tâche n'y est attachée.
+    """
+    batch = _batches.get(task_id)
+    if batch is not None:
+        await batch.cancel()
+        return
+
+    task = get_task_store()[task_id]
+    crawl = find_inflight_crawl(task["crawl_key"])
+    if crawl is not None and task_id in crawl.exports:
+        await crawl.detach(task_id)
+        return
+
+    # Export en cours à partir d'un crawl déjà terminé
+    background_task = _background_tasks.pop(task_id, None)
+    if background_task is not None:
+        background_task.cancel()
+    await complete_task(task_id, {}, None, 0, status="cancelled")
+
+
+def cancel_job(task_id: str) -> None:
+    """
+    Annule en arrière-plan une tâche de ce processus (demande reçue par un autre).
+
+    Tant que l'export partiel n'est pas terminé, la demande est retransmise à
+    chaque passage de la boucle des tâches : elle attend alors la même fin d'export.
+    """
+    run_in_background(cancel_local_task(task_id))
+
+
+async def cancel_scraping_task(task_id: str) -> dict | None:
+    """
+    Annule une tâche de scraping et retourne son statut.
+
+    Une tâche en cours dans un autre processus y est annulée à son prochain passage
+    dans la boucle des tâches : le statut est attendu au plus
+    ``SCRAPER_CANCEL_WAIT_SECONDS`` secondes. Retourne ``None`` si la tâche
+    n'existe pas.
+    """
+    task_store = get_task_store()
+    task = task_store.get(task_id)
+    if task is None or task["status"] not in ACTIVE_STATUSES:
+        return task
+
+    if task_store.is_owned(task_id):
+        await cancel_local_task(task_id)
+        return task
+
+    task_store.request_cancel(task_id)
+    deadline = time.monotonic() + SCRAPER_CANCEL_WAIT_SECONDS
+    while (task := task_store.get(task_id)) is not None:
+        if task["status"] not in ACTIVE_STATUSES or time.monotonic() >= deadline:
+            break
+        await asyncio.sleep(0.1)
+    return task
+
+
+def is_local_task(task_id: str) -> bool:
+    """Indique si la tâche s'exécute dans ce processus (progression publiée ici)."""
+    return get_task_store().is_owned(task_id)
+
+
+register_gauge(
+    "scraper_active_tasks",
+    "Tâches en cours dans ce processus",
+    lambda: get_task_store().owned_count(),
+)
+
+
+def get_job_runner() -> JobRunner:
+    """Retourne la boucle des tâches de ce processus."""
+    global _job_runner
+    if _job_runner is None:
+        _job_runner = JobRunner(get_task_store(), run_job, cancel_job)
+    return _job_runner
+
+
+async def stop_job_runner() -> None:
+    """Interrompt les crawls de ce processus et remet leurs tâches en attente."""
+    global _job_runner
+    if _job_runner is None:
+        return
+    await _job_runner.stop()
+    _job_runner = None
+
+    pending = list(_running_tasks)
+    for background_task in pending:
+        background_task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+
 def get_task_status(task_id: str) -> dict:
     """Récupère le statut d'une tâche de scraping."""
-    if task_id not in scraping_tasks:
+    task = get_task_store().get(task_id)
+    if task is None:
         return {"status": "not_found"}
 
-    return scraping_tasks[task_id]
+    return task
+
+
+def get_task_result(task_id: str) -> dict | None:
+    """Récupère les résultats d'une tâche de scraping terminée."""
+    task = get_task_store().get(task_id)
+    if task is None or task["status"] not in ("completed", "cancelled"):
+        return None
+
+    return get_task_store().get_result(task_id)
+
+
+def get_task_pages(task_id: str, offset: int, limit: int) -> tuple[list[dict], int]:
+    """
+    Récupère une tranche des pages d'une tâche et le nombre de pages disponibles.
+
+    Les pages sont lues dans le journal de la tâche : celles d'une tâche en cours
+    sont disponibles dès leur conversion.
+    """
+    return get_task_store().get_pages(task_id, offset, limit)
+
+
+def iter_markdown_pages(task_id: str) -> Iterator[str]:
+    """Parcourt le Markdown des pages d'une tâche, lu page par page dans son journal."""
+    for page in get_task_store().iter_pages(task_id):
+        yield page["markdown"]
 
 
-def get_markdown_content(task_id: str) -> str | None:
-    """Récupère le contenu Markdown d'une tâche de scraping terminée."""
-    if task_id not in scraping_tasks or scraping_tasks[task_id]["status"] != "completed":
+def iter_markdown_content(task_id: str) -> tuple[Iterator[bytes], int] | None:
+    """
+    Retourne le flux du fichier Markdown unique d'une tâche terminée et sa taille.
+
+    Le fichier est produit page par page depuis le journal de la tâche, sans être
+    chargé en mémoire. Le flux est bloquant : ``StreamingResponse`` le parcourt
+    dans un thread.
+    """
+    task = get_task_store().get(task_id)
+    if task is None or task["status"] not in ("completed", "cancelled"):
+        return None
+    size = task.get("markdown_size", 0)
+    # Journal des pages perdu : le contenu annoncé ne peut pas être livré
+    if size and not get_task_pages(task_id, 0, 0)[1]:
         return None
 
-    return scraping_tasks[task_id].get("markdown_content")
+    return iter_markdown(iter_markdown_pages(task_id)), size
 
 
-def get_zip_content(task_id: str) -> bytes | None:
-    """Récupère le contenu ZIP d'une tâche de scraping terminée."""
-    if task_id not in scraping_tasks or scraping_tasks[task_id]["status"] != "completed":
+def get_zip_export(task_id: str) -> ZipExport | None:
+    """Récupère l'archive ZIP d'une tâche de scraping terminée."""
+    result = get_task_result(task_id)
+    if result is None:
         return None
 
-    return scraping_tasks[task_id].get("zip_content")
+    return result["zip_export"]
 
 
 def get_url_to_markdown(task_id: str) -> dict[str, str] | None:
     """Récupère la cartographie URL -> Markdown d'une tâche de scraping terminée."""
-    if task_id not in scraping_tasks or scraping_tasks[task_id]["status"] != "completed":
+    result = get_task_result(task_id)
+    if result is None:
         return None
 
-    return scraping_tasks[task_id].get("url_to_markdown")
+    return result["url_to_markdown"]
 
 
 def get_task_filename(task_id: str) -> str | None:
     """Récupère le nom de fichier d'une tâche de scraping."""
-    if task_id not in scraping_tasks:
+    task = get_task_store().get(task_id)
+    if task is None:
         return None
 
-    return scraping_tasks[task_id].get("filename", "documentation")
+    return task.get("filename", "documentation")
@@ -0,0 +1,379 @@
+"""Crawls partagés entre les tâches qui demandent le même site."""
+
+import asyncio
+import hashlib
+import json
+from datetime import datetime
+
+from app.schemas.scraper_schemas import ExportFormat
+from app.services.crawl_checkpoint import CheckpointState, CrawlCheckpoint
+from app.services.export_service import ZipExport, markdown_size
+from app.services.metrics import EXPORTED_BYTES, PAGES, time_stage
+from app.services.progress_events import publish_progress
+from app.services.retry_policy import FetchError
+from app.services.task_store import ACTIVE_STATUSES, get_task_store
+from app.services.url_utils import normalize_url
+
+# Crawls en cours, indexés par clé de crawl
+_inflight_crawls: dict[str, "SharedCrawl"] = {}
+
+# Nombre de pages rejouées entre deux passages de main à la boucle d'événements
+_REPLAY_BATCH_SIZE = 50
+
+# Fins d'export en cours, indexées par tâche
+_completing: dict[str, asyncio.Task] = {}
+
+
+def get_crawl_key(start_url: str, options: dict | None = None) -> str:
+    """
+    Retourne la clé identifiant un crawl : URL de départ normalisée et options
+    qui influent sur les pages collectées.
+
+    Les options de performance (concurrence, cache) et d'export (format, nom de
+    fichier) n'en font pas partie : deux tâches qui ne diffèrent que par elles
+    partagent le même crawl.
+    """
+    payload = json.dumps(
+        {"url": normalize_url(start_url), "options": options or {}}, sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def content_digest(content: str) -> bytes:
+    """Retourne l'empreinte d'un contenu, pour la déduplication des pages."""
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+
+
+def create_export(task_id: str, start_url: str) -> ZipExport | None:
+    """
+    Crée l'archive ZIP d'une tâche si son format d'export en nécessite une.
+
+    L'archive est construite dans le dossier de la tâche.
+    """
+    task_store = get_task_store()
+    task = task_store[task_id]
+    if task["format"] in [ExportFormat.ZIP_FILES, ExportFormat.ZIP_FLAT]:
+        return ZipExport(
+            start_url,
+            task["format"],
+            compression_level=task.get("compression_level"),
+            path=task_store.export_path(task_id),
+        )
+    return None
+
+
+class SharedCrawl:
+    """
+    Crawl d'un site dont les pages sont partagées par plusieurs tâches.
+
+    Chaque tâche attachée garde son propre export (format et nom de fichier) et
+    son journal de pages : les pages déjà collectées y sont rejouées lors de
+    l'attachement, puis chaque nouvelle page y est ajoutée dès qu'elle est convertie. Le crawl est annulé
+    lorsque sa dernière tâche est détachée.
+    """
+
+    def __init__(self, key: str, start_url: str):
+        self.key = key
+        self.start_url = start_url
+        # Tâche asyncio qui exécute le crawl (gardée pour pouvoir l'annuler)
+        self.runner: asyncio.Task | None = None
+        self.url_to_markdown: dict[str, str] = {}
+        self.exports: dict[str, ZipExport | None] = {}
+        self.failures: list[dict] = []
+        # Empreintes des contenus déjà enregistrés (déduplication)
+        self.content_hashes: set[bytes] = set()
+        # Durées cumulées de chaque étape, publiées avec la progression
+        self.timings: dict[str, dict] = {}
+        # Point de reprise du crawl, s'il en a un
+        self.checkpoint: CrawlCheckpoint | None = None
+        self.stats = {
+            "processed_pages": 0,
+            "total_pages": 1,  # Au moins l'URL de départ
+            "queued_pages": 1,
+            "in_flight_pages": 0,
+            "progress": 0,
+            "failed_pages": 0,
+            "duplicate_pages": 0,
+            "throttled_requests": 0,
+            "downloaded_bytes": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "current_url": None,
+            "stop_reason": None,
+            "timings": self.timings,
+        }
+
+    def attach(self, task_id: str) -> None:
+        """Attache une tâche au crawl et lui rejoue les pages déjà collectées."""
+        task_store = get_task_store()
+        task = task_store[task_id]
+        zip_export = create_export(task_id, self.start_url)
+        for url, markdown in self.url_to_markdown.items():
+            task_store.append_page(task_id, url, markdown)
+            if zip_export is not None:
+                zip_export.add_page(url, markdown)
+        self.exports[task_id] = zip_export
+        task["start_time"] = task["start_time"] or datetime.now().isoformat()
+        task.update(self.stats)
+        task["failures"] = self.failures
+
+    def add_page(self, url: str, markdown: str) -> None:
+        """Enregistre une page convertie et l'ajoute aux exports des tâches attachées."""
+        if self.checkpoint is not None:
+            self.checkpoint.add_page(url, markdown)
+        PAGES.inc(label_value="converted")
+        EXPORTED_BYTES.inc(markdown_size([markdown]))
+        self.export_page(url, markdown)
+
+    def export_page(self, url: str, markdown: str) -> None:
+        """Ajoute une page aux exports des tâches attachées."""
+        self.url_to_markdown[url] = markdown
+        task_store = get_task_store()
+        for task_id, zip_export in self.exports.items():
+            task_store.append_page(task_id, url, markdown)
+            if zip_export is not None:
+                with time_stage("zip_write", self.timings):
+                    zip_export.add_page(url, markdown)
+
+    def add_content(self, content: str) -> bool:
+        """
+        Enregistre l'empreinte d'un contenu ; retourne ``False`` s'il a déjà été vu.
+
+        Une page dont le contenu a déjà été vu est comptée comme doublon.
+        """
+        digest = content_digest(content)
+        if digest in self.content_hashes:
+            self.record_duplicate()
+            return False
+        self.content_hashes.add(digest)
+        return True
+
+    async def restore(self, state: CheckpointState) -> None:
+        """
+        Reprend les pages, les échecs et les compteurs d'un crawl interrompu.
+
+        Les pages sont rejouées dans les exports des tâches attachées, par lots
+        pour laisser la main à la boucle d'événements.
+        """
+        for index, page in enumerate(state.pages):
+            self.content_hashes.add(content_digest(page["markdown"]))
+            self.export_page(page["url"], page["markdown"])
+            if index % _REPLAY_BATCH_SIZE == 0:
+                await asyncio.sleep(0)
+        self.failures.extend(state.failures)
+        self.stats.update(state.stats)
+        self.stats["failed_pages"] = len(self.failures)
+
+    def save_checkpoint(self) -> None:
+        """Enregistre le point de reprise du crawl si son intervalle est écoulé."""
+        if self.checkpoint is not None:
+            self.checkpoint.maybe_flush(self.stats)
+
+    def close_checkpoint(self, discard: bool = False) -> None:
+        """Enregistre et ferme le point de reprise du crawl, ou le supprime."""
+        if self.checkpoint is None:
+            return
+        if discard:
+            self.checkpoint.discard()
+        else:
+            self.checkpoint.close(self.stats)
+
+    def record_duplicate(self) -> None:
+        """Compte une page écartée car identique à une page déjà enregistrée."""
+        self.stats["duplicate_pages"] += 1
+        PAGES.inc(label_value="duplicate")
+
+    async def detach(self, task_id: str) -> None:
+        """
+        Détache une tâche annulée en lui livrant les pages déjà collectées.
+
+        Le crawl est annulé s'il ne reste plus aucune tâche attachée.
+        """
+        zip_export = self.exports.pop(task_id)
+        url_to_markdown = dict(self.url_to_markdown)
+        failures = list(self.failures)
+        if not self.exports:
+            self.cancel()
+        await complete_task(
+            task_id,
+            url_to_markdown,
+            zip_export,
+            markdown_size(url_to_markdown.values()),
+            failures,
+            status="cancelled",
+        )
+
+    def cancel(self) -> None:
+        """Annule le crawl : les téléchargements en cours sont interrompus."""
+        unregister_crawl(self)
+        if self.runner is not None:
+            self.runner.cancel()
+
+    def record_failure(self, url: str, error: FetchError, attempts: int) -> None:
+        """Enregistre l'échec définitif d'une page, avec son statut et sa cause."""
+        self.failures.append(
+            {
+                "url": url,
+                "status": error.status,
+                "reason": error.reason,
+                "attempts": attempts,
+            }
+        )
+        self.stats["failed_pages"] = len(self.failures)
+        PAGES.inc(label_value="failed")
+        if self.checkpoint is not None:
+            self.checkpoint.record("failure", self.failures[-1])
+
+    def update_progress(self, **stats: int | str | None) -> None:
+        """Met à jour la progression du crawl et celle des tâches attachées."""
+        self.stats.update(stats)
+        task_store = get_task_store()
+        for task_id in self.exports:
+            task_store[task_id].update(self.stats)
+            publish_progress(task_id)
+
+    async def complete(self, status: str = "completed") -> None:
+        """Termine les exports et marque toutes les tâches attachées comme terminées."""
+        size = markdown_size(self.url_to_markdown.values())
+        completions = [
+            start_completion(
+                task_id, self.url_to_markdown, zip_export, size, self.failures, status
+            )
+            for task_id, zip_export in self.exports.items()
+        ]
+        await asyncio.shield(asyncio.gather(*filter(None, completions)))
+
+
+def start_completion(
+    task_id: str,
+    url_to_markdown: dict[str, str],
+    zip_export: ZipExport | None,
+    size: int,
+    failures: list[dict] | None = None,
+    status: str = "completed",
+    readme: str | None = None,
+) -> asyncio.Task | None:
+    """
+    Lance la fin de l'export d'une tâche et retourne la tâche asyncio qui l'exécute.
+
+    Si la fin de l'export est déjà en cours (annulation reçue pendant la fin du
+    crawl), c'est elle qui est retournée ; une tâche déjà terminée ne l'est pas
+    une seconde fois (``None``).
+    """
+    completion = _completing.get(task_id)
+    if completion is not None:
+        return completion
+    if get_task_store()[task_id]["status"] not in ACTIVE_STATUSES:
+        return None
+
+    completion = asyncio.create_task(
+        _complete_task(task_id, url_to_markdown, zip_export, size, failures, status, readme)
+    )
+    _completing[task_id] = completion
+    completion.add_done_callback(lambda _: _completing.pop(task_id, None))
+    return completion
+
+
+async def complete_task(
+    task_id: str,
+    url_to_markdown: dict[str, str],
+    zip_export: ZipExport | None,
+    size: int,
+    failures: list[dict] | None = None,
+    status: str = "completed",
+    readme: str | None = None,
+) -> None:
+    """
+    Termine l'export d'une tâche et enregistre ses résultats.
+
+    L'annulation de l'appelant n'interrompt pas la fin de l'export : la tâche ne
+    reste jamais à moitié terminée.
+    """
+    completion = start_completion(
+        task_id, url_to_markdown, zip_export, size, failures, status, readme
+    )
+    if completion is not None:
+        await asyncio.shield(completion)
+
+
+async def wait_completion(task_id: str) -> None:
+    """Attend la fin de l'export d'une tâche, si elle est en cours."""
+    completion = _completing.get(task_id)
+    if completion is not None:
+        await asyncio.shield(completion)
+
+
+async def _complete_task(
+    task_id: str,
+    url_to_markdown: dict[str, str],
+    zip_export: ZipExport | None,
+    size: int,
+    failures: list[dict] | None,
+    status: str,
+    readme: str | None,
+) -> None:
+    task_store = get_task_store()
+    task = task_store[task_id]
+    if zip_export is not None and not zip_export.closed:
+        # Archive terminée hors de la boucle d'événements
+        with time_stage("zip_close", task.setdefault("timings", {})):
+            await zip_export.finish(failures, readme)
+
+    task["failures"] = failures or []
+    if status == "completed":
+        task["progress"] = 100
+    task["end_time"] = datetime.now().isoformat()
+    task["markdown_size"] = size
+    await task_store.set_result(task_id, url_to_markdown, zip_export, size, status)
+    publish_progress(task_id)
+
+
+def find_inflight_crawl(key: str) -> SharedCrawl | None:
+    """Retourne le crawl en cours associé à la clé, s'il existe."""
+    return _inflight_crawls.get(key)
+
+
+def register_crawl(crawl: SharedCrawl) -> None:
+    """Enregistre un crawl en cours pour que les tâches suivantes s'y attachent."""
+    _inflight_crawls[crawl.key] = crawl
+
+
+def unregister_crawl(crawl: SharedCrawl) -> None:
+    """Retire un crawl terminé du registre des crawls en cours."""
+    if _inflight_crawls.get(crawl.key) is crawl:
+        del _inflight_crawls[crawl.key]
+
+
+async def export_from_completed_task(task_id: str, source_task_id: str) -> None:
+    """Construit l'export d'une tâche à partir des pages d'une tâche déjà terminée."""
+    task_store = get_task_store()
+    task = task_store[task_id]
+    source = task_store.get_result(source_task_id)
+    if source is None:
+        task["status"] = "error"
+        await task_store.save(task_id)
+        publish_progress(task_id)
+        return
+
+    url_to_markdown = source["url_to_markdown"]
+    zip_export = create_export(task_id, task["url"])
+    for index, (url, markdown) in enumerate(url_to_markdown.items()):
+        task_store.append_page(task_id, url, markdown)
+        if zip_export is not None:
+            zip_export.add_page(url, markdown)
+        if index % _REPLAY_BATCH_SIZE == 0:
+            await asyncio.sleep(0)
+
+    source_task = task_store[source_task_id]
+    task["processed_pages"] = source_task.get("processed_pages", len(url_to_markdown))
+    task["total_pages"] = source_task.get("total_pages", len(url_to_markdown))
+    task["failed_pages"] = source_task.get("failed_pages", 0)
+    task["duplicate_pages"] = source_task.get("duplicate_pages", 0)
+    task["reused_from"] = source_task_id
+    await complete_task(
+        task_id,
+        url_to_markdown,
+        zip_export,
+        markdown_size(url_to_markdown.values()),
+        source_task.get("failures", []),
+    )
@@ -0,0 +1,118 @@
+"""Découverte des pages d'un site à partir de ses sitemaps."""
+
+import asyncio
+import gzip
+import html
+import io
+import logging
+import re
+from urllib.robotparser import RobotFileParser
+
+import aiohttp
+
+from app.core.config import SCRAPER_SITEMAP_MAX_BYTES, SCRAPER_SITEMAP_MAX_FILES
+from app.services.robots import fetch_robots, get_origin
+from app.services.url_utils import is_in_scope, normalize_url
+
+_LOC_PATTERN = re.compile(
+    r"<(?:\w+:)?loc>\s*(?:<!\[CDATA\[)?(.*?)(?:\]\]>)?\s*</(?:\w+:)?loc>", re.S
+)
+_SITEMAP_INDEX_PATTERN = re.compile(r"<(?:\w+:)?sitemapindex[\s>]")
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def parse_sitemap(content: bytes) -> tuple[bool, list[str]]:
+    """
+    Analyse un sitemap, éventuellement compressé en gzip.
+
+    Retourne un booléen indiquant s'il s'agit d'un index de sitemaps, et la liste
+    des URLs (``<loc>``) qu'il contient. L'analyse par expressions régulières
+    tolère les documents mal formés et n'évalue aucune entité externe.
+    """
+    if content[:2] == _GZIP_MAGIC:
+        with gzip.GzipFile(fileobj=io.BytesIO(content)) as gzip_file:
+            content = gzip_file.read(SCRAPER_SITEMAP_MAX_BYTES + 1)
+        if len(content) > SCRAPER_SITEMAP_MAX_BYTES:
+            raise ValueError("sitemap décompressé trop volumineux")
+
+    text = content.decode("utf-8", errors="replace")
+    is_index = _SITEMAP_INDEX_PATTERN.search(text) is not None
+    locations = [html.unescape(loc.strip()) for loc in _LOC_PATTERN.findall(text)]
+    return is_index, locations
+
+
+async def _fetch_sitemap(session: aiohttp.ClientSession, url: str) -> bytes | None:
+    try:
+        async with session.get(url, timeout=30) as response:
+            if response.status != 200:
+                return None
+            content = await response.content.read(SCRAPER_SITEMAP_MAX_BYTES + 1)
+    except Exception as e:
+        logging.warning(f"Impossible de lire le sitemap {url}: {e}")
+        return None
+
+    if len(content) > SCRAPER_SITEMAP_MAX_BYTES:
+        logging.warning(f"Sitemap {url} ignoré : taille supérieure à la limite")
+        return None
+    return content
+
+
+def get_sitemap_candidates(
+    start_url: str, base_path: str, robots: RobotFileParser | None
+) -> list[str]:
+    """Retourne les sitemaps à lire : ceux du robots.txt, sinon les emplacements usuels."""
+    sitemaps = list(robots.site_maps() or []) if robots else []
+    if not sitemaps:
+        origin = get_origin(start_url)
+        sitemaps = [f"{origin}/sitemap.xml"]
+        if base_path.strip("/"):
+            sitemaps.append(f"{origin}/{base_path.strip('/')}/sitemap.xml")
+    return sitemaps
+
+
+async def discover_sitemap_urls(
+    session: aiohttp.ClientSession,
+    start_url: str,
+    base_netloc: str,
+    base_path: str,
+    robots: RobotFileParser | None = None,
+) -> list[str]:
+    """
+    Retourne les pages du périmètre du crawl listées dans les sitemaps du site.
+
+    Les sitemaps sont lus depuis les directives ``Sitemap:`` du robots.txt, puis à
+    défaut depuis ``/sitemap.xml`` à la racine du site et du chemin de départ. Les
+    index de sitemaps sont suivis, dans la limite de ``SCRAPER_SITEMAP_MAX_FILES``
+    fichiers. Le robots.txt déjà lu par l'appelant peut être fourni via ``robots``.
+    """
+    if robots is None:
+        robots = await fetch_robots(session, start_url)
+    pending = get_sitemap_candidates(start_url, base_path, robots)
+
+    fetched: set[str] = set()
+    # Pages listées, par forme canonique : la première adresse rencontrée est parcourue
+    page_urls: dict[str, str] = {}
+    while pending and len(fetched) < SCRAPER_SITEMAP_MAX_FILES:
+        sitemap_url = pending.pop(0)
+        if sitemap_url in fetched:
+            continue
+        fetched.add(sitemap_url)
+
+        content = await _fetch_sitemap(session, sitemap_url)
+        if content is None:
+            continue
+        try:
+            is_index, locations = await asyncio.to_thread(parse_sitemap, content)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Sitemap {sitemap_url} illisible: {e}")
+            continue
+
+        if is_index:
+            pending.extend(locations)
+            continue
+
+        for location in locations:
+            if is_in_scope(location, base_netloc, base_path):
+                page_urls.setdefault(normalize_url(location), location)
+
+    return list(page_urls.values())
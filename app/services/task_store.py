@@ -0,0 +1,703 @@
+"""Stockage borné des tâches de scraping et de leurs résultats."""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from app.core.config import (
+    SCRAPER_TASK_BACKEND,
+    SCRAPER_TASK_MEMORY_BYTES,
+    SCRAPER_TASK_STORE_DIR,
+    SCRAPER_TASK_TTL_SECONDS,
+)
+from app.schemas.scraper_schemas import ExportFormat
+from app.services.export_service import ZipExport
+from app.services.page_log import (
+    PAGES_FILE,
+    PageLog,
+    iter_logged_pages,
+    read_pages,
+    write_pages,
+)
+
+# Statuts d'une tâche qui n'est pas encore terminée
+ACTIVE_STATUSES = ("pending", "running")
+
+# Store partagé entre les requêtes (créé à la première utilisation)
+_task_store: "TaskBackend | None" = None
+
+
+class TaskBackend(ABC):
+    """
+    Interface des stockages de tâches, partagés entre les processus de l'API.
+
+    Un stockage sert à la fois d'index des tâches et de file de travaux : une tâche
+    créée est en attente (``pending``) jusqu'à ce qu'un worker la réclame avec
+    ``claim`` ; ce worker en devient le propriétaire et signale son activité avec
+    ``sync``. N'importe quel processus peut lire le statut et les résultats d'une
+    tâche, ou demander son annulation.
+    """
+
+    def __contains__(self, task_id: str) -> bool:
+        """Indique si la tâche existe."""
+        return self.get(task_id) is not None
+
+    def __getitem__(self, task_id: str) -> dict:
+        """Retourne les métadonnées d'une tâche existante."""
+        task = self.get(task_id)
+        if task is None:
+            raise KeyError(task_id)
+        return task
+
+    @abstractmethod
+    def create(self, task_id: str, metadata: dict) -> dict:
+        """Enregistre une nouvelle tâche et retourne ses métadonnées."""
+
+    @abstractmethod
+    def get(self, task_id: str) -> dict | None:
+        """
+        Retourne les métadonnées d'une tâche.
+
+        Les métadonnées d'une tâche possédée par ce processus sont modifiables et
+        enregistrées par ``save`` ; celles des autres tâches sont une copie.
+        """
+
+    @abstractmethod
+    async def save(self, task_id: str) -> None:
+        """Enregistre les métadonnées d'une tâche possédée par ce processus."""
+
+    @abstractmethod
+    async def set_result(
+        self,
+        task_id: str,
+        url_to_markdown: dict[str, str],
+        zip_export: ZipExport | None,
+        size: int,
+        status: str,
+    ) -> None:
+        """
+        Associe ses résultats à une tâche, qui passe ensuite au statut final ``status``.
+
+        Les résultats sont lisibles partout dès que la tâche est terminée.
+        """
+
+    @abstractmethod
+    def get_result(self, task_id: str) -> dict | None:
+        """Retourne les résultats d'une tâche terminée."""
+
+    @abstractmethod
+    def append_page(self, task_id: str, url: str, markdown: str) -> None:
+        """Ajoute une page convertie aux résultats d'une tâche possédée par ce processus."""
+
+    @abstractmethod
+    def get_pages(self, task_id: str, offset: int, limit: int) -> tuple[list[dict], int]:
+        """
+        Retourne une tranche des pages d'une tâche et le nombre de pages disponibles.
+
+        Les pages d'une tâche en cours sont lisibles dès leur ajout, depuis
+        n'importe quel processus.
+        """
+
+    @abstractmethod
+    def export_path(self, task_id: str) -> str:
+        """
+        Retourne le fichier où construire l'archive ZIP d'une tâche.
+
+        ``set_result`` le déplace à sa place définitive, sans le recopier.
+        """
+
+    @abstractmethod
+    def iter_pages(self, task_id: str) -> Iterator[dict]:
+        """Parcourt toutes les pages d'une tâche, lues une à une dans son journal."""
+
+    @abstractmethod
+    def checkpoint_directory(self, task_id: str) -> str:
+        """
+        Retourne le dossier du point de reprise du crawl lancé par une tâche.
+
+        Le point de reprise est supprimé avec la tâche.
+        """
+
+    @abstractmethod
+    def find_completed(self, crawl_key: str, completed_after: str) -> str | None:
+        """Retourne la tâche terminée la plus récente d'un crawl, après la date donnée."""
+
+    @abstractmethod
+    def delete(self, task_id: str) -> None:
+        """Supprime une tâche et ses résultats."""
+
+    @abstractmethod
+    def purge_expired(self) -> None:
+        """Supprime les tâches terminées dont la durée de vie est dépassée."""
+
+    @abstractmethod
+    def claim(self, worker_id: str) -> str | None:
+        """
+        Réclame la plus ancienne tâche en attente pour le worker et la retourne.
+
+        Une tâche dont le crawl est déjà en cours dans un autre worker n'est pas
+        réclamée : seul ce worker peut la rattacher à son crawl.
+        """
+
+    @abstractmethod
+    def is_owned(self, task_id: str) -> bool:
+        """Indique si la tâche est en cours dans ce processus."""
+
+    @abstractmethod
+    def owned_count(self) -> int:
+        """Retourne le nombre de tâches en cours dans ce processus."""
+
+    @abstractmethod
+    async def sync(self, worker_id: str) -> None:
+        """Enregistre la progression des tâches du worker et signale son activité."""
+
+    @abstractmethod
+    def request_cancel(self, task_id: str) -> None:
+        """Annule une tâche en attente, ou demande l'annulation d'une tâche en cours."""
+
+    @abstractmethod
+    def cancel_requests(self, worker_id: str) -> list[str]:
+        """Retourne les tâches du worker dont l'annulation a été demandée."""
+
+    @abstractmethod
+    def requeue_stale(self, stale_after: float) -> int:
+        """Remet en attente les tâches des workers inactifs ; retourne leur nombre."""
+
+    @abstractmethod
+    def release(self, worker_id: str) -> None:
+        """Remet en attente les tâches en cours du worker (arrêt du processus)."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Enregistre l'état courant et ferme le stockage."""
+
+
+class TaskStore(TaskBackend):
+    """
+    Stockage des tâches de scraping dans SQLite et sur le système de fichiers.
+
+    Les métadonnées des tâches (statut, progression, options) sont indexées dans
+    une base SQLite partagée par les processus de la machine. Les résultats
+    (pages Markdown et archive ZIP) sont écrits sur disque : les pages au fil du
+    crawl, dans le journal de la tâche, et l'archive à la fin de la tâche. Ils sont
+    gardés en mémoire dans la limite de ``memory_budget`` octets : au-delà, les
+    résultats les moins récemment utilisés sont libérés et relus à la demande. Les
+    tâches terminées expirent après ``ttl`` secondes.
+
+    La progression des tâches (``save``, ``sync``) est écrite par un thread dédié,
+    avec sa propre connexion, dans l'ordre des appels : la boucle d'événements
+    n'attend pas le verrou d'écriture de la base tenu par un autre processus. La
+    liste des échecs d'une tâche, qui peut être longue, est rangée à part et
+    n'est réécrite que lorsqu'elle a changé.
+    """
+
+    def __init__(self, directory: str, ttl: float, memory_budget: int):
+        self.directory = directory
+        self.ttl = ttl
+        self.memory_budget = memory_budget
+        os.makedirs(directory, exist_ok=True)
+
+        self._db = sqlite3.connect(
+            os.path.join(directory, "tasks.sqlite3"), check_same_thread=False, timeout=30
+        )
+        # WAL : les lectures d'un processus ne bloquent pas les écritures d'un autre
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # Schéma créé sous verrou : les workers démarrés ensemble migrent tour à tour
+        self._db.execute("BEGIN IMMEDIATE")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                task_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                expires_at REAL,
+                metadata TEXT NOT NULL
+            )
+            """
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(tasks)")}
+        # Colonnes de la file de travaux, ajoutées aux index créés auparavant
+        for column, statement in (
+            ("worker_id", "ALTER TABLE tasks ADD COLUMN worker_id TEXT"),
+            ("heartbeat_at", "ALTER TABLE tasks ADD COLUMN heartbeat_at REAL"),
+            (
+                "cancel_requested",
+                "ALTER TABLE tasks ADD COLUMN cancel_requested INTEGER NOT NULL DEFAULT 0",
+            ),
+            ("failures", "ALTER TABLE tasks ADD COLUMN failures TEXT"),
+        ):
+            if column not in columns:
+                self._db.execute(statement)
+        self._db.execute("CREATE INDEX IF NOT EXISTS tasks_expires ON tasks (expires_at)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status)")
+        self._db.commit()
+
+        # Métadonnées des tâches possédées par ce processus ou déjà terminées
+        self._tasks: dict[str, dict] = {}
+        self._owned: set[str] = set()
+        # Journaux des pages des tâches en cours dans ce processus
+        self._page_logs: dict[str, PageLog] = {}
+        # Résultats en mémoire, du moins au plus récemment utilisé
+        self._payloads: OrderedDict[str, dict] = OrderedDict()
+        self._payload_bytes = 0
+        # Listes des échecs enregistrées, et leur longueur, par tâche
+        self._written_failures: dict[str, tuple[list, int]] = {}
+        # Thread d'écriture de la progression et sa connexion (ouverte dans le thread)
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="task-store")
+        self._writer_db: sqlite3.Connection | None = None
+
+    def create(self, task_id: str, metadata: dict) -> dict:
+        """Enregistre une nouvelle tâche en attente et retourne ses métadonnées."""
+        self.purge_expired()
+        self._upsert(self._db, self._row(task_id, metadata))
+        self._db.commit()
+        return metadata
+
+    def get(self, task_id: str) -> dict | None:
+        """Retourne les métadonnées d'une tâche, en les rechargeant depuis l'index."""
+        task = self._tasks.get(task_id)
+        if task is not None:
+            return task
+
+        row = self._db.execute(
+            "SELECT metadata, failures, expires_at FROM tasks WHERE task_id = ?",
+            (task_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        metadata, failures, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            self.delete(task_id)
+            return None
+
+        task = self._load(metadata, failures)
+        # Une tâche terminée ne change plus : inutile de relire l'index
+        if task["status"] not in ACTIVE_STATUSES:
+            self._tasks[task_id] = task
+        return task
+
+    async def save(self, task_id: str) -> None:
+        """Écrit les métadonnées d'une tâche dans l'index, depuis le thread d'écriture."""
+        task = self._tasks[task_id]
+        rows = [self._row(task_id, task)]
+        if task["status"] not in ACTIVE_STATUSES:
+            self._owned.discard(task_id)
+            self._written_failures.pop(task_id, None)
+        await self._write_in_thread(rows)
+
+    async def set_result(
+        self,
+        task_id: str,
+        url_to_markdown: dict[str, str],
+        zip_export: ZipExport | None,
+        size: int,
+        status: str,
+    ) -> None:
+        """
+        Associe ses résultats à une tâche terminée, dans la limite du budget mémoire.
+
+        Les résultats sont écrits sur disque, dans un thread, avant la fin de la
+        tâche : un processus qui lit le statut terminé peut aussitôt les relire. Le
+        journal des pages est gardé s'il contient déjà toutes les pages du résultat.
+        """
+        payload = {
+            "url_to_markdown": url_to_markdown,
+            "zip_export": zip_export,
+            "size": size + (zip_export.size if zip_export else 0),
+        }
+        page_log = self._close_page_log(task_id)
+        await asyncio.to_thread(self._write_result, task_id, payload, page_log)
+
+        self._payloads[task_id] = payload
+        self._payload_bytes += payload["size"]
+        self._tasks[task_id]["status"] = status
+        await self.save(task_id)
+        self._enforce_memory_budget(keep=task_id)
+
+    def get_result(self, task_id: str) -> dict | None:
+        """Retourne les résultats d'une tâche, rechargés depuis le disque si besoin."""
+        payload = self._payloads.get(task_id)
+        if payload is not None:
+            self._payloads.move_to_end(task_id)
+            return payload
+
+        task = self.get(task_id)
+        if task is None or task["status"] in ACTIVE_STATUSES:
+            return None
+        if not os.path.exists(self._path(task_id, PAGES_FILE)):
+            return None
+
+        url_to_markdown = {
+            page["url"]: page["markdown"]
+            for page in iter_logged_pages(os.path.join(self.directory, task_id))
+        }
+
+        zip_export = None
+        zip_path = self._path(task_id, "export.zip")
+        if os.path.exists(zip_path):
+            zip_export = ZipExport.open(zip_path, task["url"], ExportFormat(task["format"]))
+
+        self._payloads[task_id] = {
+            "url_to_markdown": url_to_markdown,
+            "zip_export": zip_export,
+            "size": task.get("markdown_size", 0) + (zip_export.size if zip_export else 0),
+        }
+        self._payload_bytes += self._payloads[task_id]["size"]
+        self._enforce_memory_budget(keep=task_id)
+        return self._payloads[task_id]
+
+    def append_page(self, task_id: str, url: str, markdown: str) -> None:
+        """Ajoute une page au journal de la tâche, lisible aussitôt par les autres processus."""
+        page_log = self._page_logs.get(task_id)
+        if page_log is None:
+            page_log = self._page_logs[task_id] = PageLog(
+                os.path.join(self.directory, task_id)
+            )
+        try:
+            page_log.append(url, markdown)
+        except OSError as e:
+            logging.error(f"Impossible d'enregistrer une page de la tâche {task_id}: {e}")
+
+    def get_pages(self, task_id: str, offset: int, limit: int) -> tuple[list[dict], int]:
+        """Lit une tranche du journal des pages de la tâche."""
+        return read_pages(os.path.join(self.directory, task_id), offset, limit)
+
+    def iter_pages(self, task_id: str) -> Iterator[dict]:
+        """Parcourt le journal des pages de la tâche ; un journal absent est vide."""
+        try:
+            yield from iter_logged_pages(os.path.join(self.directory, task_id))
+        except FileNotFoundError:
+            return
+
+    def export_path(self, task_id: str) -> str:
+        """Retourne le fichier de l'archive en construction, dans le dossier de la tâche."""
+        os.makedirs(os.path.join(self.directory, task_id), exist_ok=True)
+        return self._path(task_id, "export.zip.part")
+
+    def checkpoint_directory(self, task_id: str) -> str:
+        """Retourne le dossier du point de reprise, à côté des résultats de la tâche."""
+        return self._path(task_id, "checkpoint")
+
+    def find_completed(self, crawl_key: str, completed_after: str) -> str | None:
+        """Retourne la tâche terminée la plus récente d'un crawl, après la date donnée."""
+        row = self._db.execute(
+            "SELECT task_id FROM tasks"
+            " WHERE status = 'completed'"
+            " AND json_extract(metadata, '$.crawl_key') = ?"
+            " AND json_extract(metadata, '$.end_time') >= ?"
+            " ORDER BY json_extract(metadata, '$.end_time') DESC LIMIT 1",
+            (crawl_key, completed_after),
+        ).fetchone()
+        return row[0] if row else None
+
+    def delete(self, task_id: str) -> None:
+        """Supprime une tâche, ses résultats en mémoire et ses fichiers."""
+        self._tasks.pop(task_id, None)
+        self._owned.discard(task_id)
+        self._close_page_log(task_id)
+        payload = self._payloads.pop(task_id, None)
+        if payload is not None:
+            self._payload_bytes -= payload["size"]
+        self._db.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+        self._db.commit()
+        shutil.rmtree(os.path.join(self.directory, task_id), ignore_errors=True)
+
+    def purge_expired(self) -> None:
+        """Supprime les tâches terminées dont la durée de vie est dépassée."""
+        expired = self._db.execute(
+            "SELECT task_id FROM tasks WHERE expires_at IS NOT NULL AND expires_at < ?",
+            (time.time(),),
+        ).fetchall()
+        for (task_id,) in expired:
+            self.delete(task_id)
+
+        # Oublier les métadonnées en mémoire des tâches terminées sans résultat chargé
+        for task_id in list(self._tasks):
+            if task_id not in self._owned and task_id not in self._payloads:
+                del self._tasks[task_id]
+
+    def claim(self, worker_id: str) -> str | None:
+        """Réclame la plus ancienne tâche en attente pour le worker et la retourne."""
+        now = time.time()
+        self._db.commit()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._db.execute(
+                "SELECT task_id, metadata, failures FROM tasks WHERE status = 'pending'"
+                " AND json_extract(metadata, '$.crawl_key') NOT IN ("
+                "   SELECT json_extract(metadata, '$.crawl_key') FROM tasks"
+                "   WHERE status = 'running' AND worker_id != ?"
+                "   AND json_extract(metadata, '$.crawl_key') IS NOT NULL"
+                " ) ORDER BY updated_at LIMIT 1",
+                (worker_id,),
+            ).fetchone()
+            if row is not None:
+                self._db.execute(
+                    "UPDATE tasks SET status = 'running', worker_id = ?, heartbeat_at = ?,"
+                    " cancel_requested = 0,"
+                    " metadata = json_set(metadata, '$.status', 'running')"
+                    " WHERE task_id = ?",
+                    (worker_id, now, row[0]),
+                )
+            self._db.commit()
+        except sqlite3.Error:
+            self._db.rollback()
+            raise
+
+        if row is None:
+            return None
+        task_id, metadata, failures = row
+        task = self._load(metadata, failures)
+        task["status"] = "running"
+        self._tasks[task_id] = task
+        self._owned.add(task_id)
+        # Journal vidé : les pages d'une tâche remise en attente y sont rejouées
+        # depuis son point de reprise
+        self._close_page_log(task_id)
+        self._page_logs[task_id] = PageLog(os.path.join(self.directory, task_id))
+        return task_id
+
+    def is_owned(self, task_id: str) -> bool:
+        """Indique si la tâche est en cours dans ce processus."""
+        return task_id in self._owned
+
+    def owned_count(self) -> int:
+        """Retourne le nombre de tâches en cours dans ce processus."""
+        return len(self._owned)
+
+    async def sync(self, worker_id: str) -> None:
+        """
+        Enregistre la progression des tâches du worker et signale son activité.
+
+        Les métadonnées sont sérialisées dans la boucle d'événements, puis écrites
+        par le thread d'écriture.
+        """
+        rows = [self._row(task_id, self._tasks[task_id]) for task_id in self._owned]
+        await self._write_in_thread(rows, worker_id)
+
+    def request_cancel(self, task_id: str) -> None:
+        """Annule une tâche en attente, ou demande l'annulation d'une tâche en cours."""
+        now = time.time()
+        self._db.execute(
+            "UPDATE tasks SET status = 'cancelled', updated_at = ?, expires_at = ?,"
+            " metadata = json_set(metadata, '$.status', 'cancelled', '$.end_time', ?)"
+            " WHERE task_id = ? AND status = 'pending'",
+            (now, now + self.ttl, datetime.now().isoformat(), task_id),
+        )
+        self._db.execute(
+            "UPDATE tasks SET cancel_requested = 1 WHERE task_id = ? AND status = 'running'",
+            (task_id,),
+        )
+        self._db.commit()
+
+    def cancel_requests(self, worker_id: str) -> list[str]:
+        """Retourne les tâches du worker dont l'annulation a été demandée."""
+        rows = self._db.execute(
+            "SELECT task_id FROM tasks"
+            " WHERE worker_id = ? AND status = 'running' AND cancel_requested = 1",
+            (worker_id,),
+        ).fetchall()
+        return [task_id for (task_id,) in rows if task_id in self._owned]
+
+    def requeue_stale(self, stale_after: float) -> int:
+        """Remet en attente les tâches des workers inactifs ; retourne leur nombre."""
+        cursor = self._db.execute(
+            "UPDATE tasks SET status = 'pending', worker_id = NULL,"
+            " metadata = json_set(metadata, '$.status', 'pending')"
+            " WHERE status = 'running' AND heartbeat_at < ?",
+            (time.time() - stale_after,),
+        )
+        self._db.commit()
+        return cursor.rowcount
+
+    def release(self, worker_id: str) -> None:
+        """Remet en attente les tâches en cours du worker (arrêt du processus)."""
+        # Progression encore en file écrite d'abord : elle ne doit pas suivre la remise
+        # en attente
+        self._writer.submit(lambda: None).result()
+        for task_id in list(self._owned):
+            self._tasks[task_id]["status"] = "pending"
+            self._upsert(self._db, self._row(task_id, self._tasks[task_id]))
+            self._owned.discard(task_id)
+            self._written_failures.pop(task_id, None)
+            self._close_page_log(task_id)
+        self._db.execute(
+            "UPDATE tasks SET worker_id = NULL WHERE worker_id = ? AND status = 'pending'",
+            (worker_id,),
+        )
+        self._db.commit()
+
+    def flush(self) -> None:
+        """Libère les résultats en mémoire et enregistre les tâches en cours."""
+        for task_id in list(self._payloads):
+            self._spill(task_id)
+        self._writer.submit(lambda: None).result()
+        for task_id in self._owned:
+            self._upsert(self._db, self._row(task_id, self._tasks[task_id]))
+        self._db.commit()
+
+    def close(self) -> None:
+        """Enregistre l'état courant et ferme l'index."""
+        self.flush()
+        for task_id in list(self._page_logs):
+            self._close_page_log(task_id)
+        self._writer.submit(self._close_writer_db).result()
+        self._writer.shutdown()
+        self._db.close()
+
+    def _path(self, task_id: str, name: str) -> str:
+        return os.path.join(self.directory, task_id, name)
+
+    def _close_page_log(self, task_id: str) -> PageLog | None:
+        page_log = self._page_logs.pop(task_id, None)
+        if page_log is not None:
+            page_log.close()
+        return page_log
+
+    def _row(self, task_id: str, task: dict) -> tuple:
+        """
+        Sérialise une tâche pour ``_upsert``.
+
+        La liste des échecs n'est sérialisée que si ce n'est plus la liste
+        enregistrée, ou si elle s'est allongée (les échecs ne font que s'ajouter).
+        """
+        now = time.time()
+        expires_at = now + self.ttl if task["status"] not in ACTIVE_STATUSES else None
+        metadata = {key: value for key, value in task.items() if key != "failures"}
+        failures = task.get("failures") or []
+        written = self._written_failures.get(task_id)
+        failures_json = None
+        if written is None or written[0] is not failures or written[1] != len(failures):
+            self._written_failures[task_id] = (failures, len(failures))
+            failures_json = json.dumps(failures, default=str)
+        return (
+            task_id,
+            task["status"],
+            now,
+            expires_at,
+            json.dumps(metadata, default=str),
+            failures_json,
+        )
+
+    @staticmethod
+    def _upsert(db: sqlite3.Connection, row: tuple) -> None:
+        # Sans nouvelle liste d'échecs, la colonne enregistrée est gardée
+        db.execute(
+            "INSERT INTO tasks"
+            " (task_id, status, updated_at, expires_at, metadata, failures)"
+            " VALUES (?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (task_id) DO UPDATE SET status = excluded.status,"
+            " updated_at = excluded.updated_at, expires_at = excluded.expires_at,"
+            " metadata = excluded.metadata,"
+            " failures = coalesce(excluded.failures, failures)",
+            row,
+        )
+
+    @staticmethod
+    def _load(metadata: str, failures: str | None) -> dict:
+        task = json.loads(metadata)
+        # Tâches enregistrées avant la colonne : échecs restés dans les métadonnées
+        if failures is not None:
+            task["failures"] = json.loads(failures)
+        return task
+
+    async def _write_in_thread(
+        self, rows: list[tuple], worker_id: str | None = None
+    ) -> None:
+        future = self._writer.submit(self._write_rows, rows, worker_id)
+        try:
+            await asyncio.wrap_future(future)
+        except Exception:
+            # Listes d'échecs à réécrire à la prochaine synchronisation
+            for row in rows:
+                self._written_failures.pop(row[0], None)
+            raise
+
+    def _write_rows(self, rows: list[tuple], worker_id: str | None) -> None:
+        if self._writer_db is None:
+            self._writer_db = sqlite3.connect(
+                os.path.join(self.directory, "tasks.sqlite3"), timeout=30
+            )
+        try:
+            for row in rows:
+                self._upsert(self._writer_db, row)
+            if worker_id is not None:
+                self._writer_db.execute(
+                    "UPDATE tasks SET heartbeat_at = ?"
+                    " WHERE worker_id = ? AND status = 'running'",
+                    (time.time(), worker_id),
+                )
+            self._writer_db.commit()
+        except sqlite3.Error:
+            self._writer_db.rollback()
+            raise
+
+    def _close_writer_db(self) -> None:
+        if self._writer_db is not None:
+            self._writer_db.close()
+            self._writer_db = None
+
+    def _enforce_memory_budget(self, keep: str) -> None:
+        while self._payload_bytes > self.memory_budget and len(self._payloads) > 1:
+            task_id = next(iter(self._payloads))
+            if task_id == keep:
+                self._payloads.move_to_end(task_id)
+                continue
+            self._spill(task_id)
+
+    def _spill(self, task_id: str) -> None:
+        payload = self._payloads.pop(task_id)
+        self._payload_bytes -= payload["size"]
+        # Les résultats sont déjà sur disque : il suffit de les libérer
+
+    def _write_result(self, task_id: str, payload: dict, page_log: PageLog | None) -> None:
+        directory = os.path.join(self.directory, task_id)
+        url_to_markdown = payload["url_to_markdown"]
+        try:
+            os.makedirs(directory, exist_ok=True)
+            zip_export = payload["zip_export"]
+            if zip_export is not None:
+                zip_export.save(self._path(task_id, "export.zip"))
+            # Journal écrit au fil du crawl : réécrit seulement s'il diffère du résultat
+            if page_log is None or page_log.count != len(url_to_markdown):
+                write_pages(directory, url_to_markdown.items())
+        except OSError as e:
+            logging.error(
+                f"Impossible d'enregistrer les résultats de la tâche {task_id}: {e}"
+            )
+
+
+# Implémentations disponibles, choisies par SCRAPER_TASK_BACKEND
+TASK_BACKENDS: dict[str, type[TaskBackend]] = {
+    "sqlite": TaskStore,
+}
+
+
+def get_task_store() -> TaskBackend:
+    """Retourne le store de tâches partagé."""
+    global _task_store
+    if _task_store is None:
+        backend = TASK_BACKENDS.get(SCRAPER_TASK_BACKEND)
+        if backend is None:
+            raise ValueError(f"Stockage de tâches inconnu: {SCRAPER_TASK_BACKEND}")
+        _task_store = backend(
+            SCRAPER_TASK_STORE_DIR, SCRAPER_TASK_TTL_SECONDS, SCRAPER_TASK_MEMORY_BYTES
+        )
+    return _task_store
+
+
+def close_task_store() -> None:
+    """Enregistre et ferme le store de tâches partagé."""
+    global _task_store
+    if _task_store is not None:
+        _task_store.close()
+        _task_store = None
@@ -0,0 +1,231 @@
+"""Frontière de crawl : file d'URLs dédupliquées à l'insertion."""
+
+import asyncio
+import hashlib
+import heapq
+import math
+import time
+from collections import deque
+from collections.abc import Callable, Iterable
+from urllib.parse import urldefrag
+
+from app.core.config import SCRAPER_BLOOM_CAPACITY, SCRAPER_BLOOM_ERROR_RATE
+from app.services.url_utils import normalize_url
+
+
+class BloomFilter:
+    """
+    Filtre de Bloom pour mémoriser des millions d'URLs dans un espace fixe.
+
+    Un faux positif fait ignorer une URL jamais vue, avec une probabilité bornée
+    par ``error_rate`` tant que ``capacity`` n'est pas dépassée.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> list[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        # Double hachage : h1 + i * h2 donne les k positions
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def __contains__(self, item: str) -> bool:
+        """Indique si l'élément a probablement déjà été ajouté."""
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def __len__(self) -> int:
+        """Retourne le nombre d'éléments ajoutés."""
+        return self.count
+
+    def add(self, item: str) -> None:
+        """Ajoute un élément au filtre."""
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+
+class UrlFrontier:
+    """
+    File des URLs à parcourir, dédupliquées au moment de l'insertion.
+
+    Chaque URL canonique n'est mise en file qu'une seule fois. La forme canonique
+    ne sert que de clé de déduplication : l'URL est parcourue telle qu'elle a été
+    découverte (sans son fragment), car un serveur ne répond pas forcément à sa
+    forme canonique (``/dir`` pour ``/dir/index.html``). La frontière tient
+    le compte exact des URLs en attente, en cours de traitement et terminées, et
+    signale la fin du crawl lorsque plus aucune URL n'est en attente ni en cours.
+    Une URL en échec peut être remise en file après un délai, sans occuper de
+    worker pendant l'attente.
+
+    La profondeur de chaque URL (nombre de liens suivis depuis le départ) est
+    bornée par ``max_depth`` ; au-delà de ``max_pages`` URLs distribuées, la
+    frontière se ferme.
+
+    ``journal`` reçoit chaque événement de la frontière (``"add"``, ``"seen"``,
+    ``"done"``) pour le point de reprise du crawl ; ``restore`` reprend l'état
+    ainsi enregistré.
+    """
+
+    def __init__(
+        self,
+        canonicalize: Callable[[str], str] = normalize_url,
+        use_bloom_filter: bool = False,
+        max_pages: int | None = None,
+        max_depth: int | None = None,
+    ):
+        self.canonicalize = canonicalize
+        self.seen: set[str] | BloomFilter = (
+            BloomFilter(SCRAPER_BLOOM_CAPACITY, SCRAPER_BLOOM_ERROR_RATE)
+            if use_bloom_filter
+            else set()
+        )
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self._queue: deque[tuple[str, int]] = deque()
+        # Nouvelles tentatives programmées : (instant de reprise, URL, profondeur)
+        self._delayed: list[tuple[float, str, int]] = []
+        self._depths: dict[str, int] = {}
+        self._changed = asyncio.Event()
+        self.attempts: dict[str, int] = {}
+        # URLs canoniques marquées vues sans être mises en file
+        self.aliases = 0
+        self.started = 0
+        self.in_flight = 0
+        self.done = 0
+        self.stop_reason: str | None = None
+        self.journal: Callable[..., None] | None = None
+
+    @property
+    def queued(self) -> int:
+        """Nombre d'URLs en attente, y compris les nouvelles tentatives programmées."""
+        return len(self._queue) + len(self._delayed)
+
+    @property
+    def discovered(self) -> int:
+        """Nombre total d'URLs distinctes mises en file."""
+        return len(self.seen) - self.aliases
+
+    def add(self, url: str, depth: int = 0) -> bool:
+        """Met l'URL en file si elle n'a jamais été vue ; retourne ``True`` dans ce cas."""
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+        url, _ = urldefrag(url)
+        key = self.canonicalize(url)
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        self._queue.append((url, depth))
+        self._changed.set()
+        if self.journal is not None:
+            self.journal("add", url, depth)
+        return True
+
+    def mark_seen(self, url: str) -> bool:
+        """
+        Marque l'URL comme vue sans la mettre en file ; retourne ``True`` si elle
+        n'avait jamais été vue.
+
+        Utilisé pour l'URL canonique d'une page téléchargée sous un alias : la
+        page est enregistrée sous cette URL, qui n'a plus à être parcourue.
+        """
+        key = self.canonicalize(url)
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        self.aliases += 1
+        if self.journal is not None:
+            self.journal("seen", url)
+        return True
+
+    def depth(self, url: str) -> int:
+        """Retourne la profondeur d'une URL en cours de traitement."""
+        return self._depths.get(url, 0)
+
+    async def get(self) -> str | None:
+        """Retourne la prochaine URL, ou ``None`` lorsque le crawl est terminé."""
+        while self.stop_reason is None:
+            now = time.monotonic()
+            while self._delayed and self._delayed[0][0] <= now:
+                _, url, depth = heapq.heappop(self._delayed)
+                self._queue.appendleft((url, depth))
+            if self._queue:
+                url, depth = self._queue[0]
+                is_retry = url in self.attempts
+                if not is_retry and self.max_pages and self.started >= self.max_pages:
+                    self.close("max_pages")
+                    break
+                self._queue.popleft()
+                self.started += 0 if is_retry else 1
+                self.in_flight += 1
+                self._depths[url] = depth
+                return url
+            if self.in_flight == 0 and not self._delayed:
+                return None
+
+            timeout = self._delayed[0][0] - now if self._delayed else None
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except TimeoutError:
+                pass
+        return None
+
+    def task_done(self, url: str) -> None:
+        """Signale la fin du traitement d'une URL obtenue par ``get``."""
+        self._depths.pop(url, None)
+        self.in_flight -= 1
+        self.done += 1
+        if self.in_flight == 0:
+            self._changed.set()
+        if self.journal is not None:
+            self.journal("done", url)
+
+    def retry(self, url: str, delay: float) -> None:
+        """Remet en file une URL obtenue par ``get`` pour une nouvelle tentative."""
+        depth = self._depths.pop(url, 0)
+        self.in_flight -= 1
+        heapq.heappush(self._delayed, (time.monotonic() + delay, url, depth))
+        self._changed.set()
+
+    def restore(
+        self,
+        seen: Iterable[str],
+        pending: Iterable[tuple[str, int]],
+        done: int,
+        aliases: int = 0,
+    ) -> None:
+        """
+        Reprend l'état d'un crawl interrompu.
+
+        ``seen`` contient toutes les URLs canoniques déjà vues, dont ``aliases``
+        n'ont pas été mises en file ; ``pending`` liste les URLs qui restent à
+        parcourir avec leur profondeur ; ``done`` URLs ont déjà été traitées et
+        comptent dans ``max_pages``.
+        """
+        for url in seen:
+            self.seen.add(url)
+        self._queue.extend(pending)
+        self.aliases += aliases
+        self.done += done
+        self.started += done
+        self._changed.set()
+
+    def close(self, reason: str) -> None:
+        """Arrête la distribution des URLs ; les URLs en attente ne sont pas parcourues."""
+        if self.stop_reason is None:
+            self.stop_reason = reason
+        self._changed.set()
+
+    def stats(self) -> dict[str, int]:
+        """Retourne les compteurs de progression de la frontière."""
+        return {
+            "queued_pages": self.queued,
+            "in_flight_pages": self.in_flight,
+            "processed_pages": self.done,
+            "total_pages": self.discovered,
+        }
@@ -0,0 +1,114 @@
+"""Fonctions utilitaires de manipulation des URLs."""
+
+import fnmatch
+import re
+from urllib.parse import parse_qsl, quote, urldefrag, urlencode, urlsplit, urlunsplit
+
+from app.core.config import (
+    SCRAPER_CANONICAL_INDEX_FILES,
+    SCRAPER_CANONICAL_LOWERCASE_PATH,
+    SCRAPER_CANONICAL_QUERY_ALLOW,
+    SCRAPER_CANONICAL_QUERY_DENY,
+    SCRAPER_CANONICAL_SORT_QUERY,
+)
+
+# Ports implicites retirés de l'hôte
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def split_list(value: str) -> list[str]:
+    """Découpe une liste de valeurs séparées par des virgules."""
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def compile_patterns(patterns: list[str]) -> re.Pattern | None:
+    """Compile des motifs shell (``utm_*``) en une seule expression régulière."""
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns))
+
+
+class UrlCanonicalizer:
+    """
+    Règles de canonicalisation des URLs parcourues.
+
+    Deux URLs qui désignent la même page doivent avoir la même forme canonique :
+    le fragment, la barre oblique finale, le port implicite et les fichiers
+    d'index (``/page/index.html``) sont retirés, le schéma et l'hôte sont mis en
+    minuscules. Seuls les paramètres de requête de ``query_allow`` (tous si la
+    liste est vide) qui ne sont pas dans ``query_deny`` sont conservés, triés
+    par nom si ``sort_query`` est vrai.
+    """
+
+    def __init__(
+        self,
+        query_allow: list[str] | None = None,
+        query_deny: list[str] | None = None,
+        index_files: list[str] | None = None,
+        lowercase_path: bool = SCRAPER_CANONICAL_LOWERCASE_PATH,
+        sort_query: bool = SCRAPER_CANONICAL_SORT_QUERY,
+    ):
+        if query_allow is None:
+            query_allow = split_list(SCRAPER_CANONICAL_QUERY_ALLOW)
+        if query_deny is None:
+            query_deny = split_list(SCRAPER_CANONICAL_QUERY_DENY)
+        if index_files is None:
+            index_files = split_list(SCRAPER_CANONICAL_INDEX_FILES)
+        self.query_allow = compile_patterns(query_allow)
+        self.query_deny = compile_patterns(query_deny)
+        self.index_files = frozenset(index_files)
+        self.lowercase_path = lowercase_path
+        self.sort_query = sort_query
+
+    def __call__(self, url: str) -> str:
+        """Retourne la forme canonique de l'URL."""
+        url, _ = urldefrag(url)
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+
+        netloc = parts.netloc.lower()
+        if parts.port is not None and _DEFAULT_PORTS.get(scheme) == parts.port:
+            netloc = netloc.rsplit(":", 1)[0]
+
+        path = parts.path.lower() if self.lowercase_path else parts.path
+        head, _, last_segment = path.rpartition("/")
+        if last_segment in self.index_files:
+            path = head
+
+        url = urlunsplit((scheme, netloc, path, self.filter_query(parts.query), ""))
+        if url.endswith("/"):
+            url = url[:-1]
+        return url
+
+    def filter_query(self, query: str) -> str:
+        """Retourne la chaîne de requête réduite aux paramètres conservés."""
+        if not query:
+            return ""
+        original = parse_qsl(query, keep_blank_values=True)
+        params = [
+            (name, value)
+            for name, value in original
+            if (self.query_allow is None or self.query_allow.match(name))
+            and (self.query_deny is None or not self.query_deny.match(name))
+        ]
+        if self.sort_query:
+            params.sort()
+        # Requête déjà canonique : conserver son encodage d'origine
+        if params == original:
+            return query
+        return urlencode(params, quote_via=quote)
+
+
+# Règles lues dans la configuration, partagées par tous les crawls
+_canonicalizer = UrlCanonicalizer()
+
+
+def normalize_url(url: str) -> str:
+    """Retourne la forme canonique de l'URL selon les règles de la configuration."""
+    return _canonicalizer(url)
+
+
+def is_in_scope(url: str, base_netloc: str, base_path: str) -> bool:
+    """Indique si l'URL fait partie du périmètre du crawl (même hôte, sous le chemin)."""
+    parsed_url = urlsplit(url)
+    return parsed_url.netloc == base_netloc and parsed_url.path.startswith(base_path)
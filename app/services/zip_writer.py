@@ -0,0 +1,187 @@
+"""Écriture d'archives ZIP à partir de membres compressés à l'avance."""
+
+import struct
+import time
+import zipfile
+import zlib
+from typing import BinaryIO, NamedTuple
+
+# À partir de ces limites, tailles, positions et nombre de membres passent en ZIP64
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP64_COUNT_LIMIT = 0xFFFF
+
+# En-tête local, entrée du répertoire central et fin du répertoire central
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+_CENTRAL_HEADER = struct.Struct("<4s6H3L5H2L")
+_END_RECORD = struct.Struct("<4s4H2LH")
+_ZIP64_END_RECORD = struct.Struct("<4sQ2H2L4Q")
+_ZIP64_END_LOCATOR = struct.Struct("<4sLQL")
+
+# Noms en UTF-8 (bit 11 des drapeaux)
+_UTF8_FLAG = 0x800
+# Membres créés sous Unix, lisibles et modifiables par leur seul propriétaire
+_CREATE_SYSTEM = 3
+_EXTERNAL_ATTR = 0o600 << 16
+
+
+class ZipMember(NamedTuple):
+    """Membre d'une archive, compressé et prêt à être écrit."""
+
+    name: bytes
+    method: int
+    crc: int
+    size: int
+    data: bytes
+
+
+class _Entry(NamedTuple):
+    """Membre écrit, décrit ensuite dans le répertoire central."""
+
+    member: ZipMember
+    offset: int
+    dos_time: int
+    dos_date: int
+
+
+def compress_member(path: str, content: bytes, level: int) -> ZipMember:
+    """
+    Compresse le contenu d'un membre au niveau ``level`` (Deflate, 1 à 9).
+
+    Au niveau 0, le membre est stocké sans compression. ``zlib`` libère le GIL
+    pendant la compression : plusieurs threads compressent en parallèle.
+    """
+    crc = zlib.crc32(content)
+    if level == 0:
+        return ZipMember(
+            path.encode("utf-8"), zipfile.ZIP_STORED, crc, len(content), content
+        )
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    data = compressor.compress(content) + compressor.flush()
+    return ZipMember(path.encode("utf-8"), zipfile.ZIP_DEFLATED, crc, len(content), data)
+
+
+def dos_date_time(timestamp: float) -> tuple[int, int]:
+    """Retourne l'heure et la date d'un horodatage au format MS-DOS des archives ZIP."""
+    t = time.localtime(timestamp)
+    dos_time = t.tm_hour << 11 | t.tm_min << 5 | t.tm_sec // 2
+    dos_date = (max(t.tm_year, 1980) - 1980) << 9 | t.tm_mon << 5 | t.tm_mday
+    return dos_time, dos_date
+
+
+def zip64_extra(values: list[int]) -> bytes:
+    """Construit le champ supplémentaire ZIP64 qui porte les valeurs trop grandes."""
+    if not values:
+        return b""
+    return struct.pack(f"<2H{len(values)}Q", 1, 8 * len(values), *values)
+
+
+class ZipWriter:
+    """
+    Archive ZIP écrite membre par membre dans ``file``.
+
+    Les membres arrivent déjà compressés (``compress_member``) : l'écriture se
+    limite à copier leurs octets derrière un en-tête. Le répertoire central est
+    écrit à la fermeture, en ZIP64 si l'archive dépasse les limites du format ZIP.
+    """
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.offset = file.tell()
+        self.entries: list[_Entry] = []
+
+    def write(self, member: ZipMember) -> None:
+        """Écrit un membre compressé à la suite de l'archive."""
+        sizes = [member.size, len(member.data)]
+        zip64 = any(size >= ZIP64_LIMIT for size in sizes)
+        extra = zip64_extra(sizes if zip64 else [])
+        dos_time, dos_date = dos_date_time(time.time())
+        header = _LOCAL_HEADER.pack(
+            b"PK\x03\x04",
+            45 if zip64 else 20,
+            _UTF8_FLAG,
+            member.method,
+            dos_time,
+            dos_date,
+            member.crc,
+            ZIP64_LIMIT if zip64 else len(member.data),
+            ZIP64_LIMIT if zip64 else member.size,
+            len(member.name),
+            len(extra),
+        )
+        self.file.write(header + member.name + extra)
+        self.file.write(member.data)
+        self.entries.append(_Entry(member, self.offset, dos_time, dos_date))
+        self.offset += len(header) + len(member.name) + len(extra) + len(member.data)
+
+    def close(self) -> None:
+        """Écrit le répertoire central de l'archive."""
+        directory = b"".join(self.central_header(entry) for entry in self.entries)
+        self.file.write(directory)
+        directory_offset, directory_size = self.offset, len(directory)
+        count = len(self.entries)
+        if (
+            count >= ZIP64_COUNT_LIMIT
+            or directory_offset >= ZIP64_LIMIT
+            or directory_size >= ZIP64_LIMIT
+        ):
+            zip64_end_offset = directory_offset + directory_size
+            self.file.write(
+                _ZIP64_END_RECORD.pack(
+                    b"PK\x06\x06",
+                    _ZIP64_END_RECORD.size - 12,
+                    _CREATE_SYSTEM << 8 | 45,
+                    45,
+                    0,
+                    0,
+                    count,
+                    count,
+                    directory_size,
+                    directory_offset,
+                )
+            )
+            self.file.write(_ZIP64_END_LOCATOR.pack(b"PK\x06\x07", 0, zip64_end_offset, 1))
+        self.file.write(
+            _END_RECORD.pack(
+                b"PK\x05\x06",
+                0,
+                0,
+                min(count, ZIP64_COUNT_LIMIT),
+                min(count, ZIP64_COUNT_LIMIT),
+                min(directory_size, ZIP64_LIMIT),
+                min(directory_offset, ZIP64_LIMIT),
+                0,
+            )
+        )
+        self.file.flush()
+
+    def central_header(self, entry: _Entry) -> bytes:
+        """Retourne l'entrée du répertoire central qui décrit un membre écrit."""
+        member = entry.member
+        # Valeurs trop grandes, dans l'ordre du champ ZIP64 (taille, taille compressée, position)
+        large = [
+            value
+            for value in (member.size, len(member.data), entry.offset)
+            if value >= ZIP64_LIMIT
+        ]
+        extra = zip64_extra(large)
+        version = 45 if large else 20
+        header = _CENTRAL_HEADER.pack(
+            b"PK\x01\x02",
+            _CREATE_SYSTEM << 8 | version,
+            version,
+            _UTF8_FLAG,
+            member.method,
+            entry.dos_time,
+            entry.dos_date,
+            member.crc,
+            min(len(member.data), ZIP64_LIMIT),
+            min(member.size, ZIP64_LIMIT),
+            len(member.name),
+            len(extra),
+            0,
+            0,
+            0,
+            _EXTERNAL_ATTR,
+            min(entry.offset, ZIP64_LIMIT),
+        )
+        return header + member.name + extra
@@ -23,6 +23,114 @@ export function useScraper() {
   const [result, setResult] = useState<ScrapingResult | null>(null);
   const [taskId, setTaskId] = useState<string | null>(null);
 
+  const setError = (error: unknown) => {
+    setStatus((prev) => ({
+      ...prev,
+      isLoading: false,
+      error:
+        error instanceof Error
+          ? error.message
+          : "Une erreur inattendue est survenue",
+    }));
+  };
+
+  /**
+   * Récupère le résultat d'une tâche terminée et déclenche le téléchargement
+   */
+  const completeTask = async (completedTaskId: string) => {
+    // Récupérer le résultat
+    const response = await fetch(`${API_BASE_URL}/result/${completedTaskId}`);
+    const resultData = await response.json();
+
+    // Créer un objet de résultat et l'assigner au state
+    const scrapingResult: ScrapingResult = {
+      taskId: completedTaskId,
+      url: resultData.url,
+      content: resultData.content,
+      status: resultData.status,
+      timestamp: resultData.timestamp,
+      format: resultData.format,
+      filename: resultData.filename,
+    };
+
+    setResult(scrapingResult);
+    setStatus((prev) => ({ ...prev, isLoading: false, progress: 100 }));
+
+    // Déclencher automatiquement le téléchargement
+    const link = document.createElement("a");
+    link.href = `${API_BASE_URL}/download/${completedTaskId}`;
+    link.setAttribute("download", ""); // Le serveur gère le nom du fichier
+    document.body.appendChild(link);
+    link.click();
+    document.body.removeChild(link);
+  };
+
+  /**
+   * Suit la progression par polling de /progress toutes les 2 secondes
+   */
+  const pollProgress = (pollTaskId: string) => {
+    const pollInterval = setInterval(async () => {
+      try {
+        const taskStatus = await getScrapingStatus(pollTaskId);
+        setStatus((prev) => ({
+          ...prev,
+          progress: taskStatus.progress,
+        }));
+
+        // Vérifier si la tâche est terminée
+        if (taskStatus.status === "completed") {
+          clearInterval(pollInterval);
+          await completeTask(pollTaskId);
+        } else if (taskStatus.status === "error") {
+          clearInterval(pollInterval);
+          throw new Error("Une erreur est survenue pendant le scraping");
+        }
+      } catch (error) {
+        clearInterval(pollInterval);
+        setError(error);
+      }
+    }, 2000); // Vérifier toutes les 2 secondes
+  };
+
+  /**
+   * Suit la progression via le flux server-sent events de l'API.
+   * Bascule sur le polling si le flux est interrompu avant la fin.
+   */
+  const streamProgress = (streamTaskId: string) => {
+    const source = new EventSource(
+      `${API_BASE_URL}/progress/${streamTaskId}/stream`
+    );
+    let isDone = false;
+
+    source.addEventListener("progress", (event) => {
+      const delta = JSON.parse((event as MessageEvent).data);
+      if (typeof delta.progress === "number") {
+        setStatus((prev) => ({ ...prev, progress: delta.progress }));
+      }
+    });
+
+    source.addEventListener("complete", async (event) => {
+      isDone = true;
+      source.close();
+      const data = JSON.parse((event as MessageEvent).data);
+      try {
+        if (data.status !== "completed") {
+          throw new Error("Une erreur est survenue pendant le scraping");
+        }
+        await completeTask(streamTaskId);
+      } catch (error) {
+        setError(error);
+      }
+    });
+
+    source.onerror = () => {
+      source.close();
+      if (!isDone) {
+        pollProgress(streamTaskId);
+      }
+    };
+  };
+
   /**
    * Lance le scraping d'une URL et gère la progression
    * Le téléchargement est automatique une fois terminé
@@ -54,69 +162,14 @@ export function useScraper() {
       const newTaskId = data.task_id;
       setTaskId(newTaskId);
 
-      // Démarrer le polling de progression
-      const pollInterval = setInterval(async () => {
-        try {
-          const taskStatus = await getScrapingStatus(newTaskId);
-          setStatus((prev) => ({
-            ...prev,
-            progress: taskStatus.progress,
-          }));
-
-          // Vérifier si la tâche est terminée
-          if (taskStatus.status === "completed") {
-            clearInterval(pollInterval);
-
-            // Récupérer le résultat (cela déclenchera automatiquement le téléchargement)
-            const response = await fetch(`${API_BASE_URL}/result/${newTaskId}`);
-            const resultData = await response.json();
-
-            // Créer un objet de résultat et l'assigner au state
-            const scrapingResult: ScrapingResult = {
-              taskId: newTaskId,
-              url: resultData.url,
-              content: resultData.content,
-              status: resultData.status,
-              timestamp: resultData.timestamp,
-              format: resultData.format,
-              filename: resultData.filename,
-            };
-
-            setResult(scrapingResult);
-            setStatus((prev) => ({ ...prev, isLoading: false, progress: 100 }));
-
-            // Déclencher automatiquement le téléchargement
-            const link = document.createElement("a");
-            link.href = `${API_BASE_URL}/download/${newTaskId}`;
-            link.setAttribute("download", ""); // Le serveur gère le nom du fichier
-            document.body.appendChild(link);
-            link.click();
-            document.body.removeChild(link);
-          } else if (taskStatus.status === "error") {
-            clearInterval(pollInterval);
-            throw new Error("Une erreur est survenue pendant le scraping");
-          }
-        } catch (error) {
-          clearInterval(pollInterval);
-          setStatus((prev) => ({
-            ...prev,
-            isLoading: false,
-            error:
-              error instanceof Error
-                ? error.message
-                : "Une erreur inattendue est survenue",
-          }));
-        }
-      }, 2000); // Vérifier toutes les 2 secondes
+      // Suivre la progression via le flux SSE, ou par polling si indisponible
+      if (typeof EventSource !== "undefined") {
+        streamProgress(newTaskId);
+      } else {
+        pollProgress(newTaskId);
+      }
     } catch (error) {
-      setStatus((prev) => ({
-        ...prev,
-        isLoading: false,
-        error:
-          error instanceof Error
-            ? error.message
-            : "Une erreur inattendue est survenue",
-      }));
+      setError(error);
     }
   };
 
@@ -0,0 +1,513 @@
+"""
+Banc d'essai du crawl sur un site de documentation synthétique servi en local.
+
+Le site est généré de façon reproductible (nombre de pages, taille des pages,
+nombre de liens, latence et erreurs injectées) et servi par un processus séparé.
+Le crawl passe par le service, comme une tâche lancée depuis l'API ; les mesures
+sont enregistrées en JSON pour comparer deux exécutions :
+
+    python -m scripts.benchmark --pages 1000 --output output/benchmarks/avant.json
+    python -m scripts.benchmark --pages 1000 --compare output/benchmarks/avant.json
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import NamedTuple
+
+from aiohttp import web
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - indisponible sous Windows
+    resource = None
+
+# Mots des paragraphes générés
+_WORDS = (
+    "crawler documentation markdown request response header cache session page "
+    "link section example parameter configuration install module function class "
+    "return value error timeout retry queue worker export archive format"
+).split()
+
+# Métriques comparées avec --compare : chemin dans le résumé, plus grand = meilleur
+_COMPARED_METRICS = (
+    ("pages_per_second", True),
+    ("page_latency_ms.p50", False),
+    ("page_latency_ms.p95", False),
+    ("loop_lag_ms.p95", False),
+    ("loop_lag_ms.max", False),
+    ("peak_rss_bytes", False),
+    ("zip_close_seconds", False),
+)
+
+
+def page_path(index: int) -> str:
+    """Retourne le chemin de la page ``index`` ; la première est la racine du site."""
+    return f"/docs/p{index}" if index else "/docs/"
+
+
+class SiteOptions(NamedTuple):
+    """Paramètres du site synthétique ; la même graine produit le même site."""
+
+    pages: int = 500
+    page_size: int = 8000
+    fanout: int = 5
+    latency: float = 0.02
+    error_rate: float = 0.0
+    missing_rate: float = 0.0
+    seed: int = 42
+
+
+def build_page(index: int, options: SiteOptions) -> str:
+    """
+    Construit le HTML de la page ``index`` du site synthétique.
+
+    Chaque page mène à la suivante (toutes les pages sont atteignables depuis la
+    première) et à ``fanout - 1`` pages tirées au hasard. Une partie des pages,
+    selon ``missing_rate``, contient en plus un lien vers une page inexistante.
+    Menu et pied de page imitent le gabarit d'un générateur de documentation.
+    """
+    rng = random.Random(options.seed * 1_000_003 + index)
+    targets = [(index + 1) % options.pages] + [
+        rng.randrange(options.pages) for _ in range(max(options.fanout - 1, 0))
+    ]
+    links = "".join(
+        f'<li><a href="{page_path(target)}">Page {target}</a></li>' for target in targets
+    )
+    if rng.random() < options.missing_rate:
+        links += f'<li><a href="/docs/missing-{index}">Page supprimée</a></li>'
+
+    paragraphs = []
+    size = 0
+    target_size = int(options.page_size * rng.uniform(0.75, 1.25))
+    while size < target_size:
+        paragraph = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(40, 120)))
+        paragraphs.append(f"<p>{paragraph}</p>")
+        size += len(paragraph) + 7
+        if len(paragraphs) % 4 == 0:
+            paragraphs.append(f"<h2>Section {len(paragraphs) // 4}</h2>")
+
+    menu = "".join(
+        f'<li><a href="{page_path(rng.randrange(options.pages))}">Menu {item}</a></li>'
+        for item in range(30)
+    )
+    return (
+        f"<html><head><title>Page {index}</title></head><body>"
+        f"<nav><ul>{menu}</ul></nav>"
+        f'<main id="article-contents"><h1>Page {index}</h1>{"".join(paragraphs)}'
+        f"<ul>{links}</ul></main>"
+        "<footer><p>Documentation synthétique</p></footer></body></html>"
+    )
+
+
+def make_site_app(options: SiteOptions) -> web.Application:
+    """
+    Crée l'application du site synthétique.
+
+    Les pages tirées selon ``error_rate`` répondent 503 à leur première requête :
+    elles ne sont obtenues qu'après une nouvelle tentative du crawler.
+    """
+    rng = random.Random(options.seed)
+    flaky = {index for index in range(options.pages) if rng.random() < options.error_rate}
+    attempts: dict[int, int] = {}
+
+    async def handle_page(request: web.Request) -> web.Response:
+        name = request.match_info.get("name")
+        if name is None:
+            index = 0
+        elif (
+            name.startswith("p")
+            and name[1:].isdigit()
+            and 0 < int(name[1:]) < options.pages
+        ):
+            index = int(name[1:])
+        else:
+            raise web.HTTPNotFound()
+
+        await asyncio.sleep(options.latency * rng.uniform(0.5, 1.5))
+        attempts[index] = attempts.get(index, 0) + 1
+        if index in flaky and attempts[index] == 1:
+            return web.Response(status=503)
+        return web.Response(text=build_page(index, options), content_type="text/html")
+
+    async def handle_robots(request: web.Request) -> web.Response:
+        return web.Response(text="User-agent: *\nAllow: /\n")
+
+    app = web.Application()
+    app.router.add_get("/robots.txt", handle_robots)
+    app.router.add_get("/docs", handle_page)
+    app.router.add_get("/docs/", handle_page)
+    app.router.add_get("/docs/{name}", handle_page)
+    return app
+
+
+def serve_site(options: SiteOptions, connection) -> None:
+    """Sert le site synthétique sur un port libre et transmet ce port au parent."""
+
+    async def serve() -> None:
+        runner = web.AppRunner(make_site_app(options), access_log=None)
+        await runner.setup()
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        await web.SockSite(runner, sock).start()
+        connection.send(sock.getsockname()[1])
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+class SyntheticSite:
+    """Site synthétique servi par un processus séparé, le temps d'un bloc ``with``."""
+
+    def __init__(self, options: SiteOptions):
+        self.options = options
+        self.process = None
+        self.base_url = None
+
+    def __enter__(self) -> "SyntheticSite":
+        """Démarre le processus du site et attend qu'il écoute."""
+        context = multiprocessing.get_context("spawn")
+        receiver, sender = context.Pipe(duplex=False)
+        self.process = context.Process(
+            target=serve_site, args=(self.options, sender), daemon=True
+        )
+        self.process.start()
+        if not receiver.poll(30):
+            self.process.terminate()
+            raise RuntimeError("Le site synthétique n'a pas démarré")
+        self.base_url = f"http://127.0.0.1:{receiver.recv()}{page_path(0)}"
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Arrête le processus du site."""
+        self.process.terminate()
+        self.process.join()
+
+
+class LoopLagMonitor:
+    """
+    Mesure le retard de la boucle d'événements pendant le crawl.
+
+    Une tâche se réveille toutes les ``interval`` secondes ; l'écart entre le
+    réveil prévu et le réveil effectif est le temps pendant lequel la boucle était
+    occupée par un traitement bloquant.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Démarre la mesure."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Arrête la mesure."""
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, time.perf_counter() - expected))
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Retourne le centile ``q`` (entre 0 et 100) de ``values``, 0 si vide."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def distribution_ms(values: list[float]) -> dict[str, float]:
+    """Résume une série de durées en secondes : centiles et maximum en millisecondes."""
+    return {
+        "p50": round(percentile(values, 50) * 1000, 3),
+        "p95": round(percentile(values, 95) * 1000, 3),
+        "p99": round(percentile(values, 99) * 1000, 3),
+        "max": round(max(values, default=0.0) * 1000, 3),
+    }
+
+
+def peak_rss_bytes(who: int | None = None) -> int | None:
+    """Retourne le pic de mémoire résidente du processus (ou de ses enfants terminés)."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF if who is None else who)
+    # ru_maxrss est en kilo-octets sous Linux, en octets sous macOS
+    return usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+
+
+async def run_crawl(base_url: str, args: argparse.Namespace) -> dict:
+    """
+    Crawle le site synthétique par une tâche du service et retourne ses mesures.
+
+    La durée de chaque page (téléchargement et conversion, tentatives en échec
+    comprises) est mesurée autour de ``process_url``.
+    """
+    from app.schemas.scraper_schemas import ExportFormat
+    from app.services import scraper_service
+    from app.services.http_client import close_http_session, get_http_session
+    from app.services.task_store import ACTIVE_STATUSES
+
+    latencies: list[float] = []
+    process_url = scraper_service.process_url
+
+    async def timed_process_url(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await process_url(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    scraper_service.process_url = timed_process_url
+    get_http_session()
+    scraper_service.get_job_runner().start()
+    monitor = LoopLagMonitor()
+    monitor.start()
+    try:
+        started = time.perf_counter()
+        task_id = scraper_service.start_scraping_task(
+            base_url,
+            format=ExportFormat(args.format),
+            max_concurrency=args.max_concurrency,
+            max_per_host=args.max_per_host,
+            use_cache=False,
+        )
+        while scraper_service.get_task_status(task_id)["status"] in ACTIVE_STATUSES:
+            await asyncio.sleep(0.02)
+        elapsed = time.perf_counter() - started
+    finally:
+        await monitor.stop()
+        scraper_service.process_url = process_url
+        await scraper_service.stop_job_runner()
+        await close_http_session()
+
+    task = scraper_service.get_task_status(task_id)
+    url_to_markdown = scraper_service.get_url_to_markdown(task_id) or {}
+    zip_export = scraper_service.get_zip_export(task_id)
+    # Fin de l'archive par la tâche : dernières compressions, README et répertoire central
+    zip_close = task.get("timings", {}).get("zip_close", {})
+    return {
+        "status": task["status"],
+        "elapsed_seconds": round(elapsed, 3),
+        "processed_pages": task["processed_pages"],
+        "exported_pages": len(url_to_markdown),
+        "failed_pages": task["failed_pages"],
+        "duplicate_pages": task.get("duplicate_pages", 0),
+        "downloaded_bytes": task["downloaded_bytes"],
+        "pages_per_second": round(task["processed_pages"] / elapsed, 2),
+        "page_latency_ms": distribution_ms(latencies),
+        "loop_lag_ms": distribution_ms(monitor.lags),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "zip_close_seconds": round(zip_close.get("total_seconds", 0.0), 4),
+        "zip_bytes": zip_export.size if zip_export is not None else 0,
+    }
+
+
+def summarize(runs: list[dict]) -> dict:
+    """Retourne la médiane de chaque mesure numérique des exécutions."""
+    summary = {}
+    for key, value in runs[0].items():
+        if isinstance(value, dict):
+            summary[key] = summarize([run[key] for run in runs])
+        elif isinstance(value, int | float) and not isinstance(value, bool):
+            summary[key] = statistics.median(run[key] for run in runs)
+    return summary
+
+
+def get_git_commit() -> str | None:
+    """Retourne le commit courant du dépôt, s'il est disponible."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def get_metric(summary: dict, path: str) -> float | None:
+    """Retourne la mesure ``a.b`` d'un résumé, ou ``None`` si elle est absente."""
+    value = summary
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def print_comparison(baseline: dict, report: dict) -> None:
+    """Affiche l'écart entre les résumés d'une exécution de référence et de celle-ci."""
+    print(f"\n{'Mesure':<24}{'Référence':>14}{'Actuel':>14}{'Écart':>10}")
+    for path, higher_is_better in _COMPARED_METRICS:
+        before = get_metric(baseline["summary"], path)
+        after = get_metric(report["summary"], path)
+        if before is None or after is None:
+            continue
+        change = (after - before) / before * 100 if before else 0.0
+        better = (change > 0) == higher_is_better
+        marker = "" if abs(change) < 1 else ("+" if better else "-")
+        print(f"{path:<24}{before:>14.2f}{after:>14.2f}{change:>9.1f}%{marker}")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Lit les paramètres du banc d'essai."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    site = parser.add_argument_group("site synthétique")
+    site.add_argument("--pages", type=int, default=500, help="Nombre de pages")
+    site.add_argument(
+        "--page-size", type=int, default=8000, help="Taille moyenne du texte d'une page"
+    )
+    site.add_argument("--fanout", type=int, default=5, help="Liens par page")
+    site.add_argument(
+        "--latency", type=float, default=0.02, help="Latence moyenne d'une réponse (s)"
+    )
+    site.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Part des pages qui répondent 503 à leur première requête",
+    )
+    site.add_argument(
+        "--missing-rate",
+        type=float,
+        default=0.0,
+        help="Part des pages qui contiennent un lien vers une page inexistante",
+    )
+    site.add_argument("--seed", type=int, default=42, help="Graine du site généré")
+
+    crawl = parser.add_argument_group("crawl")
+    crawl.add_argument("--max-concurrency", type=int, default=None)
+    crawl.add_argument("--max-per-host", type=int, default=None)
+    crawl.add_argument(
+        "--format", choices=["single_file", "zip_files", "zip_flat"], default="zip_files"
+    )
+    crawl.add_argument(
+        "--executor",
+        choices=["process", "thread", "inline"],
+        default=os.getenv("SCRAPER_CONVERSION_EXECUTOR", "process"),
+        help="Exécuteur de la conversion HTML -> Markdown",
+    )
+    crawl.add_argument(
+        "--rate-limit",
+        action="store_true",
+        help="Garder la limitation de débit par hôte (désactivée par défaut)",
+    )
+    crawl.add_argument("--repeat", type=int, default=1, help="Nombre d'exécutions")
+
+    parser.add_argument("--output", help="Fichier JSON des résultats")
+    parser.add_argument("--compare", help="Fichier JSON d'une exécution de référence")
+    return parser.parse_args(argv)
+
+
+def configure_environment(args: argparse.Namespace, directory: str) -> None:
+    """
+    Configure le service avant son import : stockage temporaire, exécuteur, débit.
+
+    Les caches et les tâches sont isolés dans ``directory`` : chaque exécution
+    télécharge toutes les pages.
+    """
+    os.environ["SCRAPER_TASK_STORE_DIR"] = os.path.join(directory, "tasks")
+    os.environ["SCRAPER_HTTP_CACHE_DIR"] = os.path.join(directory, "http_cache")
+    os.environ["SCRAPER_CONVERSION_CACHE_DIR"] = os.path.join(directory, "conversion_cache")
+    os.environ["SCRAPER_CONVERSION_EXECUTOR"] = args.executor
+    os.environ["SCRAPER_RATE_LIMIT_ENABLED"] = "true" if args.rate_limit else "false"
+
+
+async def run_benchmark(base_url: str, args: argparse.Namespace) -> list[dict]:
+    """Exécute les crawls demandés les uns après les autres."""
+    runs = []
+    for index in range(args.repeat):
+        run = await run_crawl(base_url, args)
+        print(
+            f"Exécution {index + 1}/{args.repeat}: {run['processed_pages']} pages en "
+            f"{run['elapsed_seconds']}s ({run['pages_per_second']} pages/s), "
+            f"p95 {run['page_latency_ms']['p95']} ms, "
+            f"retard de boucle max {run['loop_lag_ms']['max']} ms"
+        )
+        runs.append(run)
+    return runs
+
+
+def main(argv: list[str] | None = None) -> dict:
+    """Lance le banc d'essai, enregistre et affiche ses résultats."""
+    args = parse_args(argv)
+    options = SiteOptions(
+        pages=args.pages,
+        page_size=args.page_size,
+        fanout=args.fanout,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        missing_rate=args.missing_rate,
+        seed=args.seed,
+    )
+    with tempfile.TemporaryDirectory() as directory, SyntheticSite(options) as site:
+        configure_environment(args, directory)
+        from app.services.html_converter import (
+            get_conversion_executor,
+            set_conversion_executor,
+        )
+        from app.services.task_store import close_task_store
+
+        runs = asyncio.run(run_benchmark(site.base_url, args))
+        executor = get_conversion_executor()
+        if executor is not None:
+            executor.shutdown(wait=True)
+            set_conversion_executor(None)
+        close_task_store()
+        # Processus de conversion attendus : leur pic de mémoire est connu
+        children_rss = peak_rss_bytes(resource.RUSAGE_CHILDREN) if resource else None
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "git_commit": get_git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "site": options._asdict(),
+        "crawl": {
+            "max_concurrency": args.max_concurrency,
+            "max_per_host": args.max_per_host,
+            "format": args.format,
+            "executor": args.executor,
+            "rate_limit": args.rate_limit,
+        },
+        "runs": runs,
+        "summary": {**summarize(runs), "children_peak_rss_bytes": children_rss},
+    }
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+        print(f"Résultats enregistrés dans {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            print_comparison(json.load(baseline_file), report)
+    return report
+
+
+if __name__ == "__main__":
+    main()
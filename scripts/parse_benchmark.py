@@ -0,0 +1,97 @@
+"""
+Banc d'essai de l'analyse HTML : durée de localisation du contenu par backend.
+
+Chaque backend disponible (``lxml``, ``html.parser``) analyse la même grande page
+du site synthétique, avec et sans analyse partielle ; le gabarit (menu et styles
+placés avant le contenu) grossit la part de la page que l'analyse partielle évite :
+
+    python -m scripts.parse_benchmark --page-size 200000 --template-size 150000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+
+from app.services.html_converter import PARSER_BACKENDS
+from scripts.benchmark import SiteOptions, build_page
+
+
+def build_large_page(page_size: int, template_size: int, seed: int) -> str:
+    """Retourne une page synthétique précédée de ``template_size`` octets de gabarit."""
+    page = build_page(1, SiteOptions(page_size=page_size, seed=seed))
+    item = '<li><a href="/docs/p{0}" class="menu-item">Menu {0}</a></li>'
+    menu = "".join(item.format(index) for index in range(template_size // 2 // 60))
+    styles = "".join(
+        f".menu-{index} {{ margin: 0 }}" for index in range(template_size // 2 // 24)
+    )
+    page = page.replace("</head>", f"<style>{styles}</style></head>", 1)
+    return page.replace("<nav><ul>", f"<nav><ul>{menu}", 1)
+
+
+def measure(parse, html_content: str, partial: bool, repeat: int) -> dict[str, float]:
+    """Retourne la médiane et le minimum, en millisecondes, de ``repeat`` analyses."""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse(html_content, partial=partial)
+        durations.append((time.perf_counter() - started) * 1000)
+    return {
+        "median_ms": round(statistics.median(durations), 3),
+        "min_ms": round(min(durations), 3),
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Lit les paramètres du banc d'essai."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--page-size", type=int, default=200_000, help="Taille du texte de la page"
+    )
+    parser.add_argument(
+        "--template-size",
+        type=int,
+        default=150_000,
+        help="Taille du gabarit placé avant le contenu",
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="Analyses par mesure")
+    parser.add_argument("--seed", type=int, default=42, help="Graine de la page générée")
+    parser.add_argument("--output", help="Fichier JSON des résultats")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> dict:
+    """Mesure chaque backend, avec et sans analyse partielle, et affiche le gain."""
+    args = parse_args(argv)
+    html_content = build_large_page(args.page_size, args.template_size, args.seed)
+    print(f"Page de {len(html_content)} caractères, {args.repeat} analyses par mesure")
+
+    results = {}
+    for name, parse in PARSER_BACKENDS.items():
+        full = measure(parse, html_content, False, args.repeat)
+        partial = measure(parse, html_content, True, args.repeat)
+        speedup = full["median_ms"] / partial["median_ms"] if partial["median_ms"] else 0.0
+        results[name] = {"full": full, "partial": partial, "speedup": round(speedup, 2)}
+        print(
+            f"{name:<12} complète {full['median_ms']:>9.2f} ms   "
+            f"partielle {partial['median_ms']:>9.2f} ms   x{speedup:.2f}"
+        )
+
+    report = {
+        "page_characters": len(html_content),
+        "page_size": args.page_size,
+        "template_size": args.template_size,
+        "repeat": args.repeat,
+        "backends": results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+        print(f"Résultats enregistrés dans {args.output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
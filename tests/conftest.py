@@ -0,0 +1,13 @@
+import pytest
+
+from app.services import task_store
+
+
+@pytest.fixture(autouse=True)
+def isolated_task_store(tmp_path_factory, monkeypatch):
+    # Store partagé créé dans un dossier temporaire plutôt que dans output/
+    directory = tmp_path_factory.mktemp("tasks")
+    store = task_store.TaskStore(str(directory), ttl=60, memory_budget=1 << 20)
+    monkeypatch.setattr(task_store, "_task_store", store)
+    yield store
+    store.close()
@@ -0,0 +1,44 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from app.api.api import stream_content_response
+from app.main import app
+from app.schemas.scraper_schemas import ContentResponse
+
+PAGES = {
+    "https://docs.example/a": '# A\n\n"guillemets" \\ été',
+    "https://docs.example/b": "# B",
+}
+
+
+def test_stream_content_response_is_valid_json():
+    response = ContentResponse(
+        task_id="t1", url="https://docs.example", content="", timestamp="now"
+    )
+
+    body = b"".join(stream_content_response(response, iter(PAGES.values())))
+
+    expected = response.model_copy(update={"content": "\n\n".join(PAGES.values())})
+    assert json.loads(body) == expected.model_dump(mode="json")
+
+
+def test_result_endpoint(isolated_task_store):
+    store = isolated_task_store
+    client = TestClient(app)
+    store.create("t1", {"status": "pending", "url": "https://docs.example"})
+    assert client.get("/api/result/t1").status_code == 400
+    assert client.get("/api/result/missing").status_code == 404
+
+    assert store.claim("w1") == "t1"
+    for url, markdown in PAGES.items():
+        store.append_page("t1", url, markdown)
+    asyncio.run(store.set_result("t1", dict(PAGES), None, 0, "completed"))
+    response = client.get("/api/result/t1")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    result = response.json()
+    assert result["content"] == "\n\n".join(PAGES.values())
+    assert result["task_id"] == "t1" and result["format"] == "single_file"
@@ -0,0 +1,79 @@
+import asyncio
+
+from app.services.crawl_checkpoint import JOURNAL_FILE, CrawlCheckpoint, load_checkpoint
+from app.services.scraper_service import open_checkpoint
+from app.services.shared_crawl import SharedCrawl
+from app.services.url_frontier import UrlFrontier
+
+START = "https://docs.example/guide"
+
+
+def interrupted_crawl(directory):
+    """Crawl arrêté en cours de route : une page terminée, une enregistrée, une en file."""
+
+    async def scenario():
+        checkpoint = CrawlCheckpoint(directory)
+        frontier = UrlFrontier()
+        frontier.journal = checkpoint.record
+        frontier.add(START)
+        assert await frontier.get() == START
+        frontier.add(START + "/a", 1)
+        frontier.add(START + "/b", 1)
+        frontier.mark_seen(START + "/canonical")
+        checkpoint.add_page(START, "# Start")
+        frontier.task_done(START)
+
+        assert await frontier.get() == START + "/a"
+        # Page enregistrée, mais interruption avant qu'elle soit marquée terminée
+        checkpoint.add_page(START + "/a", "# A")
+        checkpoint.flush({"downloaded_bytes": 42})
+        checkpoint.journal.write(b'["add", "https://docs.ex')
+        checkpoint.journal.close()
+        checkpoint.pages.close()
+
+    asyncio.run(scenario())
+
+
+def test_load_checkpoint_reads_complete_records(tmp_path):
+    interrupted_crawl(str(tmp_path))
+
+    state = load_checkpoint(str(tmp_path))
+
+    assert state.queued == {START: 0, START + "/a": 1, START + "/b": 1}
+    assert state.aliases == {START + "/canonical"}
+    assert state.done == {START}
+    assert [page["url"] for page in state.pages] == [START, START + "/a"]
+    assert state.stats["downloaded_bytes"] == 42
+    assert state.journal_size < (tmp_path / JOURNAL_FILE).stat().st_size
+
+
+def test_resume_restores_frontier(tmp_path):
+    interrupted_crawl(str(tmp_path))
+
+    async def scenario():
+        crawl = SharedCrawl("key", START)
+        frontier = UrlFrontier()
+        checkpoint = await open_checkpoint(crawl, frontier, str(tmp_path))
+
+        # Seule l'URL jamais traitée est remise en file
+        assert frontier.queued == 1
+        assert await frontier.get() == START + "/b"
+        assert frontier.depth(START + "/b") == 1
+        assert frontier.done == 2
+        assert frontier.discovered == 3
+        for url in (START, START + "/a", START + "/b", START + "/canonical"):
+            assert not frontier.add(url)
+        assert crawl.stats["downloaded_bytes"] == 42
+
+        # Le journal repris est complété après sa dernière ligne complète
+        frontier.add(START + "/c", 2)
+        checkpoint.close(crawl.stats)
+
+    asyncio.run(scenario())
+    state = load_checkpoint(str(tmp_path))
+    assert state.queued[START + "/c"] == 2
+    assert len(state.pages) == 2
+
+
+def test_no_checkpoint(tmp_path):
+    assert load_checkpoint(str(tmp_path)) is None
@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+from app.services import rate_limiter
+from app.services.crawl_scheduler import FairShare, run_crawl_pool
+from app.services.rate_limiter import HostRateLimiter, RateLimiter
+from app.services.url_frontier import UrlFrontier
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        fair_share = FairShare(1)
+        await fair_share.acquire("a.example")
+        waiter = asyncio.create_task(fair_share.acquire("b.example"))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+        assert not fair_share._waiters
+        fair_share.release()
+        assert fair_share.active == 0
+        # Plus d'attente fantôme : l'emplacement libre est accordé aussitôt
+        await asyncio.wait_for(fair_share.acquire("c.example"), 1)
+        assert fair_share.active == 1
+
+    asyncio.run(scenario())
+
+
+def test_slot_granted_before_cancellation_goes_to_next_waiter():
+    async def scenario():
+        fair_share = FairShare(1)
+        await fair_share.acquire("a.example")
+        granted = asyncio.create_task(fair_share.acquire("b.example"))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(fair_share.acquire("c.example"))
+        await asyncio.sleep(0)
+
+        fair_share.release()
+        granted.cancel()
+        await asyncio.gather(granted, return_exceptions=True)
+
+        await asyncio.wait_for(waiting, 1)
+        assert fair_share.active == 1
+        assert not fair_share._waiters
+
+    asyncio.run(scenario())
+
+
+def test_released_slots_alternate_between_hosts():
+    async def scenario():
+        fair_share = FairShare(1)
+        await fair_share.acquire("big.example")
+        order = []
+
+        async def download(host):
+            await fair_share.acquire(host)
+            order.append(host)
+            fair_share.release()
+
+        tasks = [asyncio.create_task(download("big.example")) for _ in range(3)]
+        tasks.append(asyncio.create_task(download("small.example")))
+        await asyncio.sleep(0)
+        fair_share.release()
+        await asyncio.gather(*tasks)
+
+        assert order.index("small.example") == 1
+
+    asyncio.run(scenario())
+
+
+def test_throttled_host_does_not_hold_batch_slots(monkeypatch):
+    limiters = RateLimiter(enabled=True)
+    # Crawl-delay de 0,5 s pour l'un, débit libre pour l'autre
+    limiters.hosts["slow.example"] = HostRateLimiter(rate=2, min_rate=2, max_rate=2)
+    limiters.hosts["fast.example"] = HostRateLimiter(rate=1000, max_rate=1000)
+    monkeypatch.setattr(rate_limiter, "_rate_limiter", limiters)
+
+    async def scenario():
+        fair_share = FairShare(1)
+        started = time.monotonic()
+        finished = {}
+
+        async def download(url):
+            await asyncio.sleep(0.01)
+            return []
+
+        async def crawl(host, count):
+            frontier = UrlFrontier()
+            for index in range(count):
+                frontier.add(f"https://{host}/{index}")
+            await run_crawl_pool(frontier, download, 2, 2, fair_share=fair_share)
+            finished[host] = time.monotonic() - started
+
+        await asyncio.gather(crawl("slow.example", 3), crawl("fast.example", 20))
+        return finished
+
+    finished = asyncio.run(scenario())
+
+    assert finished["slow.example"] >= 0.9
+    # Le petit site rapide n'attend pas les pauses de l'hôte ralenti
+    assert finished["fast.example"] < 0.5
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.scraper_schemas import ExtractionRules
+from app.services import extraction_profiles, html_converter
+from app.services.extraction_profiles import (
+    BUILTIN_PROFILES,
+    DEFAULT_PROFILE,
+    build_profile,
+    get_extraction_profile,
+    load_profiles,
+)
+
+
+def test_profile_lookup_exact_then_pattern_then_default():
+    assert get_extraction_profile("docs.python.org").name == "docs.python.org"
+    assert get_extraction_profile("Docs.Python.org").name == "docs.python.org"
+    assert get_extraction_profile("pip.readthedocs.io").name == "readthedocs"
+    assert get_extraction_profile("docs.example") is DEFAULT_PROFILE
+
+
+def test_profiles_file_overrides_builtin_profiles(tmp_path, monkeypatch):
+    path = tmp_path / "profiles.json"
+    path.write_text(
+        json.dumps(
+            {
+                "docs.python.org": {"keep": ["div.document"]},
+                "*.example": {"keep": ["article"], "strip": ["aside"]},
+            }
+        )
+    )
+    profiles = load_profiles(str(path))
+    monkeypatch.setattr(extraction_profiles, "_profiles", profiles)
+
+    python_docs = get_extraction_profile("docs.python.org")
+    assert python_docs.keep == ("div.document",)
+    # Liste absente : celle du profil par défaut
+    assert python_docs.strip == DEFAULT_PROFILE.strip
+    assert get_extraction_profile("docs.example") == build_profile(
+        ["article"], ["aside"], "*.example"
+    )
+    assert get_extraction_profile("developer.mozilla.org").name == "developer.mozilla.org"
+
+
+def test_unreadable_profiles_file_keeps_builtin_profiles(tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text("{invalide")
+    assert load_profiles(str(path)) == BUILTIN_PROFILES
+    assert load_profiles(str(tmp_path / "absent.json")) == BUILTIN_PROFILES
+
+
+def test_selectors_are_validated_by_the_configured_backend(monkeypatch):
+    # Accepté par soupsieve, refusé par cssselect
+    selector = "div:nth-child(2 of .a)"
+    assert ExtractionRules(keep=["main article"], strip=["a.headerlink"])
+
+    if "lxml" in html_converter.PARSER_BACKENDS:
+        monkeypatch.setattr(
+            html_converter, "get_parser_backend", lambda: html_converter.parse_with_lxml
+        )
+        with pytest.raises(ValidationError, match="nth-child"):
+            ExtractionRules(keep=[selector])
+
+    monkeypatch.setattr(
+        html_converter, "get_parser_backend", lambda: html_converter.parse_with_soup
+    )
+    assert ExtractionRules(keep=[selector]).keep == [selector]
+    with pytest.raises(ValidationError):
+        ExtractionRules(strip=["div::text("])
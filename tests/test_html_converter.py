@@ -0,0 +1,133 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from app.services import html_converter
+from app.services.extraction_profiles import DEFAULT_PROFILE, ExtractionProfile
+from app.services.html_converter import PARSER_BACKENDS, find_region_start
+from scripts.parse_benchmark import build_large_page
+
+BACKENDS = list(PARSER_BACKENDS)
+
+# Marqueurs de la région dans un script, un commentaire et le texte du menu
+DECOYS = (
+    "<script>var tag = '<main id=\"article-contents\">';</script>"
+    '<!-- <main id="article-contents"> -->'
+    "<p>article-contents</p>"
+)
+
+
+@pytest.fixture(scope="module")
+def large_page():
+    page = build_large_page(page_size=50_000, template_size=50_000, seed=7)
+    return page.replace("<nav>", DECOYS + "<nav>", 1)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_partial_parse_matches_full_parse(backend, large_page):
+    parse = PARSER_BACKENDS[backend]
+    full = parse(large_page, DEFAULT_PROFILE, partial=False)
+    partial = parse(large_page, DEFAULT_PROFILE, partial=True)
+
+    assert partial == full
+    assert full.html.startswith('<main id="article-contents">')
+    # Liens de la région seulement, pas ceux du menu
+    assert full.hrefs and not any("menu" in href for href in full.hrefs)
+
+
+def test_region_start_ignores_scripts_and_comments(large_page):
+    start = find_region_start(large_page, "main", {"id": "article-contents"}, "article")
+    assert large_page.startswith('<main id="article-contents">', start)
+    assert find_region_start(DECOYS, "main", {"id": "article-contents"}, "article") is None
+
+
+def test_region_start_matches_class_among_others():
+    html = '<div class=\'x\'>a</div><div data-x="1" class="wide markdown-body">b</div>'
+    assert find_region_start(html, "div", {"class": "markdown-body"}, "markdown-body") == 22
+    assert (
+        find_region_start(html, "section", {"class": "markdown-body"}, "markdown") is None
+    )
+
+
+@pytest.mark.skipif("lxml" not in PARSER_BACKENDS, reason="lxml non installé")
+def test_lxml_partial_parse_skips_the_template(large_page, monkeypatch):
+    parsed = []
+    parse_document = html_converter.parse_lxml_document
+
+    def record(html_content):
+        parsed.append(len(html_content))
+        return parse_document(html_content)
+
+    monkeypatch.setattr(html_converter, "parse_lxml_document", record)
+    html_converter.parse_with_lxml(large_page, DEFAULT_PROFILE, partial=True)
+
+    # Seule la fin de la page, à partir de la région, est analysée
+    assert len(parsed) == 1
+    assert parsed[0] < len(large_page) - 50_000
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_misnested_region_falls_back_to_full_parse(backend):
+    # <td> hors tableau : l'analyse partielle ne retrouve pas l'élément attendu
+    profile = ExtractionProfile(keep=("td.content",))
+    html = (
+        "<html><body><table><tr><td class='content'><h1>Titre</h1>"
+        "<a href='/a'>a</a></td></tr></table></body></html>"
+    )
+    parse = PARSER_BACKENDS[backend]
+    assert parse(html, profile, partial=True) == parse(html, profile, partial=False)
+
+
+DOC_PAGE = (
+    "<html><body><nav><a href='/menu'>Menu</a></nav>"
+    "<div class='sidebar'><p>Court</p></div>"
+    "<div class='layout'><div class='text'><h1>Titre</h1>"
+    "<p>Un long paragraphe de documentation qui porte l'essentiel du texte.</p>"
+    "<p>Un second paragraphe, lui aussi assez long pour compter.</p>"
+    "<a class='headerlink' href='#titre'>¶</a><script>track()</script>"
+    "<a href='/guide/suite'>suite</a></div></div></body></html>"
+)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_strip_selectors_remove_elements_from_region(backend):
+    profile = ExtractionProfile(keep=("div.text",), strip=("a.headerlink", "script"))
+    region = PARSER_BACKENDS[backend](DOC_PAGE, profile, partial=False)
+
+    assert "Titre" in region.html
+    assert "headerlink" not in region.html and "track()" not in region.html
+    # Les liens sont relevés avant le retrait des éléments
+    assert region.hrefs == ["#titre", "/guide/suite"]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_densest_block_without_profile_region(backend):
+    profile = ExtractionProfile(keep=("main#absent",))
+    region = PARSER_BACKENDS[backend](DOC_PAGE, profile, partial=False)
+
+    # Plus petit bloc qui contient l'essentiel du texte ; liens de toute la page
+    assert region.html.startswith('<div class="text">')
+    assert "Court" not in region.html
+    assert region.hrefs == ["/menu", "#titre", "/guide/suite"]
+
+
+def test_densest_block_ignores_link_lists():
+    menu = "".join(
+        f"<li><a href='/p{index}'>Page numéro {index}</a></li>" for index in range(50)
+    )
+    article = f"<article><p>{'texte ' * 30}</p></article>"
+    page = f"<html><body><ul class='menu'>{menu}</ul>{article}</body></html>"
+    soup_block = html_converter.find_soup_densest_block(BeautifulSoup(page, "html.parser"))
+    assert soup_block.name == "p"
+    if "lxml" in PARSER_BACKENDS:
+        document = html_converter.parse_lxml_document(page)
+        assert html_converter.find_lxml_densest_block(document).tag == "p"
+
+
+@pytest.mark.skipif("lxml" not in PARSER_BACKENDS, reason="lxml non installé")
+def test_selector_rejected_by_cssselect_is_logged(caplog):
+    html_converter.compile_selector.cache_clear()
+    profile = ExtractionProfile(keep=("div:nth-child(2 of .a)", "div.text"))
+    region = html_converter.parse_with_lxml(DOC_PAGE, profile, partial=False)
+
+    assert region.html.startswith('<div class="text">')
+    assert "nth-child(2 of .a)" in caplog.text
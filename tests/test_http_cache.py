@@ -0,0 +1,95 @@
+import asyncio
+import os
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.services.http_cache import HttpCache, conditional_headers
+from app.services.scraper_service import fetch_page
+
+URL = "https://docs.example/guide"
+
+
+def test_put_and_get(tmp_path):
+    cache = HttpCache(str(tmp_path), 1 << 20)
+    assert cache.get(URL) is None
+
+    cache.put(URL, "<h1>v1</h1>", '"v1"', "Mon, 01 Jan 2024 00:00:00 GMT")
+    cached = cache.get(URL + "/#top")
+    assert cached.body == "<h1>v1</h1>"
+    assert conditional_headers(cached) == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+
+    cache.put(URL, "<h1>v2</h1>", '"v2"', None)
+    assert cache.get(URL) == ("<h1>v2</h1>", '"v2"', None)
+    # Fichiers remplacés par renommage : aucun fichier temporaire ne reste
+    assert sorted(os.path.splitext(name)[1] for name in os.listdir(tmp_path)) == [
+        ".body",
+        ".json",
+    ]
+
+
+def test_body_from_another_write_is_ignored(tmp_path):
+    cache = HttpCache(str(tmp_path), 1 << 20)
+    cache.put(URL, "<h1>v1</h1>", '"v1"', None)
+    _, body_path = cache._paths(URL)
+    # Contenu d'une autre version, ou tronqué : ne doit pas être servi sous "v1"
+    with open(body_path, "w", encoding="utf-8") as body_file:
+        body_file.write("<h1>v")
+
+    assert cache.get(URL) is None
+
+
+def test_eviction_measures_the_shared_directory(tmp_path):
+    body = "x" * 1000
+    first = HttpCache(str(tmp_path), 10_000)
+    second = HttpCache(str(tmp_path), 10_000)
+    for index in range(8):
+        first.put(f"{URL}/first/{index}", body, '"v"', None)
+    for index in range(8):
+        second.put(f"{URL}/second/{index}", body, '"v"', None)
+
+    size = sum(entry.stat().st_size for entry in os.scandir(tmp_path))
+    assert size <= 10_000
+    # Les entrées les plus récentes sont gardées
+    assert second.get(f"{URL}/second/7") is not None
+
+
+def test_fetch_page_revalidates_cached_entry(tmp_path):
+    versions = {"etag": '"v1"', "body": "<h1>v1</h1>"}
+    requests = []
+
+    async def handler(request):
+        requests.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == versions["etag"]:
+            return web.Response(status=304)
+        return web.Response(
+            text=versions["body"],
+            content_type="text/html",
+            headers={"ETag": versions["etag"]},
+        )
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/page", handler)
+        cache = HttpCache(str(tmp_path), 1 << 20)
+        stats = {"cache_hits": 0, "cache_misses": 0, "downloaded_bytes": 0}
+        async with TestServer(app) as server, aiohttp.ClientSession() as session:
+            url = str(server.make_url("/page"))
+            bodies = [await fetch_page(url, session, stats, cache)]
+            bodies.append(await fetch_page(url, session, stats, cache))
+            versions.update(etag='"v2"', body="<h1>v2</h1>")
+            bodies.append(await fetch_page(url, session, stats, cache))
+            bodies.append(await fetch_page(url, session, stats, cache))
+        return bodies, stats
+
+    bodies, stats = asyncio.run(scenario())
+
+    assert bodies == ["<h1>v1</h1>", "<h1>v1</h1>", "<h1>v2</h1>", "<h1>v2</h1>"]
+    assert requests == [None, '"v1"', '"v1"', '"v2"']
+    assert stats["cache_hits"] == 2
+    assert stats["cache_misses"] == 2
+    assert stats["downloaded_bytes"] == 2 * len("<h1>v1</h1>")
@@ -0,0 +1,34 @@
+import asyncio
+import time
+
+from app.services.job_runner import JobRunner
+from app.services.task_store import TaskStore
+
+
+def test_tick_claims_relays_cancels_and_purges(tmp_path, monkeypatch):
+    store = TaskStore(str(tmp_path), ttl=60, memory_budget=1 << 20)
+    started, cancelled = [], []
+    runner = JobRunner(store, started.append, cancelled.append, max_tasks=1)
+    store.create("t1", {"status": "pending"})
+    store.create("t2", {"status": "pending"})
+    store.create("old", {"status": "completed"})
+    store.append_page("old", "https://a.example/", "# A")
+
+    asyncio.run(runner.tick())
+    assert started == ["t1"]
+
+    # Annulation demandée par un autre processus, transmise au tick suivant
+    store.request_cancel("t1")
+    asyncio.run(runner.tick())
+    assert cancelled == ["t1"]
+    assert started == ["t1"]
+
+    # Tâche terminée expirée : supprimée même sans nouvelle tâche créée
+    now = time.time() + 120
+    monkeypatch.setattr(time, "time", lambda: now)
+    runner._last_requeue = float("-inf")
+    asyncio.run(runner.tick())
+    assert not (tmp_path / "old").exists()
+    assert store.get("old") is None
+    assert store.get("t2")["status"] == "pending"
+    store.close()
@@ -0,0 +1,118 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from urllib.robotparser import RobotFileParser
+
+from app.services.rate_limiter import HostRateLimiter, RateLimiter, parse_retry_after
+
+
+def make_robots(*lines):
+    robots = RobotFileParser()
+    robots.parse(["User-agent: *", *lines])
+    return robots
+
+
+def test_rate_increases_additively_and_decreases_multiplicatively():
+    limiter = HostRateLimiter(
+        rate=10, min_rate=1, max_rate=12, increase=1, decrease_factor=0.5
+    )
+    limiter.on_success()
+    assert limiter.rate == 11
+    for _ in range(5):
+        limiter.on_success()
+    assert limiter.rate == 12
+
+    limiter.on_throttle()
+    assert limiter.rate == 6 and limiter.throttled == 1
+    for _ in range(5):
+        limiter.on_throttle()
+    assert limiter.rate == 1
+
+
+def test_retry_after_pauses_the_host():
+    async def scenario():
+        limiter = HostRateLimiter(rate=1000, max_rate=1000)
+        await limiter.acquire()
+        limiter.on_throttle(retry_after=0.2)
+        assert limiter.snapshot()["paused_for"] > 0.1
+        started = time.monotonic()
+        await limiter.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) >= 0.19
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("12") == 12
+    assert parse_retry_after("100000") == 300
+    assert parse_retry_after("bientôt") is None
+    assert parse_retry_after(None) is None
+    in_a_minute = datetime.now(timezone.utc) + timedelta(seconds=60)
+    assert 55 < parse_retry_after(format_datetime(in_a_minute, usegmt=True)) <= 60
+    past = datetime.now(timezone.utc) - timedelta(seconds=60)
+    assert parse_retry_after(format_datetime(past, usegmt=True)) == 0
+
+
+def test_robots_delays_cap_the_rate():
+    limiter = HostRateLimiter(rate=20, min_rate=0.2, max_rate=100)
+    limiter.apply_robots(make_robots("Crawl-delay: 2"))
+    assert limiter.max_rate == 0.5 and limiter.rate == 0.5
+
+    # Le plus long des deux délais l'emporte
+    limiter.apply_robots(make_robots("Crawl-delay: 1", "Request-rate: 1/4"))
+    assert limiter.max_rate == 0.25
+
+    # Délai très long : le débit minimal suit le plafond
+    limiter.apply_robots(make_robots("Crawl-delay: 10"))
+    assert limiter.max_rate == limiter.min_rate == 0.1
+
+
+def test_robots_relaxed_on_reread_restores_configured_bounds():
+    limiter = HostRateLimiter(rate=20, min_rate=0.2, max_rate=100)
+    limiter.apply_robots(make_robots("Crawl-delay: 10"))
+    limiter.apply_robots(make_robots("Allow: /"))
+    assert (limiter.min_rate, limiter.max_rate) == (0.2, 100)
+    limiter.on_success()
+    assert limiter.rate == 1.1
+
+
+def test_robots_are_reread_after_their_ttl():
+    reads = []
+
+    async def read_robots():
+        reads.append(len(reads))
+        await asyncio.sleep(0.01)
+        return make_robots(f"Crawl-delay: {len(reads)}")
+
+    async def scenario(limiter):
+        # Lectures concurrentes : une seule requête vers le robots.txt
+        await asyncio.gather(*(limiter.refresh_robots(read_robots) for _ in range(5)))
+        await limiter.refresh_robots(read_robots)
+        assert reads == [0] and limiter.max_rate == 1
+        await asyncio.sleep(0.06)
+        await limiter.refresh_robots(read_robots)
+
+    limiter = HostRateLimiter(robots_ttl=0.05)
+    assert limiter.robots_expired()
+    asyncio.run(scenario(limiter))
+    assert reads == [0, 1] and limiter.max_rate == 0.5
+
+
+def test_idle_hosts_are_evicted(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    limiters = RateLimiter(enabled=True, idle_seconds=60)
+    busy = limiters.for_host("busy.example")
+    limiters.for_host("idle.example")
+    limiters.for_host("paused.example").on_throttle(retry_after=300)
+
+    now[0] += 45
+    assert limiters.for_host("busy.example") is busy
+    now[0] += 30
+    limiters.for_host("busy.example")
+
+    assert sorted(limiters.hosts) == ["busy.example", "paused.example"]
+    # Hôte oublié : nouveau limiteur, robots.txt à relire
+    assert limiters.for_host("idle.example").robots_expired()
+    assert RateLimiter(enabled=False).for_host("busy.example") is None
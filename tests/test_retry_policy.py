@@ -0,0 +1,90 @@
+import asyncio
+import random
+
+import aiohttp
+import pytest
+
+from app.services.crawl_scheduler import handle_error
+from app.services.retry_policy import FetchError, RetryPolicy
+from app.services.url_frontier import UrlFrontier
+
+URL = "https://docs.example/guide"
+
+
+@pytest.mark.parametrize("status", [408, 425, 429, 500, 502, 503, 504])
+def test_transient_statuses_are_retryable(status):
+    error = FetchError.from_status(status, retry_after=3)
+    assert error.retryable
+    assert (error.status, error.reason, error.retry_after) == (status, f"HTTP {status}", 3)
+
+
+@pytest.mark.parametrize("status", [400, 401, 403, 404, 410, 501])
+def test_client_errors_are_not_retryable(status):
+    assert not FetchError.from_status(status).retryable
+
+
+def test_exceptions_are_classified():
+    assert FetchError.from_exception(asyncio.TimeoutError()).retryable
+    assert FetchError.from_exception(aiohttp.ClientConnectionError("reset")).retryable
+    assert not FetchError.from_exception(ValueError("page illisible")).retryable
+    error = FetchError.from_status(503)
+    assert FetchError.from_exception(error) is error
+
+
+def test_full_jitter_stays_within_exponential_ceiling():
+    policy = RetryPolicy(base_delay=0.5, max_delay=4, rng=random.Random(42))
+    error = FetchError.from_status(503)
+    for attempts, ceiling in [(1, 0.5), (2, 1), (3, 2), (4, 4), (8, 4)]:
+        delays = [policy.get_delay(error, attempts) for _ in range(500)]
+        assert all(0 <= delay <= ceiling for delay in delays)
+        # Gigue complète : tout l'intervalle est couvert
+        assert min(delays) < ceiling * 0.1 and max(delays) > ceiling * 0.9
+
+
+def test_same_seed_gives_same_delays():
+    error = FetchError.from_status(500)
+    first = RetryPolicy(rng=random.Random(7))
+    second = RetryPolicy(rng=random.Random(7))
+    assert [first.get_delay(error, 3) for _ in range(5)] == [
+        second.get_delay(error, 3) for _ in range(5)
+    ]
+
+
+def test_retry_after_is_a_floor():
+    policy = RetryPolicy(base_delay=0.5, max_delay=4, rng=random.Random(1))
+    error = FetchError.from_status(429, retry_after=10)
+    assert all(policy.get_delay(error, 1) == 10 for _ in range(50))
+    # Plancher seulement : un délai tiré plus long est gardé
+    short = FetchError.from_status(429, retry_after=0.01)
+    assert max(policy.get_delay(short, 4) for _ in range(50)) > 0.01
+
+
+def test_max_attempts_cutoff_through_handle_error():
+    policy = RetryPolicy(max_attempts=3, base_delay=0.5, max_delay=4, rng=random.Random(3))
+    frontier = UrlFrontier()
+    failures = []
+
+    def on_failure(url, error, attempts):
+        failures.append((url, error.reason, attempts))
+
+    error = FetchError.from_status(503)
+    delays = [handle_error(frontier, URL, error, policy, on_failure) for _ in range(3)]
+
+    assert delays[0] is not None and 0 <= delays[0] <= 0.5
+    assert delays[1] is not None and 0 <= delays[1] <= 1
+    assert delays[2] is None
+    assert failures == [(URL, "HTTP 503", 3)]
+
+
+def test_permanent_error_fails_at_first_attempt():
+    frontier = UrlFrontier()
+    failures = []
+    delay = handle_error(
+        frontier,
+        URL,
+        FetchError.from_status(404),
+        RetryPolicy(rng=random.Random(0)),
+        lambda url, error, attempts: failures.append((error.status, attempts)),
+    )
+    assert delay is None
+    assert failures == [(404, 1)]
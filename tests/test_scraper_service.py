@@ -0,0 +1,30 @@
+import asyncio
+
+from app.services.export_service import markdown_size
+from app.services.scraper_service import iter_markdown_content
+
+PAGES = {"https://docs.example/a": "# A\n\nÉté", "https://docs.example/b": "# B"}
+
+
+def test_markdown_download_streams_the_page_log(isolated_task_store):
+    store = isolated_task_store
+    store.create("t1", {"status": "pending"})
+    assert iter_markdown_content("t1") is None
+    assert store.claim("w1") == "t1"
+    for url, markdown in PAGES.items():
+        store.append_page("t1", url, markdown)
+    store["t1"]["markdown_size"] = markdown_size(PAGES.values())
+    asyncio.run(store.set_result("t1", dict(PAGES), None, 0, "completed"))
+    # Résultats libérés de la mémoire : le flux relit le journal
+    store.flush()
+
+    content, size = iter_markdown_content("t1")
+
+    body = b"".join(content)
+    assert body == "\n\n".join(PAGES.values()).encode("utf-8")
+    assert size == len(body)
+    assert not store._payloads
+
+
+def test_markdown_download_of_unknown_task():
+    assert iter_markdown_content("missing") is None
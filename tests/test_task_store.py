@@ -0,0 +1,156 @@
+import asyncio
+import json
+import sqlite3
+import time
+
+import pytest
+
+from app.services.task_store import TaskStore
+
+
+@pytest.fixture
+def stores(tmp_path):
+    # Deux workers qui partagent le même dossier, comme deux processus
+    first = TaskStore(str(tmp_path), ttl=60, memory_budget=1 << 20)
+    second = TaskStore(str(tmp_path), ttl=60, memory_budget=1 << 20)
+    yield first, second
+    first.close()
+    second.close()
+
+
+def advance_clock(monkeypatch, seconds):
+    now = time.time() + seconds
+    monkeypatch.setattr(time, "time", lambda: now)
+
+
+def test_claim_heartbeat_requeue_cycle(stores, tmp_path, monkeypatch):
+    first, second = stores
+    first.create("t1", {"status": "pending", "crawl_key": "k"})
+
+    assert first.claim("w1") == "t1"
+    assert second.claim("w2") is None
+    assert first.is_owned("t1") and not second.is_owned("t1")
+
+    first.append_page("t1", "https://a.example/", "# A")
+    first["t1"]["progress"] = 1
+    asyncio.run(first.sync("w1"))
+    # Worker actif : rien à remettre en attente
+    assert second.requeue_stale(30) == 0
+    assert second.get("t1")["progress"] == 1
+
+    # Plus de signe de vie de w1 : la tâche repart chez w2
+    advance_clock(monkeypatch, 60)
+    assert second.requeue_stale(30) == 1
+    assert second.get("t1")["status"] == "pending"
+    assert second.claim("w2") == "t1"
+    # Journal vidé : les pages sont rejouées depuis le point de reprise
+    assert second.get_pages("t1", 0, 10) == ([], 0)
+
+    first.request_cancel("t1")
+    assert second.cancel_requests("w2") == ["t1"]
+
+    second.append_page("t1", "https://a.example/", "# A")
+    asyncio.run(
+        second.set_result("t1", {"https://a.example/": "# A"}, None, 3, "cancelled")
+    )
+    assert not second.is_owned("t1")
+    # Résultats relus depuis le disque par un autre processus
+    reader = TaskStore(str(tmp_path), ttl=60, memory_budget=1 << 20)
+    assert reader.get("t1")["status"] == "cancelled"
+    assert reader.get_result("t1")["url_to_markdown"] == {"https://a.example/": "# A"}
+    reader.close()
+
+
+def test_release_requeues_owned_tasks(stores):
+    first, second = stores
+    first.create("t1", {"status": "pending"})
+    assert first.claim("w1") == "t1"
+
+    first.release("w1")
+
+    assert first.owned_count() == 0
+    assert second.claim("w2") == "t1"
+
+
+def test_purge_expired_deletes_finished_tasks(stores, tmp_path, monkeypatch):
+    first, second = stores
+    first.create("done", {"status": "pending"})
+    first.create("waiting", {"status": "pending"})
+    assert first.claim("w1") == "done"
+    asyncio.run(
+        first.set_result("done", {"https://a.example/": "# A"}, None, 3, "completed")
+    )
+
+    advance_clock(monkeypatch, 120)
+    second.purge_expired()
+
+    assert not (tmp_path / "done").exists()
+    assert second.get("done") is None
+    assert second.get("waiting")["status"] == "pending"
+
+
+def test_sync_does_not_block_the_event_loop(stores, tmp_path):
+    first, second = stores
+    first.create("t1", {"status": "pending"})
+    assert first.claim("w1") == "t1"
+    first["t1"]["progress"] = 5
+
+    # Verrou d'écriture tenu par un autre processus pendant la synchronisation
+    other = sqlite3.connect(str(tmp_path / "tasks.sqlite3"))
+    other.execute("BEGIN IMMEDIATE")
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticking = asyncio.create_task(ticker())
+        syncing = asyncio.create_task(first.sync("w1"))
+        await asyncio.sleep(0.3)
+        assert not syncing.done()
+        other.rollback()
+        await syncing
+        ticking.cancel()
+        return ticks
+
+    # La boucle a continué de tourner pendant l'attente du verrou
+    assert asyncio.run(scenario()) >= 10
+    other.close()
+    assert second.get("t1")["progress"] == 5
+
+
+def test_unchanged_failures_are_not_rewritten(stores, tmp_path):
+    first, second = stores
+    first.create("t1", {"status": "pending"})
+    assert first.claim("w1") == "t1"
+    failures = first["t1"]["failures"] = [{"url": "https://a.example/x", "status": 404}]
+    asyncio.run(first.sync("w1"))
+    assert second.get("t1")["failures"] == failures
+
+    def failures_column():
+        with sqlite3.connect(str(tmp_path / "tasks.sqlite3")) as db:
+            (column,) = db.execute(
+                "SELECT failures FROM tasks WHERE task_id = 't1'"
+            ).fetchone()
+        return column
+
+    # Marqueur posé à la place de la liste : gardé tant que la liste ne change pas
+    with sqlite3.connect(str(tmp_path / "tasks.sqlite3")) as db:
+        db.execute("UPDATE tasks SET failures = '[\"marqueur\"]' WHERE task_id = 't1'")
+    first["t1"]["progress"] = 10
+    asyncio.run(first.sync("w1"))
+    assert failures_column() == '["marqueur"]'
+    assert second.get("t1")["progress"] == 10
+
+    failures.append({"url": "https://a.example/y", "status": 500})
+    asyncio.run(first.sync("w1"))
+    assert second.get("t1")["failures"] == failures
+    with sqlite3.connect(str(tmp_path / "tasks.sqlite3")) as db:
+        (metadata,) = db.execute(
+            "SELECT metadata FROM tasks WHERE task_id = 't1'"
+        ).fetchone()
+    assert "failures" not in json.loads(metadata)
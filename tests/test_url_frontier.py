@@ -0,0 +1,106 @@
+import asyncio
+
+from app.services.url_frontier import BloomFilter, UrlFrontier
+
+START = "https://docs.example/guide"
+
+
+def test_bloom_filter_has_no_false_negative():
+    bloom = BloomFilter(10_000, 0.01)
+    added = [f"{START}/{index}" for index in range(10_000)]
+    for url in added:
+        bloom.add(url)
+
+    assert all(url in bloom for url in added)
+    assert len(bloom) == 10_000
+    # Faux positifs bornés par le taux d'erreur (avec de la marge)
+    false_positives = sum(f"{START}/other/{index}" in bloom for index in range(10_000))
+    assert false_positives < 300
+
+
+def test_add_deduplicates_canonical_urls():
+    frontier = UrlFrontier()
+
+    assert frontier.add(START)
+    assert not frontier.add(START + "/")
+    assert not frontier.add(START + "#install")
+    assert frontier.mark_seen(START + "/canonical")
+    assert not frontier.add(START + "/canonical")
+
+    assert frontier.queued == 1
+    assert frontier.discovered == 1
+
+
+def test_discovered_url_is_fetched():
+    async def scenario():
+        frontier = UrlFrontier()
+        frontier.add(START + "/dir/index.html#install")
+        assert not frontier.add(START + "/dir/")
+        # La forme canonique (sans index.html) n'est que la clé de déduplication
+        assert await frontier.get() == START + "/dir/index.html"
+
+    asyncio.run(scenario())
+
+
+def test_counts_follow_the_crawl():
+    async def scenario():
+        frontier = UrlFrontier(use_bloom_filter=True)
+        frontier.add(START)
+        url = await frontier.get()
+        assert frontier.stats() == {
+            "queued_pages": 0,
+            "in_flight_pages": 1,
+            "processed_pages": 0,
+            "total_pages": 1,
+        }
+        # Un même lien trouvé sur plusieurs pages n'est compté qu'une fois
+        for _ in range(3):
+            frontier.add(START + "/a", 1)
+        frontier.task_done(url)
+        assert frontier.stats() == {
+            "queued_pages": 1,
+            "in_flight_pages": 0,
+            "processed_pages": 1,
+            "total_pages": 2,
+        }
+
+        assert await frontier.get() == START + "/a"
+        frontier.task_done(START + "/a")
+        assert await frontier.get() is None
+
+    asyncio.run(scenario())
+
+
+def test_max_depth_and_max_pages():
+    async def scenario():
+        frontier = UrlFrontier(max_pages=2, max_depth=1)
+        frontier.add(START)
+        assert not frontier.add(START + "/deep", 2)
+        frontier.add(START + "/a", 1)
+        frontier.add(START + "/b", 1)
+
+        for _ in range(2):
+            frontier.task_done(await frontier.get())
+        assert await frontier.get() is None
+        assert frontier.stop_reason == "max_pages"
+        assert frontier.queued == 1
+
+    asyncio.run(scenario())
+
+
+def test_retry_is_delayed_and_not_counted_twice():
+    async def scenario():
+        frontier = UrlFrontier(max_pages=1)
+        frontier.add(START)
+        url = await frontier.get()
+        frontier.attempts[url] = 1
+        frontier.retry(url, 0.01)
+        assert frontier.queued == 1 and frontier.in_flight == 0
+
+        # Nouvelle tentative distribuée malgré max_pages atteint
+        assert await asyncio.wait_for(frontier.get(), 1) == START
+        assert frontier.started == 1
+        frontier.task_done(url)
+        assert await frontier.get() is None
+
+    asyncio.run(scenario())
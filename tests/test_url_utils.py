@@ -0,0 +1,151 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services import scraper_service
+from app.services.html_converter import (
+    extract_page,
+    find_canonical_url,
+    set_conversion_executor,
+)
+from app.services.scraper_service import process_url
+from app.services.shared_crawl import SharedCrawl
+from app.services.url_frontier import UrlFrontier
+from app.services.url_utils import UrlCanonicalizer, is_in_scope
+
+SITE = "https://docs.example"
+
+
+@pytest.fixture
+def canonicalize():
+    return UrlCanonicalizer(
+        query_allow=[],
+        query_deny=["utm_*", "fbclid"],
+        index_files=["index.html"],
+        lowercase_path=False,
+        sort_query=True,
+    )
+
+
+def test_fragment_and_trailing_slash_are_removed(canonicalize):
+    assert canonicalize(f"{SITE}/guide/#install") == f"{SITE}/guide"
+    assert canonicalize(f"{SITE}/") == SITE
+
+
+def test_scheme_and_host_are_lowercased_not_path(canonicalize):
+    assert canonicalize("HTTPS://Docs.Example/Guide") == f"{SITE}/Guide"
+    assert UrlCanonicalizer(lowercase_path=True)(f"{SITE}/Guide") == f"{SITE}/guide"
+
+
+def test_default_port_is_removed(canonicalize):
+    assert canonicalize(f"{SITE}:443/guide") == f"{SITE}/guide"
+    assert canonicalize("http://docs.example:80/guide") == "http://docs.example/guide"
+    assert canonicalize(f"{SITE}:8443/guide") == f"{SITE}:8443/guide"
+    assert canonicalize("http://docs.example:443/guide") == "http://docs.example:443/guide"
+
+
+def test_index_files_are_collapsed(canonicalize):
+    assert canonicalize(f"{SITE}/dir/index.html") == f"{SITE}/dir"
+    assert canonicalize(f"{SITE}/dir/index.htm") == f"{SITE}/dir/index.htm"
+    assert canonicalize(f"{SITE}/dir/page.html") == f"{SITE}/dir/page.html"
+    assert UrlCanonicalizer(index_files=[])(f"{SITE}/index.html") == f"{SITE}/index.html"
+
+
+def test_query_deny_list_and_sort(canonicalize):
+    url = f"{SITE}/search?q=a&utm_source=x&fbclid=1&lang=fr"
+    assert canonicalize(url) == f"{SITE}/search?lang=fr&q=a"
+    assert canonicalize(f"{SITE}/search?utm_medium=mail") == f"{SITE}/search"
+    # Requête déjà canonique : encodage d'origine conservé
+    assert canonicalize(f"{SITE}/search?a=b%2Fc&q=") == f"{SITE}/search?a=b%2Fc&q="
+
+
+def test_query_allow_list():
+    canonicalize = UrlCanonicalizer(query_allow=["page", "v*"], query_deny=["version"])
+    url = f"{SITE}/list?page=2&sort=asc&v=1&version=3"
+    assert canonicalize(url) == f"{SITE}/list?page=2&v=1"
+
+
+def test_query_kept_in_order_without_sort():
+    canonicalize = UrlCanonicalizer(query_allow=[], query_deny=[], sort_query=False)
+    assert canonicalize(f"{SITE}/list?b=1&a=2") == f"{SITE}/list?b=1&a=2"
+
+
+def test_is_in_scope():
+    assert is_in_scope(f"{SITE}/guide/install", "docs.example", "/guide")
+    assert not is_in_scope(f"{SITE}/blog", "docs.example", "/guide")
+    assert not is_in_scope("https://other.example/guide", "docs.example", "/guide")
+
+
+def page_with_head(head, body="<h1>Titre</h1>"):
+    return f"<html><head>{head}</head><body><main>{body}</main></body></html>"
+
+
+def test_find_canonical_url():
+    url = f"{SITE}/guide/install?ref=nav"
+    html = page_with_head('<link rel="canonical" href="/guide/setup#top">')
+    assert find_canonical_url(html, url, "docs.example", "/guide") == f"{SITE}/guide/setup"
+
+    # Entités décodées, href relatif résolu depuis la page
+    html = page_with_head("<link href='setup?a=1&amp;b=2' rel=canonical>")
+    expected = f"{SITE}/guide/setup?a=1&b=2"
+    assert find_canonical_url(html, url, "docs.example", "/guide") == expected
+
+
+def test_find_canonical_url_ignores_self_and_out_of_scope():
+    url = f"{SITE}/guide/index.html"
+    self_link = page_with_head(f'<link rel="canonical" href="{SITE}/guide/">')
+    assert find_canonical_url(self_link, url, "docs.example", "/guide") is None
+    elsewhere = page_with_head('<link rel="canonical" href="https://other.example/">')
+    assert find_canonical_url(elsewhere, url, "docs.example", "/guide") is None
+    # Balise dans le corps : ignorée
+    in_body = page_with_head("", '<link rel="canonical" href="/guide/setup">')
+    assert find_canonical_url(in_body, url, "docs.example", "/guide") is None
+
+
+def test_find_canonical_url_without_head_end():
+    html = '<html><link rel="canonical" href="/guide/setup"><h1>Titre</h1>'
+    url = f"{SITE}/guide/install"
+    assert find_canonical_url(html, url, "docs.example", "/guide") == f"{SITE}/guide/setup"
+
+
+def test_links_resolved_from_the_fetched_url():
+    html = page_with_head("", '<h1>Dir</h1><a href="page.html">p</a><a href="#top">t</a>')
+    page = extract_page(html, f"{SITE}/guide/dir/index.html", "docs.example", "/guide")
+    assert page.links == [f"{SITE}/guide/dir/page.html", f"{SITE}/guide/dir/index.html"]
+
+
+def test_process_url_deduplicates_identical_pages(monkeypatch):
+    # Même HTML, donc même Markdown, sous deux dossiers différents
+    html = page_with_head("", '<h1>Même</h1><a href="next">suite</a>')
+    urls = [f"{SITE}/guide/v1/page", f"{SITE}/guide/v2/page"]
+
+    async def fetch_page(url, *args):
+        return html
+
+    monkeypatch.setattr(scraper_service, "fetch_page", fetch_page)
+
+    async def scenario():
+        crawl = SharedCrawl("key", f"{SITE}/guide")
+        frontier = UrlFrontier()
+        links = []
+        for url in urls:
+            frontier.add(url)
+            links.append(
+                await process_url(
+                    url, None, "docs.example", "/guide", crawl, None, frontier
+                )
+            )
+        return crawl, links
+
+    with ThreadPoolExecutor(1) as executor:
+        set_conversion_executor(executor)
+        try:
+            crawl, links = asyncio.run(scenario())
+        finally:
+            set_conversion_executor(None)
+
+    assert list(crawl.url_to_markdown) == urls[:1]
+    assert crawl.stats["duplicate_pages"] == 1
+    # Les liens relatifs du doublon, résolus depuis son URL, sont tout de même suivis
+    assert links == [[f"{SITE}/guide/v1/next"], [f"{SITE}/guide/v2/next"]]
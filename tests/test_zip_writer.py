@@ -0,0 +1,95 @@
+import asyncio
+import io
+import zipfile
+
+from app.schemas.scraper_schemas import ExportFormat
+from app.services.export_service import ZipExport
+from app.services.zip_writer import ZIP64_COUNT_LIMIT, ZipWriter, compress_member
+
+
+def test_members_read_back_with_zipfile():
+    contents = {
+        "index.md": b"# Accueil\n" * 200,
+        "guide/démarrage.md": "Démarrage rapide".encode(),
+        "empty.md": b"",
+    }
+    buffer = io.BytesIO()
+    writer = ZipWriter(buffer)
+    # Membres stockés et compressés
+    for level, (name, content) in zip((0, 6, 9), contents.items()):
+        writer.write(compress_member(name, content, level))
+    writer.close()
+
+    with zipfile.ZipFile(buffer) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == list(contents)
+        for name, content in contents.items():
+            assert archive.read(name) == content
+
+
+def test_zip64_member_count_round_trip():
+    count = ZIP64_COUNT_LIMIT + 10
+    buffer = io.BytesIO()
+    writer = ZipWriter(buffer)
+    for index in range(count):
+        writer.write(compress_member(f"pages/{index}.md", str(index).encode(), 0))
+    writer.close()
+
+    # Au-delà de 65535 membres, le nombre n'est lisible que dans la fin ZIP64
+    assert b"PK\x06\x06" in buffer.getvalue()[-200:]
+    with zipfile.ZipFile(buffer) as archive:
+        names = archive.namelist()
+        assert len(names) == count
+        assert names[-1] == f"pages/{count - 1}.md"
+        assert archive.read(f"pages/{count - 1}.md") == str(count - 1).encode()
+
+
+def test_zip_export_finish_and_save(tmp_path):
+    part = tmp_path / "export.zip.part"
+    export = ZipExport(
+        "https://docs.example/guide",
+        ExportFormat.ZIP_FILES,
+        compression_level=6,
+        path=str(part),
+    )
+    export.add_page("https://docs.example/guide", "# Guide")
+    export.add_page("https://docs.example/guide/install", "# Installation")
+
+    failure = {"url": "https://docs.example/broken", "status": 404, "reason": "http"}
+    failure["attempts"] = 3
+    asyncio.run(export.finish([failure]))
+    export.save(str(tmp_path / "export.zip"))
+
+    # Archive renommée, pas copiée : le fichier ouvert reste lisible
+    assert not part.exists()
+    assert export.size == (tmp_path / "export.zip").stat().st_size
+    with zipfile.ZipFile(tmp_path / "export.zip") as archive:
+        assert archive.testzip() is None
+        assert len(archive.namelist()) == 3
+        assert "README.md" in archive.namelist()
+        assert b"https://docs.example/broken" in archive.read("README.md")
+
+    async def read_chunks():
+        return b"".join([chunk async for chunk in export.iter_chunks(chunk_size=64)])
+
+    assert asyncio.run(read_chunks()) == (tmp_path / "export.zip").read_bytes()
+    export.discard()
+
+
+def test_concurrent_chunk_readers(tmp_path):
+    export = ZipExport(
+        "https://docs.example/guide", ExportFormat.ZIP_FLAT, path=str(tmp_path / "a.zip")
+    )
+    for index in range(50):
+        export.add_page(f"https://docs.example/guide/{index}", f"# Page {index}\n" * 50)
+
+    async def download():
+        return b"".join([chunk async for chunk in export.iter_chunks(chunk_size=100)])
+
+    async def scenario():
+        await export.finish()
+        return await asyncio.gather(*(download() for _ in range(4)))
+
+    downloads = asyncio.run(scenario())
+    assert set(downloads) == {(tmp_path / "a.zip").read_bytes()}
+    export.discard()